@@ -0,0 +1,661 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import Executor
+from pathlib import Path
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+from duckduckgo_search import AsyncDDGS
+
+from .cache import DEFAULT_CACHE_MAX_BYTES, CacheBackend, open_cache
+from .engine import (
+    build_response,
+    deadline_exceeded_response,
+    empty_query_response,
+    evidence_tracker,
+    extract_source_summary,
+    extraction_candidates,
+    hedge_policy,
+    local_answer,
+    no_results_response,
+    provider_failure_response,
+)
+from .deadline import Deadline, bounded_timeout, remaining
+from .extract import ExtractionPool, extract_main_text
+from .local_index import LocalIndex, open_local_index
+from .fetch import (
+    CHUNK_SIZE,
+    DEFAULT_MAX_AGE,
+    DEFAULT_MAX_BYTES,
+    FETCH_TIMEOUT,
+    CachedPage,
+    decode_body,
+    error_for_status,
+    is_supported_content_type,
+    load_cached_page,
+    mark_revalidated,
+    revalidation_headers,
+    store_page,
+)
+from .models import (
+    ResultsRanked,
+    SearchEvent,
+    SearchResponse,
+    SearchResult,
+    SearchSettings,
+    SourceExtracted,
+    SourceFetched,
+    SummaryReady,
+)
+from .politeness import POLITENESS, PolitenessScheduler
+from .provider_health import PROVIDER_HEALTH, ProviderHealth
+from .query_cache import QueryCache, query_cache_key
+from .robots import ROBOTS_CACHE, UNREACHABLE, robots_origin, robots_url
+from .triage import TRIAGE_STATS, TriageStats
+from .search import (
+    DDG_HEADERS,
+    DDG_HTML_ENDPOINTS,
+    DDG_LITE_URL,
+    DDGS_BACKENDS,
+    GOOGLE_CSE_URL,
+    WIKI_API_URL,
+    HedgePolicy,
+    _google_cse_credentials,
+    _normalize_ddgs_results,
+    _parse_ddg_links,
+    _parse_google_cse_items,
+    _parse_wiki_results,
+    _wiki_params,
+    merge_result_sets,
+)
+from .utils import USER_AGENT
+
+# Provider name and a factory for the coroutine that queries it.
+AsyncProviderStage = Tuple[str, Callable[[], Awaitable[List[Dict[str, str]]]]]
+
+
+class AsyncSearchEngine:
+    """asyncio counterpart of SearchEngine.
+
+    Providers, robots checks and page fetches run as coroutines on the caller's
+    event loop; extraction runs on ``executor`` (the loop default when None),
+    handing the parse itself to ``extraction_pool`` worker processes when given.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | str | None = None,
+        executor: Executor | None = None,
+        max_connections: int = 100,
+        scheduler: PolitenessScheduler | None = None,
+        max_age: float | None = DEFAULT_MAX_AGE,
+        max_page_bytes: int = DEFAULT_MAX_BYTES,
+        cache_backend: str | CacheBackend = "sqlite",
+        cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        query_cache: QueryCache | None = None,
+        provider_health: ProviderHealth | None = None,
+        extraction_pool: ExtractionPool | None = None,
+        triage_stats: TriageStats | None = None,
+        local_index: LocalIndex | None = None,
+    ) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if isinstance(cache_backend, CacheBackend):
+            self.cache: CacheBackend | None = cache_backend
+        else:
+            self.cache = open_cache(self.cache_dir, cache_backend, cache_max_bytes)
+        self.max_age = max_age
+        self.max_page_bytes = max_page_bytes
+        self.executor = executor
+        self.scheduler = scheduler or POLITENESS
+        self.query_cache = query_cache or QueryCache()
+        self.provider_health = provider_health or PROVIDER_HEALTH
+        self.extraction_pool = extraction_pool
+        self.triage_stats = triage_stats or TRIAGE_STATS
+        self.local_index = local_index or open_local_index(self.cache_dir)
+        self.max_connections = max_connections
+        self.logger = logging.getLogger(__name__)
+        self._session: aiohttp.ClientSession | None = None
+        # In-flight robots.txt downloads by origin; entries leave when the download ends.
+        self._robots_fetches: Dict[str, asyncio.Task] = {}
+
+    async def __aenter__(self) -> "AsyncSearchEngine":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        for fetch in list(self._robots_fetches.values()):
+            fetch.cancel()
+        await asyncio.gather(*self._robots_fetches.values(), return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.extraction_pool is not None:
+            await asyncio.to_thread(self.extraction_pool.close)
+        if self.cache is not None:
+            self.cache.close()
+        if self.local_index is not None:
+            self.local_index.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # One connection pool shared by every query running on this engine.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def run(self, query: str, settings: SearchSettings | None = None) -> SearchResponse:
+        response = empty_query_response()
+        async for event in self.run_iter(query, settings):
+            if isinstance(event, SummaryReady):
+                response = event.response
+        return response
+
+    async def run_iter(
+        self, query: str, settings: SearchSettings | None = None
+    ) -> AsyncIterator[SearchEvent]:
+        # Same events, in the same order, as SearchEngine.run_iter.
+        normalized_query = query.strip()
+        if not normalized_query:
+            yield SummaryReady(empty_query_response())
+            return
+
+        settings = settings or SearchSettings()
+        self.logger.info(
+            "Running async search: query='%s', max_results=%s, provider=%s, safe_search=%s",
+            normalized_query,
+            settings.max_results,
+            settings.provider,
+            settings.safe_search,
+        )
+
+        if settings.local_search != "off":
+            local = await asyncio.to_thread(
+                local_answer, self.local_index, normalized_query, settings
+            )
+            if local is not None:
+                yield ResultsRanked(query=normalized_query, results=local.results)
+                yield SummaryReady(local)
+                return
+
+        deadline = Deadline.after(settings.deadline)
+        try:
+            raw_results = await asyncio.wait_for(
+                self._search_web(normalized_query, settings), remaining(deadline)
+            )
+        except asyncio.TimeoutError:
+            self.logger.warning("Search deadline exceeded for query='%s'", normalized_query)
+            yield SummaryReady(deadline_exceeded_response(normalized_query))
+            return
+        except Exception:
+            self.logger.exception("Search provider raised an exception for query='%s'", normalized_query)
+            yield SummaryReady(provider_failure_response(normalized_query))
+            return
+
+        results = [SearchResult.from_mapping(result) for result in raw_results]
+
+        if not results:
+            yield SummaryReady(no_results_response(normalized_query))
+            return
+
+        if settings.summary_mode == "off":
+            yield ResultsRanked(query=normalized_query, results=results)
+            yield SummaryReady(SearchResponse(query=normalized_query, results=results))
+            return
+        # A lazy summary would have to block its reader on the event loop, so "lazy" is
+        # summarized up front here, like "full".
+        candidates = extraction_candidates(results, settings)
+        yield ResultsRanked(
+            query=normalized_query, results=results, sources_to_read=len(candidates)
+        )
+
+        evidence = evidence_tracker(normalized_query, settings)
+        limiter = asyncio.Semaphore(max(1, settings.max_workers))
+        events: asyncio.Queue = asyncio.Queue()
+        tasks = []
+        for result in candidates:
+            task = asyncio.ensure_future(
+                self._summarize_source(
+                    result, limiter, events.put_nowait, normalized_query, deadline
+                )
+            )
+            # A finished task is its own wake-up call, even if it emitted no events.
+            task.add_done_callback(events.put_nowait)
+            tasks.append(task)
+        outstanding = set(tasks)
+        sufficient = False
+        try:
+            while outstanding and not sufficient:
+                try:
+                    item = await asyncio.wait_for(events.get(), remaining(deadline))
+                except asyncio.TimeoutError:
+                    break
+                if isinstance(item, asyncio.Future):
+                    outstanding.discard(item)
+                    summary = item.result()
+                    if summary and evidence is not None:
+                        sufficient = evidence.add(summary["url"], summary["bullets"])
+                else:
+                    yield item
+        finally:
+            # Sources still running when the deadline hits or the evidence suffices are cancelled.
+            for task in outstanding:
+                task.cancel()
+            await asyncio.gather(*outstanding, return_exceptions=True)
+        summaries = [task.result() for task in tasks if task not in outstanding]
+        source_summaries = [summary for summary in summaries if summary]
+
+        yield SummaryReady(
+            build_response(
+                normalized_query,
+                results,
+                raw_results,
+                source_summaries,
+                partial=bool(outstanding) and not sufficient,
+            )
+        )
+
+    async def _summarize_source(
+        self,
+        result: SearchResult,
+        limiter: asyncio.Semaphore,
+        emit: Callable[[SearchEvent], None] | None = None,
+        query: str | None = None,
+        deadline: Deadline | None = None,
+    ) -> Dict[str, object] | None:
+        emit = emit or (lambda event: None)
+        async with limiter:
+            try:
+                if not await self._allowed_by_robots(result.url):
+                    self.logger.info("Skipped by robots.txt: %s", result.url)
+                    emit(SourceFetched(url=result.url, status="robots_disallowed", ok=False))
+                    return None
+
+                html, status = await self._fetch_url(result.url, deadline)
+                emit(SourceFetched(url=result.url, status=status or "", ok=bool(html)))
+                if not html:
+                    self.logger.info("Fetch failed for %s (%s)", result.url, status)
+                    return None
+
+                loop = asyncio.get_running_loop()
+                extractor = (
+                    self.extraction_pool.extract
+                    if self.extraction_pool is not None
+                    else extract_main_text
+                )
+                summary = await loop.run_in_executor(
+                    self.executor,
+                    extract_source_summary,
+                    result.url,
+                    html,
+                    self.cache,
+                    extractor,
+                    self.triage_stats,
+                    query,
+                    self.local_index,
+                )
+                if not summary:
+                    return None
+                emit(SourceExtracted(url=result.url, bullets=summary["bullets"]))
+            except Exception:
+                # One broken source should not take down the whole answer.
+                self.logger.exception("Processing failed for %s", result.url)
+                return None
+
+        return summary
+
+    async def _allowed_by_robots(self, url: str) -> bool:
+        # Shares the process-wide robots cache with the threaded engine.
+        rp = await asyncio.to_thread(ROBOTS_CACHE.get, url, self.cache)
+        if rp is None:
+            # Shielded so a source cancelled at the deadline does not abort the download
+            # other sources on the same origin are waiting for.
+            rp = await asyncio.shield(self._robots_fetch(url))
+        return rp.can_fetch(USER_AGENT, url)
+
+    def _robots_fetch(self, url: str) -> asyncio.Task:
+        # Sources on one origin share a single download, like RobotsCache.parser_for.
+        origin = robots_origin(url)
+        fetch = self._robots_fetches.get(origin)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch_robots(url))
+            self._robots_fetches[origin] = fetch
+            fetch.add_done_callback(lambda _: self._robots_fetches.pop(origin, None))
+        return fetch
+
+    async def _fetch_robots(self, url: str) -> RobotFileParser:
+        status, text = await self._download_robots(robots_url(url))
+        return await asyncio.to_thread(ROBOTS_CACHE.store, url, status, text, self.cache)
+
+    async def _download_robots(self, location: str) -> Tuple[int, str]:
+        try:
+            async with self._get_session().get(
+                location,
+                headers={"User-Agent": USER_AGENT},
+                timeout=aiohttp.ClientTimeout(total=ROBOTS_CACHE.timeout),
+            ) as resp:
+                text = await resp.text(errors="ignore") if resp.status < 400 else ""
+                return resp.status, text
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return UNREACHABLE, ""
+
+    async def _fetch_url(
+        self, url: str, deadline: Deadline | None = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        # Same cache and revalidation rules as fetch.fetch_url.
+        cached: Optional[CachedPage] = None
+        if self.cache is not None:
+            cached = await asyncio.to_thread(load_cached_page, url, self.cache, self.max_age)
+            if cached is not None and cached.fresh:
+                return cached.html, "cached"
+
+        headers = {"User-Agent": USER_AGENT}
+        if cached is not None:
+            headers.update(revalidation_headers(cached.meta))
+        try:
+            async with self.scheduler.async_slot(url):
+                async with self._get_session().get(
+                    url,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(
+                        total=bounded_timeout(deadline, FETCH_TIMEOUT)
+                    ),
+                ) as resp:
+                    status = resp.status
+                    if status == 304 and cached is not None:
+                        await asyncio.to_thread(
+                            mark_revalidated, url, self.cache, cached.meta
+                        )
+                        return cached.html, "revalidated"
+                    error = error_for_status(status)
+                    if error:
+                        if cached is not None and status >= 500:
+                            return cached.html, "stale"
+                        return None, error
+                    content_type = resp.headers.get("Content-Type", "")
+                    if not is_supported_content_type(content_type):
+                        return None, f"unsupported_content_type: {content_type}"
+                    body, truncated = await self._read_capped(resp)
+                    final_url = str(resp.url)
+                    etag = resp.headers.get("ETag")
+                    last_modified = resp.headers.get("Last-Modified")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if cached is not None:
+                return cached.html, "stale"
+            return None, f"request_error: {e}"
+
+        text = await asyncio.to_thread(decode_body, body, content_type)
+        if self.cache is not None:
+            await asyncio.to_thread(
+                store_page,
+                url,
+                self.cache,
+                text,
+                status,
+                final_url,
+                etag,
+                last_modified,
+                truncated,
+                cached.html if cached is not None else None,
+            )
+        return text, "fetched"
+
+    async def _read_capped(self, resp: aiohttp.ClientResponse) -> Tuple[bytes, bool]:
+        # Async twin of fetch.read_capped: stop reading once the byte budget is spent.
+        buffer = bytearray()
+        async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+            remaining = self.max_page_bytes - len(buffer)
+            if len(chunk) >= remaining:
+                buffer.extend(chunk[:remaining])
+                return bytes(buffer), True
+            buffer.extend(chunk)
+        return bytes(buffer), False
+
+    async def _search_web(self, query: str, settings: SearchSettings) -> List[Dict[str, str]]:
+        # Same result cache and provider cascade as search.search_web, awaited instead of blocking.
+        provider = settings.provider
+        max_results = settings.max_results
+        cache_key = query_cache_key(query, provider, settings.safe_search, max_results)
+        cached = self.query_cache.get(cache_key)
+        if cached is None and self.cache is not None:
+            cached = await asyncio.to_thread(self.query_cache.get, cache_key, self.cache)
+        if cached is not None:
+            return cached
+
+        stages = self.provider_health.order(
+            self._provider_stages(provider, query, max_results, settings.safe_search)
+        )
+        hedge = hedge_policy(settings)
+        if provider == "auto" and hedge is not None:
+            results = await self._hedged_search(stages, hedge)
+            if not results:
+                self.logger.warning("Search failed: no provider returned results")
+        else:
+            results = await self._cascade_search(stages)
+
+        # Rank results by domain reputation score.
+        results.sort(key=lambda x: x["score"], reverse=True)
+        if self.cache is not None:
+            await asyncio.to_thread(self.query_cache.put, cache_key, results, self.cache)
+        else:
+            self.query_cache.put(cache_key, results)
+        return results
+
+    def _provider_stages(
+        self, provider: str, query: str, max_results: int, safe_search: bool
+    ) -> List[AsyncProviderStage]:
+        # Same stages and default order as search._provider_stages.
+        safe_mode = "moderate" if safe_search else "off"
+        stages: List[AsyncProviderStage] = []
+        if provider in {"auto", "duckduckgo"}:
+            stages += [
+                (
+                    f"ddgs:{backend}",
+                    partial(self._ddgs_backend_search, query, max_results, safe_mode, backend),
+                )
+                for backend in DDGS_BACKENDS
+            ]
+        if provider in {"auto", "google_cse"} and all(_google_cse_credentials()):
+            stages.append(("google_cse", partial(self._google_cse_search, query, max_results)))
+        if provider in {"auto", "duckduckgo"}:
+            stages += [
+                ("ddg_html", partial(self._ddg_html_search, query, max_results)),
+                ("ddg_lite", partial(self._ddg_lite_search, query, max_results)),
+            ]
+        if provider in {"auto", "wikipedia"}:
+            stages.append(("wikipedia", partial(self._wiki_search, query, max_results)))
+        return stages
+
+    async def _run_stage(self, stage: AsyncProviderStage) -> List[Dict[str, str]]:
+        name, run = stage
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            results = await run()
+        except Exception as error:
+            self.provider_health.record_error(name, loop.time() - started, error)
+            raise
+        self.provider_health.record_result(name, loop.time() - started, results)
+        return results
+
+    async def _cascade_search(self, stages: List[AsyncProviderStage]) -> List[Dict[str, str]]:
+        last_error: Exception | None = None
+        for stage in stages:
+            if not self.provider_health.available(stage[0]):
+                continue
+            try:
+                results = await self._run_stage(stage)
+            except Exception as error:
+                last_error = error
+                continue
+            if results:
+                return results
+        if last_error is not None:
+            self.logger.warning("Search failed: %s", last_error)
+        return []
+
+    async def _hedged_search(
+        self,
+        stages: List[AsyncProviderStage],
+        policy: HedgePolicy,
+    ) -> List[Dict[str, str]]:
+        # Same schedule as search._hedged_search, except that losers are really cancelled.
+        loop = asyncio.get_running_loop()
+        pending: Dict[asyncio.Task, str] = {}
+        winners: List[List[Dict[str, str]]] = []
+        first_win_at: float | None = None
+        next_stage = 0
+        next_launch_at = 0.0
+
+        def launch() -> None:
+            nonlocal next_stage, next_launch_at
+            while next_stage < len(stages):
+                stage = stages[next_stage]
+                next_stage += 1
+                if self.provider_health.available(stage[0]):
+                    pending[asyncio.ensure_future(self._run_stage(stage))] = stage[0]
+                    break
+            next_launch_at = loop.time() + policy.delay
+
+        try:
+            for _ in range(max(1, policy.parallel)):
+                launch()
+            while pending:
+                now = loop.time()
+                if first_win_at is not None:
+                    timeout: float | None = first_win_at + policy.merge_window - now
+                elif next_stage < len(stages):
+                    timeout = next_launch_at - now
+                else:
+                    timeout = None
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, timeout) if timeout is not None else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        results = task.result()
+                    except Exception as error:
+                        self.logger.info("Search provider %s failed: %s", name, error)
+                        continue
+                    if results:
+                        winners.append(results)
+                        if first_win_at is None:
+                            first_win_at = loop.time()
+
+                now = loop.time()
+                if first_win_at is not None:
+                    if now >= first_win_at + policy.merge_window:
+                        break
+                    continue
+                if next_stage < len(stages) and (not pending or now >= next_launch_at):
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        return merge_result_sets(winners)
+
+    async def _ddgs_backend_search(
+        self, query: str, max_results: int, safe_mode: str, backend: str
+    ) -> List[Dict[str, str]]:
+        # AsyncDDGS refuses further calls after one failure, so use a fresh one per call.
+        async with AsyncDDGS() as ddgs:
+            raw = await ddgs.text(
+                query, max_results=max_results, backend=backend, safesearch=safe_mode
+            )
+        return _normalize_ddgs_results(raw or [])
+
+    async def _get_text(self, method: str, url: str, timeout: int, **kwargs: object) -> str:
+        async with self._get_session().request(
+            method, url, timeout=aiohttp.ClientTimeout(total=timeout), **kwargs
+        ) as resp:
+            resp.raise_for_status()
+            return await resp.text(errors="ignore")
+
+    async def _ddg_html_search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        results: List[Dict[str, str]] = []
+        seen: set = set()
+        answered = False
+        last_error: Exception | None = None
+        for url, method in DDG_HTML_ENDPOINTS:
+            try:
+                if method == "post":
+                    html = await self._get_text(
+                        "POST", url, 15, data={"q": query}, headers=DDG_HEADERS
+                    )
+                else:
+                    html = await self._get_text(
+                        "GET", url, 15, params={"q": query}, headers=DDG_HEADERS
+                    )
+                answered = True
+                await asyncio.to_thread(
+                    _parse_ddg_links, html, "a.result__a", max_results, results, seen
+                )
+                if results:
+                    return results
+            except Exception as error:
+                last_error = error
+                continue
+        if not answered and last_error is not None:
+            raise last_error
+        return results
+
+    async def _ddg_lite_search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        results: List[Dict[str, str]] = []
+        html = await self._get_text(
+            "GET", DDG_LITE_URL, 15, params={"q": query}, headers=DDG_HEADERS
+        )
+        await asyncio.to_thread(
+            _parse_ddg_links, html, "a.result-link", max_results, results, set()
+        )
+        return results
+
+    async def _wiki_search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        async with self._get_session().get(
+            WIKI_API_URL,
+            params=_wiki_params(query, max_results),
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json(content_type=None)
+        return _parse_wiki_results(data)
+
+    async def _google_cse_search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        api_key, cse_id = _google_cse_credentials()
+        if not api_key or not cse_id:
+            return []
+
+        results: List[Dict[str, str]] = []
+        seen: set = set()
+        start = 1
+        while len(results) < max_results:
+            params = {"key": api_key, "cx": cse_id, "q": query, "start": start}
+            try:
+                async with self._get_session().get(
+                    GOOGLE_CSE_URL, params=params, timeout=aiohttp.ClientTimeout(total=15)
+                ) as resp:
+                    resp.raise_for_status()
+                    data = await resp.json(content_type=None)
+            except Exception:
+                if not results:
+                    raise
+                break
+
+            items = data.get("items", [])
+            if not items:
+                break
+            _parse_google_cse_items(items, max_results, results, seen)
+            start += len(items)
+            # Google CSE only supports a limited pagination window.
+            if start > 91:
+                break
+        return results
@@ -0,0 +1,316 @@
+# JSON metadata, SQLite store, compression, threading and filesystem helpers.
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Cache keys and atomic file writes.
+from .utils import atomic_write_text, ensure_dir, url_to_cache_key
+
+# Default total size cap for the SQLite store, in bytes of compressed payload.
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+SQLITE_FILENAME = "cache.sqlite3"
+# Reads refresh an entry's LRU timestamp at most this often, in seconds, so hits stay reads.
+DEFAULT_TOUCH_INTERVAL = 60.0
+# Entries considered per eviction step, oldest first.
+EVICT_BATCH = 64
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    value: str
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+class ThreadConnections:
+    """One SQLite connection per thread to a single database file, in WAL mode.
+
+    Connections are opened in autocommit mode; writes that must be atomic use
+    explicit transactions. Long-lived stores see many short-lived worker
+    threads, so connections of finished threads are closed whenever a new
+    thread connects.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                for thread in [t for t in self._connections if not t.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._connections)
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for conn in connections.values():
+            conn.close()
+        self._local = threading.local()
+
+
+def monotonic_expiry(fetched_at: float, lifetime: float) -> float:
+    # Converts a wall-clock fetch time (as persisted) into a monotonic expiry for this process.
+    age = max(0.0, time.time() - fetched_at)
+    return time.monotonic() + lifetime - age
+
+
+def put_best_effort(
+    cache: "CacheBackend", kind: str, key: str, value: str, meta: Dict[str, Any]
+) -> None:
+    # For in-memory caches with a persistent tier: a failed write only costs the next process.
+    try:
+        cache.put(kind, key, value, meta)
+    except Exception:
+        pass
+
+
+class CacheBackend(ABC):
+    """Key/value store for cached pages, extracted text and robots files.
+
+    Entries are grouped by ``kind`` ("html", "text", "robots", ...) and keyed by
+    the raw URL or origin. Each entry carries a small JSON metadata dict.
+    Implementations must be safe to share between threads.
+    """
+
+    @abstractmethod
+    def get(self, kind: str, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, kind: str, key: str, value: str, meta: Dict[str, Any] | None = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_meta(self, kind: str, key: str, meta: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, kind: str, key: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class FileCache(CacheBackend):
+    """The original one-file-per-URL layout: ``<root>/<kind>/<sha256>.<ext>``.
+
+    Metadata lives in a ``<sha256>.json`` sidecar. Entries written before
+    sidecars existed report their file modification time as ``fetched_at``.
+    """
+
+    EXTENSIONS = {"html": ".html", "text": ".txt"}
+
+    def __init__(self, root: Path | str) -> None:
+        self.root = Path(root)
+
+    def _paths(self, kind: str, key: str) -> tuple[Path, Path]:
+        ensure_dir(self.root / kind)
+        stem = self.root / kind / url_to_cache_key(key)
+        extension = self.EXTENSIONS.get(kind, ".dat")
+        return stem.with_suffix(extension), stem.with_suffix(".json")
+
+    def get(self, kind: str, key: str) -> Optional[CacheEntry]:
+        value_path, meta_path = self._paths(kind, key)
+        try:
+            value = value_path.read_text(encoding="utf-8", errors="ignore")
+        except OSError:
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            meta = {"fetched_at": value_path.stat().st_mtime}
+        return CacheEntry(value=value, meta=meta)
+
+    def put(self, kind: str, key: str, value: str, meta: Dict[str, Any] | None = None) -> None:
+        value_path, meta_path = self._paths(kind, key)
+        atomic_write_text(value_path, value)
+        if meta is not None:
+            atomic_write_text(meta_path, json.dumps(meta))
+
+    def update_meta(self, kind: str, key: str, meta: Dict[str, Any]) -> None:
+        _, meta_path = self._paths(kind, key)
+        atomic_write_text(meta_path, json.dumps(meta))
+
+    def delete(self, kind: str, key: str) -> None:
+        for path in self._paths(kind, key):
+            path.unlink(missing_ok=True)
+
+
+class SQLiteCache(CacheBackend):
+    """Single-file cache store with zlib compression and LRU eviction.
+
+    Uses WAL mode and one connection per thread, so several threads and
+    processes can read and write the same file. When the compressed payload
+    exceeds ``max_bytes`` the least recently used entries are evicted down to
+    90% of the cap. Recency is tracked to within ``touch_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        compression_level: int = 6,
+        touch_interval: float = DEFAULT_TOUCH_INTERVAL,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.touch_interval = touch_interval
+        ensure_dir(self.path.parent)
+        self._connections = ThreadConnections(self.path)
+        self._init_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    def _init_schema(self) -> None:
+        conn = self._connection()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                meta TEXT NOT NULL DEFAULT '{}',
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+            CREATE TABLE IF NOT EXISTS stats (id INTEGER PRIMARY KEY CHECK (id = 1), total INTEGER NOT NULL);
+            INSERT OR IGNORE INTO stats (id, total) VALUES (1, 0);
+            CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+                UPDATE stats SET total = total + NEW.size WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+                UPDATE stats SET total = total - OLD.size + NEW.size WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+                UPDATE stats SET total = total - OLD.size WHERE id = 1;
+            END;
+            """
+        )
+
+    def get(self, kind: str, key: str) -> Optional[CacheEntry]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, meta, accessed_at FROM entries WHERE kind = ? AND key = ?",
+            (kind, key),
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[2] >= self.touch_interval:
+            conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE kind = ? AND key = ?",
+                (now, kind, key),
+            )
+        value = zlib.decompress(row[0]).decode("utf-8", errors="ignore")
+        return CacheEntry(value=value, meta=json.loads(row[1] or "{}"))
+
+    def put(self, kind: str, key: str, value: str, meta: Dict[str, Any] | None = None) -> None:
+        blob = zlib.compress(value.encode("utf-8", errors="ignore"), self.compression_level)
+        conn = self._connection()
+        conn.execute(
+            """
+            INSERT INTO entries (kind, key, value, meta, size, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (kind, key) DO UPDATE SET
+                value = excluded.value,
+                meta = excluded.meta,
+                size = excluded.size,
+                accessed_at = excluded.accessed_at
+            """,
+            (kind, key, blob, json.dumps(meta or {}), len(blob), time.time()),
+        )
+        self._evict_if_needed(conn)
+
+    def update_meta(self, kind: str, key: str, meta: Dict[str, Any]) -> None:
+        self._connection().execute(
+            "UPDATE entries SET meta = ?, accessed_at = ? WHERE kind = ? AND key = ?",
+            (json.dumps(meta), time.time(), kind, key),
+        )
+
+    def delete(self, kind: str, key: str) -> None:
+        self._connection().execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+
+    def total_bytes(self) -> int:
+        row = self._connection().execute("SELECT total FROM stats WHERE id = 1").fetchone()
+        return int(row[0]) if row else 0
+
+    def _evict_if_needed(self, conn: sqlite3.Connection) -> None:
+        if self.total_bytes() <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            excess = self.total_bytes() - target
+            while excess > 0:
+                # Walk the accessed_at index a batch at a time instead of loading every row.
+                rows = conn.execute(
+                    "SELECT kind, key, size FROM entries ORDER BY accessed_at LIMIT ?",
+                    (EVICT_BATCH,),
+                ).fetchall()
+                if not rows:
+                    break
+                victims = []
+                for kind, key, size in rows:
+                    if excess <= 0:
+                        break
+                    victims.append((kind, key))
+                    excess -= size
+                conn.executemany("DELETE FROM entries WHERE kind = ? AND key = ?", victims)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        self._connections.close()
+
+
+CACHE_BACKENDS = ("sqlite", "files")
+
+
+def open_cache(
+    cache_dir: Path | str | None,
+    backend: str = "sqlite",
+    max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+) -> Optional[CacheBackend]:
+    # Build the engine's cache under cache_dir; None disables caching.
+    if cache_dir is None:
+        return None
+    if backend == "files":
+        return FileCache(cache_dir)
+    if backend == "sqlite":
+        return SQLiteCache(Path(cache_dir) / SQLITE_FILENAME, max_bytes=max_bytes)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+def resolve_cache(cache: CacheBackend | Path | str | None) -> Optional[CacheBackend]:
+    # Plain directories keep the original file layout for direct callers.
+    if cache is None or isinstance(cache, CacheBackend):
+        return cache
+    return FileCache(cache)
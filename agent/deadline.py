@@ -0,0 +1,45 @@
+# Monotonic clock for budgets that survive wall-clock changes.
+import time
+from typing import Optional
+
+# Smallest timeout handed to a network call; zero would mean "no timeout" to some clients.
+MIN_TIMEOUT = 0.05
+
+
+class Deadline:
+    """A point in time by which a query must be answered.
+
+    Stages ask ``remaining()`` before starting work and pass ``timeout(cap)``
+    to network calls so nothing started late can outlive the budget.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def after(cls, seconds: float | None) -> Optional["Deadline"]:
+        # None means no budget, which callers treat as "no deadline".
+        return cls(seconds) if seconds is not None else None
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, cap: float) -> float:
+        # The usual per-call timeout, shortened to what is left of the budget.
+        return max(MIN_TIMEOUT, min(cap, self.remaining()))
+
+
+def remaining(deadline: Deadline | None) -> float | None:
+    return deadline.remaining() if deadline is not None else None
+
+
+def bounded_timeout(deadline: Deadline | None, cap: float) -> float:
+    return deadline.timeout(cap) if deadline is not None else cap
+
+
+def expired(deadline: Deadline | None) -> bool:
+    return deadline is not None and deadline.expired()
@@ -1,28 +1,442 @@
 from __future__ import annotations
 
 import logging
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
+from typing import Callable, Dict, Generator, Iterable, Iterator, List, Set, Tuple
 
-from .extract import cached_extract
-from .fetch import allowed_by_robots, fetch_url
-from .models import SearchResponse, SearchResult, SearchSettings
-from .search import search_web
+from .cache import DEFAULT_CACHE_MAX_BYTES, CacheBackend, open_cache
+from .deadline import Deadline, bounded_timeout, expired, remaining
+from .evidence import Evidence
+from .extract import (
+    ExtractionPool,
+    cached_extract,
+    extract_light_text,
+    extract_main_text,
+    load_cached_text,
+)
+from .fetch import (
+    DEFAULT_MAX_AGE,
+    DEFAULT_MAX_BYTES,
+    FETCH_TIMEOUT,
+    allowed_by_robots,
+    fetch_url,
+)
+from .fingerprint import cached_fingerprint, collapse_duplicate_sources
+from .http_client import HttpClient
+from .local_index import MIN_COVERAGE, LocalIndex, local_result, open_local_index
+from .politeness import POLITENESS, PolitenessScheduler
+from .provider_health import PROVIDER_HEALTH, ProviderHealth
+from .models import (
+    LazySearchResponse,
+    ResultsRanked,
+    SearchEvent,
+    SearchResponse,
+    SearchResult,
+    SearchSettings,
+    SourceExtracted,
+    SourceFetched,
+    SummaryReady,
+)
+from .query_cache import QueryCache
+from .search import HedgePolicy, ResultsCallback, search_web
 from .summarize import source_bullets, synthesize_from_search_results, synthesize_paragraph
+from .triage import LIGHT, SKIP, TRIAGE_STATS, TriageStats, triage_page
+
+
+def empty_query_response() -> SearchResponse:
+    return SearchResponse(
+        query="",
+        error="Query cannot be empty.",
+        summary="Please provide a search topic.",
+    )
+
+
+def provider_failure_response(query: str) -> SearchResponse:
+    return SearchResponse(
+        query=query,
+        error="Search providers failed. Try a different query or provider.",
+        summary=(
+            "The search request failed before results were returned. "
+            "Try another query and retry."
+        ),
+    )
+
+
+def no_results_response(query: str) -> SearchResponse:
+    paragraph = (
+        "Not enough high-quality sources were accessible to produce a reliable summary. "
+        "No search results were returned or accessible; this can happen due to network "
+        "restrictions or a very narrow query."
+    )
+    return SearchResponse(
+        query=query,
+        results=[],
+        summary=paragraph,
+        sources=[],
+        error="No results were returned.",
+    )
+
+
+def deadline_exceeded_response(query: str) -> SearchResponse:
+    return SearchResponse(
+        query=query,
+        error="Search timed out before results were returned.",
+        summary=(
+            "The search ran out of time before any provider answered. "
+            "Try again or allow a longer time budget."
+        ),
+        partial=True,
+    )
+
+
+def no_local_results_response(query: str) -> SearchResponse:
+    return SearchResponse(
+        query=query,
+        results=[],
+        summary=(
+            "No cached pages match this query. "
+            "Turn off offline mode to search the web instead."
+        ),
+        sources=[],
+        error="No local results were found.",
+    )
+
+
+def extraction_candidates(
+    results: List[SearchResult], settings: SearchSettings
+) -> List[SearchResult]:
+    # Only the top results are fetched; the rest stay as links.
+    extraction_limit = min(len(results), max(1, min(settings.max_results, 10)))
+    return [result for result in results[:extraction_limit] if result.url]
+
+
+def hedge_policy(settings: SearchSettings) -> HedgePolicy | None:
+    if settings.hedge_delay is None:
+        return None
+    return HedgePolicy(
+        delay=settings.hedge_delay,
+        parallel=settings.hedge_parallel,
+        merge_window=settings.hedge_merge_window,
+    )
+
+
+def evidence_tracker(query: str, settings: SearchSettings) -> Evidence | None:
+    if settings.evidence_sentences is None:
+        return None
+    return Evidence(query, settings.evidence_sentences, settings.evidence_domains)
+
+
+def local_answer(
+    index: LocalIndex | None, query: str, settings: SearchSettings
+) -> SearchResponse | None:
+    # Answer from cached pages; None means the providers should be asked instead.
+    hits = index.search(query, limit=settings.max_results) if index is not None else []
+    if settings.local_search == "cache_first":
+        hits = [hit for hit in hits if hit.coverage >= MIN_COVERAGE]
+        if len(hits) < settings.local_min_sources:
+            return None
+    if not hits:
+        return no_local_results_response(query)
+
+    raw_results = [local_result(hit) for hit in hits]
+    results = [SearchResult.from_mapping(result) for result in raw_results]
+    if settings.summary_mode == "off":
+        return SearchResponse(query=query, results=results)
+    # The index already holds each page's sentences that match the query, best first.
+    source_summaries = [
+        {"url": hit.url, "bullets": hit.sentences[:8]} for hit in hits[:10] if hit.sentences
+    ]
+    return build_response(query, results, raw_results, source_summaries)
+
+
+def extract_source_text(
+    url: str,
+    html: str,
+    cache: CacheBackend | None,
+    extractor: Callable[[str], str] = extract_main_text,
+    triage_stats: TriageStats | None = None,
+    index: LocalIndex | None = None,
+) -> str | None:
+    # CPU-bound half of the per-source pipeline: triage and main text extraction.
+    # Text cached from an earlier read needs neither, and triage only counts real decisions.
+    text = load_cached_text(url, cache, html, index)
+    if text is None:
+        decision = triage_page(html)
+        if triage_stats is not None:
+            triage_stats.record(decision)
+        if decision.action == SKIP:
+            return None
+        if decision.action == LIGHT:
+            extractor = extract_light_text
+        text = cached_extract(url, html, cache, extractor=extractor, index=index)
+    if not text or len(text) < 200:
+        return None
+    return text
+
+
+def source_summary(
+    url: str, text: str, cache: CacheBackend | None, query: str | None = None
+) -> Dict[str, object] | None:
+    # The sentences most relevant to the query, plus the page fingerprint for collapsing copies.
+    bullets = source_bullets(text, query=query)
+    if not bullets:
+        return None
+    return {"url": url, "bullets": bullets, "fingerprint": cached_fingerprint(url, text, cache)}
+
+
+def extract_source_summary(
+    url: str,
+    html: str,
+    cache: CacheBackend | None,
+    extractor: Callable[[str], str] = extract_main_text,
+    triage_stats: TriageStats | None = None,
+    query: str | None = None,
+    index: LocalIndex | None = None,
+) -> Dict[str, object] | None:
+    # Extraction plus picking the sentences most relevant to the query.
+    text = extract_source_text(url, html, cache, extractor, triage_stats, index)
+    if not text:
+        return None
+    return source_summary(url, text, cache, query)
+
+
+def build_response(
+    query: str,
+    results: List[SearchResult],
+    raw_results: List[Dict[str, str]],
+    source_summaries: List[Dict[str, object]],
+    partial: bool = False,
+) -> SearchResponse:
+    # Mirrored and syndicated copies of a page take up a single source slot.
+    source_summaries = collapse_duplicate_sources(source_summaries)
+    if not source_summaries:
+        paragraph, sources = synthesize_from_search_results(raw_results, query)
+    else:
+        paragraph, sources = synthesize_paragraph(
+            source_summaries,
+            min_sources=1,
+            query=query,
+            max_sentences=10,
+        )
+
+    return SearchResponse(
+        query=query,
+        results=results,
+        summary=paragraph,
+        sources=sources,
+        partial=partial,
+    )
+
+
+class SourceMemo:
+    """Per-URL extracted text shared by the queries of one batch.
+
+    The first query to reach a URL reads it; later queries wait for and reuse
+    that text instead of fetching and extracting the page again, then pick
+    their own bullets from it. A single query uses one the same way to pick
+    up pages its SourcePrefetcher started reading. At most ``max_entries``
+    URLs are remembered, least recently used first out.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, url: str) -> Tuple[Future, bool]:
+        # Returns the URL's future and whether the caller owns (must compute) it.
+        with self._lock:
+            future = self._entries.get(url)
+            if future is not None:
+                self._entries.move_to_end(url)
+                return future, False
+            future = Future()
+            self._entries[url] = future
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return future, True
+
+    def holds(self, url: str, future: Future) -> bool:
+        with self._lock:
+            return self._entries.get(url) is future
+
+    def forget(self, url: str, future: Future) -> None:
+        # Drops a read that ended without a verdict on the page so the next claim retries it.
+        with self._lock:
+            if self._entries.get(url) is future:
+                del self._entries[url]
+
+
+def source_pool(max_workers: int) -> ThreadPoolExecutor:
+    # Threads that fetch and extract one query's sources.
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search-source")
+
+
+class SourcePrefetcher:
+    """Starts reading the best URLs providers report before the final ranking is in.
+
+    Providers hand over results as they get them (a page at a time while they
+    paginate, or as each hedged provider answers). ``offer`` starts reading
+    the highest-scoring new URLs among them right away, up to ``limit`` URLs,
+    so page fetches overlap the rest of the provider phase. Reads go through
+    a SourceMemo, where the summarizing stage picks them up once the results
+    are ranked. They run on the query's source pool, the one the summarizing
+    stage uses too, so prefetching never adds to its concurrency bound.
+    """
+
+    def __init__(
+        self, read: Callable[[SearchResult], object], limit: int, pool: ThreadPoolExecutor
+    ) -> None:
+        self.limit = max(1, limit)
+        self._read = read
+        self._pool = pool
+        self._started: Set[str] = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def offer(self, raw_results: List[Dict[str, str]]) -> None:
+        ranked = sorted(raw_results, key=lambda result: result.get("score", 0), reverse=True)
+        with self._lock:
+            for raw in ranked:
+                if self._closed or len(self._started) >= self.limit:
+                    return
+                result = SearchResult.from_mapping(raw)
+                if not result.url or result.url in self._started:
+                    continue
+                self._started.add(result.url)
+                self._pool.submit(self._read, result)
+
+    def close(self) -> None:
+        # Reads already started run to completion; providers that answer late are ignored.
+        with self._lock:
+            self._closed = True
 
 
 class SearchEngine:
-    def __init__(self, cache_dir: Path | str | None = None) -> None:
+    def __init__(
+        self,
+        cache_dir: Path | str | None = None,
+        http_client: HttpClient | None = None,
+        scheduler: PolitenessScheduler | None = None,
+        max_age: float | None = DEFAULT_MAX_AGE,
+        max_page_bytes: int = DEFAULT_MAX_BYTES,
+        cache_backend: str | CacheBackend = "sqlite",
+        cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        query_cache: QueryCache | None = None,
+        provider_health: ProviderHealth | None = None,
+        extraction_pool: ExtractionPool | None = None,
+        triage_stats: TriageStats | None = None,
+        local_index: LocalIndex | None = None,
+    ) -> None:
         self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        # Pages, extracted text and robots files share one store under cache_dir.
+        if isinstance(cache_backend, CacheBackend):
+            self.cache: CacheBackend | None = cache_backend
+        else:
+            self.cache = open_cache(self.cache_dir, cache_backend, cache_max_bytes)
+        # Cached pages older than max_age are revalidated; None keeps them forever.
+        self.max_age = max_age
+        # Page bodies are read only up to this many bytes.
+        self.max_page_bytes = max_page_bytes
+        # Keep-alive pools live as long as the engine and are shared by every query.
+        self.http_client = http_client or HttpClient()
+        # Per-domain spacing is process-wide by default so engines share each host's budget.
+        self.scheduler = scheduler or POLITENESS
+        # Ranked results for repeated queries; persisted alongside pages when a cache is set.
+        self.query_cache = query_cache or QueryCache()
+        # Provider success rates and circuit breakers; snapshot() shows the live stats.
+        self.provider_health = provider_health or PROVIDER_HEALTH
+        # Page text extraction runs in these worker processes when given, else in-thread.
+        self.extraction_pool = extraction_pool
+        # Hit rates of the pre-extraction triage; snapshot() shows what was skipped and why.
+        self.triage_stats = triage_stats or TRIAGE_STATS
+        # Full-text index of every extracted page, for SearchSettings.local_search.
+        self.local_index = local_index or open_local_index(self.cache_dir)
         self.logger = logging.getLogger(__name__)
 
+    def close(self) -> None:
+        self.http_client.close()
+        if self.extraction_pool is not None:
+            self.extraction_pool.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.local_index is not None:
+            self.local_index.close()
+
     def run(self, query: str, settings: SearchSettings | None = None) -> SearchResponse:
+        response = empty_query_response()
+        for event in self.run_iter(query, settings):
+            if isinstance(event, SummaryReady):
+                response = event.response
+        return response
+
+    def run_many(
+        self,
+        queries: Iterable[str],
+        settings: SearchSettings | None = None,
+        max_queries: int = 4,
+    ) -> Iterator[SearchResponse]:
+        """Run many queries concurrently, yielding each response as it completes.
+
+        At most ``max_queries`` queries are in flight and ``queries`` is consumed
+        lazily, so memory stays flat for arbitrarily long inputs. A URL returned
+        for several queries is fetched and extracted only once per batch.
+        Responses come back in completion order; ``response.query`` tells them apart.
+        """
+        memo = SourceMemo()
+        max_queries = max(1, max_queries)
+        pool = ThreadPoolExecutor(max_workers=max_queries, thread_name_prefix="search-query")
+        pending: Set[Future] = set()
+        remaining_queries = iter(queries)
+        try:
+            while True:
+                for query in remaining_queries:
+                    pending.add(pool.submit(self._run_with_memo, query, settings, memo))
+                    if len(pending) >= max_queries:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def run_iter(
+        self, query: str, settings: SearchSettings | None = None
+    ) -> Iterator[SearchEvent]:
+        """Run a search and yield progress events as each stage finishes.
+
+        Yields ``ResultsRanked`` once providers answer, then ``SourceFetched`` and
+        ``SourceExtracted`` per source in completion order, and always ends with
+        ``SummaryReady`` carrying the same response ``run`` returns.
+        """
+        return self._run_iter(query, settings)
+
+    def _run_with_memo(
+        self, query: str, settings: SearchSettings | None, memo: SourceMemo
+    ) -> SearchResponse:
+        response = empty_query_response()
+        for event in self._run_iter(query, settings, memo):
+            if isinstance(event, SummaryReady):
+                response = event.response
+        return response
+
+    def _run_iter(
+        self,
+        query: str,
+        settings: SearchSettings | None = None,
+        memo: SourceMemo | None = None,
+    ) -> Iterator[SearchEvent]:
         normalized_query = query.strip()
         if not normalized_query:
-            return SearchResponse(
-                query="",
-                error="Query cannot be empty.",
-                summary="Please provide a search topic.",
-            )
+            yield SummaryReady(empty_query_response())
+            return
 
         settings = settings or SearchSettings()
         self.logger.info(
@@ -33,79 +447,331 @@ class SearchEngine:
             settings.safe_search,
         )
 
+        if settings.local_search != "off":
+            local = local_answer(self.local_index, normalized_query, settings)
+            if local is not None:
+                yield ResultsRanked(query=normalized_query, results=local.results)
+                yield SummaryReady(local)
+                return
+
+        deadline = Deadline.after(settings.deadline)
+        pool: ThreadPoolExecutor | None = None
+        prefetcher: SourcePrefetcher | None = None
+        if settings.summary_mode == "full":
+            # Sources are read up front, so start on the best ones while providers still run.
+            # Prefetches and the summarizing stage share one pool of max_workers threads.
+            memo = memo or SourceMemo()
+            pool = source_pool(settings.max_workers)
+            prefetcher = self._prefetcher(settings, deadline, memo, pool)
         try:
-            raw_results = search_web(
-                normalized_query,
-                max_results=settings.max_results,
-                provider=settings.provider,
-                safe_search=settings.safe_search,
+            yield from self._search_and_summarize(
+                normalized_query, settings, deadline, memo, pool, prefetcher
+            )
+        finally:
+            if pool is not None:
+                # Already shut down by the summarizing stage unless the run ended early.
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def _search_and_summarize(
+        self,
+        normalized_query: str,
+        settings: SearchSettings,
+        deadline: Deadline | None,
+        memo: SourceMemo | None,
+        pool: ThreadPoolExecutor | None,
+        prefetcher: SourcePrefetcher | None,
+    ) -> Iterator[SearchEvent]:
+        try:
+            raw_results = self._search_web(
+                normalized_query, settings, deadline, prefetcher.offer if prefetcher else None
             )
+        except FutureTimeoutError:
+            self.logger.warning("Search deadline exceeded for query='%s'", normalized_query)
+            yield SummaryReady(deadline_exceeded_response(normalized_query))
+            return
         except Exception:
             self.logger.exception("Search provider raised an exception for query='%s'", normalized_query)
-            return SearchResponse(
-                query=normalized_query,
-                error="Search providers failed. Try a different query or provider.",
-                summary=(
-                    "The search request failed before results were returned. "
-                    "Try another query and retry."
-                ),
-            )
+            yield SummaryReady(provider_failure_response(normalized_query))
+            return
+        finally:
+            if prefetcher is not None:
+                prefetcher.close()
 
         results = [SearchResult.from_mapping(result) for result in raw_results]
 
         if not results:
-            paragraph = (
-                "Not enough high-quality sources were accessible to produce a reliable summary. "
-                "No search results were returned or accessible; this can happen due to network "
-                "restrictions or a very narrow query."
+            yield SummaryReady(no_results_response(normalized_query))
+            return
+
+        candidates = extraction_candidates(results, settings)
+        if settings.summary_mode != "full":
+            # Nothing is fetched now; a lazy response fetches on first read of its summary.
+            yield ResultsRanked(query=normalized_query, results=results)
+            yield SummaryReady(
+                self._results_only_response(
+                    normalized_query, results, raw_results, candidates, settings, memo
+                )
             )
-            return SearchResponse(
-                query=normalized_query,
-                results=[],
-                summary=paragraph,
-                sources=[],
-                error="No results were returned.",
+            return
+        yield ResultsRanked(
+            query=normalized_query, results=results, sources_to_read=len(candidates)
+        )
+
+        source_summaries, complete = yield from self._summarize_sources(
+            candidates,
+            settings.max_workers,
+            deadline,
+            memo,
+            normalized_query,
+            evidence_tracker(normalized_query, settings),
+            pool,
+        )
+
+        yield SummaryReady(
+            build_response(
+                normalized_query, results, raw_results, source_summaries, partial=not complete
             )
+        )
 
-        source_summaries = []
-        extraction_limit = min(len(results), max(1, min(settings.max_results, 10)))
+    def _results_only_response(
+        self,
+        query: str,
+        results: List[SearchResult],
+        raw_results: List[Dict[str, str]],
+        candidates: List[SearchResult],
+        settings: SearchSettings,
+        memo: SourceMemo | None = None,
+    ) -> SearchResponse:
+        if settings.summary_mode == "off":
+            return SearchResponse(query=query, results=results)
 
-        for result in results[:extraction_limit]:
-            if not result.url:
-                continue
+        def load(emit: Callable[[SearchEvent], None]) -> SearchResponse:
+            # The time budget starts when the summary is asked for, not when results came in.
+            deadline = Deadline.after(settings.deadline)
+            # Announces the reading stage the way a full run does, now with a source count.
+            emit(ResultsRanked(query=query, results=results, sources_to_read=len(candidates)))
+            stage = self._summarize_sources(
+                candidates,
+                settings.max_workers,
+                deadline,
+                memo,
+                query,
+                evidence_tracker(query, settings),
+            )
+            while True:
+                try:
+                    emit(next(stage))
+                except StopIteration as finished:
+                    source_summaries, complete = finished.value
+                    break
+            return build_response(
+                query, results, raw_results, source_summaries, partial=not complete
+            )
 
-            if not allowed_by_robots(result.url):
-                self.logger.info("Skipped by robots.txt: %s", result.url)
-                continue
+        return LazySearchResponse(query=query, results=results, loader=load)
 
-            html, status = fetch_url(result.url, self.cache_dir)
-            if not html:
-                self.logger.info("Fetch failed for %s (%s)", result.url, status)
-                continue
+    def _prefetcher(
+        self,
+        settings: SearchSettings,
+        deadline: Deadline | None,
+        memo: SourceMemo,
+        pool: ThreadPoolExecutor,
+    ) -> SourcePrefetcher:
+        def read(result: SearchResult) -> str | None:
+            # Progress events are reported by the summarizing stage, which reads through the memo.
+            return self._source_text(result, deadline, lambda event: None, memo)
 
-            text = cached_extract(result.url, html, self.cache_dir)
-            if not text or len(text) < 200:
-                continue
+        # No more than the first wave of sources the summarizing stage would start anyway.
+        extraction_limit = max(1, min(settings.max_results, 10))
+        return SourcePrefetcher(read, min(settings.max_workers, extraction_limit), pool)
 
-            bullets = source_bullets(text)
-            if not bullets:
-                continue
+    def _search_web(
+        self,
+        query: str,
+        settings: SearchSettings,
+        deadline: Deadline | None,
+        on_results: ResultsCallback | None = None,
+    ) -> List[Dict[str, str]]:
+        def search() -> List[Dict[str, str]]:
+            return search_web(
+                query,
+                max_results=settings.max_results,
+                provider=settings.provider,
+                safe_search=settings.safe_search,
+                client=self.http_client,
+                query_cache=self.query_cache,
+                cache=self.cache,
+                hedge=hedge_policy(settings),
+                health=self.provider_health,
+                deadline=deadline,
+                on_results=on_results,
+            )
 
-            source_summaries.append({"url": result.url, "bullets": bullets})
+        if deadline is None:
+            return search()
+        # A provider call cannot be interrupted, so wait for it on the side and give up
+        # (raising FutureTimeoutError) when the budget runs out.
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-provider")
+        try:
+            return pool.submit(search).result(timeout=deadline.remaining())
+        finally:
+            pool.shutdown(wait=False)
 
-        if not source_summaries:
-            paragraph, sources = synthesize_from_search_results(raw_results, normalized_query)
-        else:
-            paragraph, sources = synthesize_paragraph(
-                source_summaries,
-                min_sources=1,
-                query=normalized_query,
-                max_sentences=10,
+    def _summarize_sources(
+        self,
+        candidates: List[SearchResult],
+        max_workers: int,
+        deadline: Deadline | None = None,
+        memo: SourceMemo | None = None,
+        query: str | None = None,
+        evidence: Evidence | None = None,
+        pool: ThreadPoolExecutor | None = None,
+    ) -> Generator[SearchEvent, None, Tuple[List[Dict[str, object]], bool]]:
+        # Run the per-URL stages concurrently, relaying their events as they happen.
+        # Returns the finished summaries in ranking order and whether the answer is complete:
+        # every source finished, or the evidence was already sufficient.
+        # A given pool (already running the prefetches) is shut down here like an own one.
+        if not candidates:
+            return [], True
+        events: "queue.Queue[SearchEvent | Future]" = queue.Queue()
+        own_pool = pool is None
+        if pool is None:
+            pool = source_pool(max(1, min(max_workers, len(candidates))))
+        futures = []
+        for result in candidates:
+            future = pool.submit(
+                self._summarize_source, result, deadline, events.put, memo, query
             )
+            # A finished future is its own wake-up call, even if it emitted no events.
+            future.add_done_callback(events.put)
+            futures.append(future)
+        outstanding = set(futures)
+        sufficient = False
+        try:
+            while outstanding and not sufficient:
+                try:
+                    item = events.get(timeout=remaining(deadline))
+                except queue.Empty:
+                    break
+                if isinstance(item, Future):
+                    outstanding.discard(item)
+                    summary = item.result()
+                    if summary and evidence is not None:
+                        sufficient = evidence.add(summary["url"], summary["bullets"])
+                else:
+                    yield item
+        finally:
+            # Sources still running when the deadline hits or the evidence suffices are
+            # abandoned, not waited for; those not started yet are never started. Neither
+            # are prefetches of URLs that did not make the final ranking.
+            pool.shutdown(wait=own_pool and not outstanding, cancel_futures=True)
+        summaries = [future.result() for future in futures if future not in outstanding]
+        return [summary for summary in summaries if summary], sufficient or not outstanding
+
+    def _extractor(self) -> Callable[[str], str]:
+        if self.extraction_pool is not None:
+            return self.extraction_pool.extract
+        return extract_main_text
+
+    def _summarize_source(
+        self,
+        result: SearchResult,
+        deadline: Deadline | None = None,
+        emit: Callable[[SearchEvent], None] | None = None,
+        memo: SourceMemo | None = None,
+        query: str | None = None,
+    ) -> Dict[str, object] | None:
+        emit = emit or (lambda event: None)
+        text = self._source_text(result, deadline, emit, memo)
+        if not text:
+            return None
+        try:
+            summary = source_summary(result.url, text, self.cache, query)
+        except Exception:
+            self.logger.exception("Processing failed for %s", result.url)
+            return None
+        if not summary:
+            return None
+        emit(SourceExtracted(url=result.url, bullets=summary["bullets"]))
+        return summary
+
+    def _source_text(
+        self,
+        result: SearchResult,
+        deadline: Deadline | None,
+        emit: Callable[[SearchEvent], None],
+        memo: SourceMemo | None,
+    ) -> str | None:
+        shared: Future | None = None
+        while memo is not None:
+            shared, owner = memo.claim(result.url)
+            if owner:
+                break
+            # A prefetch or another query of the batch is reading (or has read) this URL.
+            try:
+                text = shared.result(timeout=remaining(deadline))
+            except FutureTimeoutError:
+                return None
+            if text is None and not memo.holds(result.url, shared) and not expired(deadline):
+                # That reader gave up without a verdict on the page; read it ourselves.
+                continue
+            emit(SourceFetched(url=result.url, status="shared", ok=text is not None))
+            return text
+        text = None
+        settled = False
+        try:
+            text = self._read_source(result, deadline, emit)
+            # Running out of time says nothing about the page, so that None is not shared.
+            settled = text is not None or not expired(deadline)
+        except Exception:
+            # One broken source should not take down the whole answer.
+            self.logger.exception("Processing failed for %s", result.url)
+        finally:
+            if memo is not None and shared is not None:
+                if not settled:
+                    memo.forget(result.url, shared)
+                shared.set_result(text)
+        return text
+
+    def _read_source(
+        self,
+        result: SearchResult,
+        deadline: Deadline | None,
+        emit: Callable[[SearchEvent], None],
+    ) -> str | None:
+        if expired(deadline):
+            return None
+        if not allowed_by_robots(
+            result.url,
+            timeout=bounded_timeout(deadline, 10),
+            cache=self.cache,
+            client=self.http_client,
+        ):
+            self.logger.info("Skipped by robots.txt: %s", result.url)
+            emit(SourceFetched(url=result.url, status="robots_disallowed", ok=False))
+            return None
+
+        html, status = fetch_url(
+            result.url,
+            self.cache,
+            client=self.http_client,
+            scheduler=self.scheduler,
+            max_age=self.max_age,
+            max_bytes=self.max_page_bytes,
+            timeout=bounded_timeout(deadline, FETCH_TIMEOUT),
+        )
+        emit(SourceFetched(url=result.url, status=status or "", ok=bool(html)))
+        if not html:
+            self.logger.info("Fetch failed for %s (%s)", result.url, status)
+            return None
+        if expired(deadline):
+            return None
 
-        return SearchResponse(
-            query=normalized_query,
-            results=results,
-            summary=paragraph,
-            sources=sources,
+        return extract_source_text(
+            result.url,
+            html,
+            self.cache,
+            self._extractor(),
+            self.triage_stats,
+            self.local_index,
         )
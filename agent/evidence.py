@@ -0,0 +1,67 @@
+# Threading for the shared tally.
+import threading
+from typing import List, Set
+
+# Sentence fingerprints, query terms and domains.
+from .fingerprint import SENTENCE_MAX_DISTANCE, near_duplicate, sentence_fingerprint
+from .relevance import query_terms, tokenize
+from .summarize import _score_sentence
+from .utils import domain_from_url
+
+
+class Evidence:
+    """Decides when the sources read so far already hold enough for an answer.
+
+    A bullet counts as evidence when it mentions a query term (or, without a
+    query, has a date, figure or name in it) and is not a near-duplicate of
+    evidence already seen. Reading can stop once ``min_sentences`` such
+    bullets came from at least ``min_domains`` different domains, since the
+    answer only uses a handful of sentences anyway.
+    """
+
+    def __init__(self, query: str | None, min_sentences: int, min_domains: int = 2) -> None:
+        self.min_sentences = min_sentences
+        self.min_domains = min_domains
+        self._terms = frozenset(query_terms(query)) if query else frozenset()
+        self._fingerprints: List[int] = []
+        self._domains: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _is_strong(self, sentence: str) -> bool:
+        if self._terms:
+            return not self._terms.isdisjoint(tokenize(sentence))
+        return _score_sentence(sentence) > 0
+
+    def add(self, url: str, bullets: List[str]) -> bool:
+        # Records one source's bullets; returns whether there is enough evidence now.
+        strong = [bullet for bullet in bullets if self._is_strong(bullet)]
+        fingerprints = [sentence_fingerprint(bullet) for bullet in strong]
+        with self._lock:
+            added = False
+            for fingerprint in fingerprints:
+                if near_duplicate(fingerprint, self._fingerprints, SENTENCE_MAX_DISTANCE):
+                    continue
+                self._fingerprints.append(fingerprint)
+                added = True
+            if added:
+                self._domains.add(domain_from_url(url))
+            return self._sufficient()
+
+    @property
+    def sentences(self) -> int:
+        return len(self._fingerprints)
+
+    @property
+    def domains(self) -> int:
+        return len(self._domains)
+
+    @property
+    def sufficient(self) -> bool:
+        with self._lock:
+            return self._sufficient()
+
+    def _sufficient(self) -> bool:
+        return (
+            len(self._fingerprints) >= self.min_sentences
+            and len(self._domains) >= self.min_domains
+        )
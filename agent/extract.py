@@ -1,13 +1,85 @@
-# Path for filesystem work and Optional for type hints.
+# Worker processes for CPU-bound extraction, Path for filesystem work, type hints.
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 # HTML parsing and main-content extraction.
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml.html import HtmlElement
 from readability import Document
+from readability.cleaners import clean_attributes
 
-# Local helpers for caching.
-from .utils import ensure_dir, url_to_cache_key
+# Cache backends.
+from .cache import CacheBackend, resolve_cache
+from .local_index import LocalIndex
+
+# Non-content elements that add noise to summaries.
+NOISE_TAGS = frozenset({"script", "style", "noscript", "header", "footer", "nav", "aside"})
+
+
+class _Article:
+    # Stands in for readability's cleaned HTML string so the article stays an lxml tree.
+
+    __slots__ = ("node", "retry_length", "_length")
+
+    def __init__(self, node: HtmlElement, retry_length: int) -> None:
+        self.node = node
+        self.retry_length = retry_length
+        self._length: int | None = None
+
+    def __len__(self) -> int:
+        # summary() only compares this length with retry_length. Markup never makes the
+        # HTML shorter than its text, so serialize only when the text alone falls short.
+        if self._length is None:
+            length = len(self.node.text_content())
+            if length < self.retry_length:
+                length = len(clean_attributes(etree.tounicode(self.node, method="html")))
+            self._length = length
+        return self._length
+
+
+class _TreeDocument(Document):
+    # readability's documented hook for replacing its DOM-to-HTML step.
+    def get_clean_html(self) -> _Article:  # type: ignore[override]
+        return _Article(self._html(), self.retry_length)
+
+
+def _parse_document(html: str) -> HtmlElement | None:
+    parser = etree.HTMLParser()
+    try:
+        parser.feed(html)
+        return parser.close()
+    except etree.LxmlError:
+        return None
+
+
+def tree_text(root: HtmlElement) -> str:
+    """Whitespace-normalized visible text of an lxml tree, skipping ``NOISE_TAGS``.
+
+    Matches ``BeautifulSoup.get_text(separator=" ", strip=True)`` after the noise
+    tags are decomposed: comments are dropped but the text following them is kept.
+    """
+    parts = []
+    # Depth-first with an explicit stack; strings on the stack are text waiting to be emitted.
+    stack: list = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            item = item.strip()
+            if item:
+                parts.append(item)
+            continue
+        if item.tail:
+            stack.append(item.tail)
+        if not isinstance(item.tag, str) or item.tag in NOISE_TAGS:
+            continue
+        stack.extend(reversed(item))
+        if item.text:
+            stack.append(item.text)
+    return " ".join(parts)
 
 
 def extract_main_text(html: str) -> str:
@@ -15,37 +87,102 @@ def extract_main_text(html: str) -> str:
     if not html:
         return ""
     try:
-        # Use readability to isolate the main article content.
-        doc = Document(html)
-        content_html = doc.summary(html_partial=True)
-        soup = BeautifulSoup(content_html, "lxml")
+        # Use readability to isolate the main article content, keeping its lxml tree.
+        article = _TreeDocument(html).summary(html_partial=True)
+        root = article.node
     except Exception:
-        # Fall back to parsing the full document if readability fails.
-        soup = BeautifulSoup(html, "lxml")
+        # Fall back to the full document if readability fails.
+        root = _parse_document(html)
+        if root is None:
+            return ""
+    return tree_text(root)
 
-    # Remove non-content elements that add noise to summaries.
-    for tag in soup(["script", "style", "noscript", "header", "footer", "nav", "aside"]):
-        tag.decompose()
 
-    # Extract visible text as a single whitespace-normalized string.
-    text = soup.get_text(separator=" ", strip=True)
-    return text
+def extract_light_text(html: str) -> str:
+    # Cheap extraction for pages triage downgrades: one lxml parse, no readability scoring.
+    root = _parse_document(html) if html else None
+    return tree_text(root) if root is not None else ""
+
+
+# Small page parsed once per worker so the first real page does not pay for warm-up.
+_WARM_UP_HTML = "<html><body><article><p>Warm-up paragraph.</p></article></body></html>"
+
+
+def _warm_up() -> int:
+    extract_main_text(_WARM_UP_HTML)
+    return os.getpid()
+
+
+class ExtractionPool:
+    """Runs ``extract_main_text`` in a warm pool of worker processes.
+
+    readability and lxml tree walking hold the GIL for the whole parse, so extra
+    threads do not make extraction faster; processes do. Only the HTML is sent
+    to a worker and only the text comes back, so cache reads and writes stay in
+    the calling process.
+    """
+
+    def __init__(self, max_workers: int | None = None, warm: bool = True) -> None:
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        # Fresh interpreters instead of forks: the parent has live threads,
+        # connection pools and open cache files that must not be copied.
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        if warm:
+            self.warm()
+
+    def warm(self) -> None:
+        # One task per slot makes the executor start every worker up front.
+        for _ in range(self.max_workers):
+            self._executor.submit(_warm_up)
+
+    def extract(self, html: str) -> str:
+        if not html:
+            return ""
+        try:
+            return self._executor.submit(extract_main_text, html).result()
+        except BrokenProcessPool:
+            # A crashed worker (e.g. killed for memory) breaks the pool; keep answering.
+            return extract_main_text(html)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
 
+def load_cached_text(
+    url: str,
+    cache: CacheBackend | None,
+    html: str = "",
+    index: Optional[LocalIndex] = None,
+) -> Optional[str]:
+    if cache is None:
+        return None
+    entry = cache.get("text", url)
+    if entry is None:
+        return None
+    # Text cached before the index existed is indexed the first time it is reused.
+    if index is not None and entry.value:
+        index.update(url, entry.value, html, replace=False)
+    return entry.value
 
-def cached_extract(url: str, html: str, cache_dir: Path | None = None) -> Optional[str]:
-    text_path: Path | None = None
-    if cache_dir is not None:
-        # Ensure the cache directory exists for extracted text.
-        ensure_dir(cache_dir / "text")
-        cache_key = url_to_cache_key(url)
-        text_path = cache_dir / "text" / f"{cache_key}.txt"
 
-        # Reuse cached extraction if it already exists.
-        if text_path.exists():
-            return text_path.read_text(encoding="utf-8", errors="ignore")
+def cached_extract(
+    url: str,
+    html: str,
+    cache: CacheBackend | Path | None = None,
+    extractor: Callable[[str], str] = extract_main_text,
+    index: Optional[LocalIndex] = None,
+) -> Optional[str]:
+    cache = resolve_cache(cache)
+    # Reuse cached extraction if it already exists.
+    cached = load_cached_text(url, cache, html, index)
+    if cached is not None:
+        return cached
 
-    # Extract fresh text and cache it for future runs.
-    text = extract_main_text(html)
-    if text and text_path is not None:
-        text_path.write_text(text, encoding="utf-8", errors="ignore")
+    # Extract fresh text (possibly in a worker process) and cache it here for future runs.
+    text = extractor(html)
+    if text and cache is not None:
+        cache.put("text", url, text)
+    if text and index is not None:
+        index.update(url, text, html)
     return text
@@ -1,68 +1,228 @@
-# Time for polite delays, Path for cache paths, and typing helpers.
+# Codec checks, regex sniffing, time for freshness, Path for cache dirs, typing helpers.
+import codecs
+import re
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple
-from urllib.parse import urljoin, urlparse
-from urllib.robotparser import RobotFileParser
+from typing import Any, Dict, Iterable, Optional, Tuple
 
-# HTTP client.
+# HTTP client and charset detection (a requests dependency).
 import requests
+from charset_normalizer import from_bytes
 
-# Shared constants and cache helpers.
-from .utils import USER_AGENT, ensure_dir, url_to_cache_key
+# Cache backends, pooled HTTP client, shared robots.txt cache and constants.
+from .cache import CacheBackend, resolve_cache
+from .http_client import HttpClient, resolve_client
+from .politeness import POLITENESS, PolitenessScheduler
+from .robots import ROBOTS_CACHE
+from .utils import USER_AGENT
 
+# Per-page request timeout in seconds.
+FETCH_TIMEOUT = 15
+# Engines revalidate cached pages older than this many seconds.
+DEFAULT_MAX_AGE = 24 * 60 * 60
+# Stop reading a page body after this many bytes.
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# Bodies worth handing to the extractor; anything else is skipped before download.
+SUPPORTED_CONTENT_TYPES = {"text/html", "application/xhtml+xml", "text/plain"}
 
-def _robots_url(url: str) -> str:
-    # Build the robots.txt URL for a given page URL.
-    parsed = urlparse(url)
-    return urljoin(f"{parsed.scheme}://{parsed.netloc}", "/robots.txt")
+# Cache entries computed from a page body; they go stale whenever the body changes.
+DERIVED_KINDS = ("text", "simhash")
 
+_HEADER_CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
 
-def allowed_by_robots(url: str, user_agent: str = USER_AGENT, timeout: int = 10) -> bool:
+
+def allowed_by_robots(
+    url: str,
+    user_agent: str = USER_AGENT,
+    timeout: int = 10,
+    cache: CacheBackend | Path | None = None,
+    client: HttpClient | None = None,
+) -> bool:
     # Check robots.txt to respect site crawling rules.
-    robots_url = _robots_url(url)
-    rp = RobotFileParser()
-    rp.set_url(robots_url)
+    # Lookups go through the process-wide cache; an unreachable robots.txt allows
+    # the fetch so sources are not dropped when robots is down.
+    return ROBOTS_CACHE.allowed(
+        url, user_agent=user_agent, timeout=timeout, cache=resolve_cache(cache), client=client
+    )
+
+
+def error_for_status(status_code: int) -> Optional[str]:
+    # Treat common block status codes as failures.
+    if status_code in (403, 429):
+        return f"blocked_status: {status_code}"
+    if status_code >= 400:
+        return f"http_error: {status_code}"
+    return None
+
+
+def is_supported_content_type(content_type: str) -> bool:
+    # A missing Content-Type is allowed through; extraction copes with odd bodies.
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return not media_type or media_type in SUPPORTED_CONTENT_TYPES
+
+
+def read_capped(chunks: Iterable[bytes], max_bytes: int) -> Tuple[bytes, bool]:
+    # Accumulate streamed chunks until the byte budget is spent.
+    buffer = bytearray()
+    for chunk in chunks:
+        if not chunk:
+            continue
+        remaining = max_bytes - len(buffer)
+        if len(chunk) >= remaining:
+            buffer.extend(chunk[:remaining])
+            return bytes(buffer), True
+        buffer.extend(chunk)
+    return bytes(buffer), False
+
+
+def _known_codec(name: str | None) -> Optional[str]:
+    if not name:
+        return None
     try:
-        rp.read()
-    except Exception:
-        # If robots.txt can't be fetched, default to allow.
-        # This avoids dropping all sources when robots is unreachable.
-        return True
-    # Ask the parser whether the user agent is allowed to fetch this URL.
-    return rp.can_fetch(user_agent, url)
-
-
-def fetch_url(url: str, cache_dir: Path | None = None) -> Tuple[Optional[str], Optional[str]]:
-    html_path: Path | None = None
-    if cache_dir is not None:
-        # Ensure the cache directory exists for raw HTML.
-        ensure_dir(cache_dir / "html")
-        cache_key = url_to_cache_key(url)
-        html_path = cache_dir / "html" / f"{cache_key}.html"
-
-        # Serve cached HTML if available.
-        if html_path.exists():
-            return html_path.read_text(encoding="utf-8", errors="ignore"), "cached"
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def decode_body(body: bytes, content_type: str = "") -> str:
+    # Prefer the declared charset (header, then <meta>), and only then run detection.
+    match = _HEADER_CHARSET_RE.search(content_type or "")
+    encoding = _known_codec(match.group(1) if match else None)
+    if encoding is None and body.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    if encoding is None:
+        meta = _META_CHARSET_RE.search(body[:4096])
+        encoding = _known_codec(meta.group(1).decode("ascii", "ignore") if meta else None)
+    if encoding is None:
+        best = from_bytes(body).best()
+        encoding = _known_codec(best.encoding if best is not None else None) or "utf-8"
+    return body.decode(encoding, errors="replace")
+
+
+@dataclass(slots=True)
+class CachedPage:
+    html: str
+    meta: Dict[str, Any]
+    fresh: bool
+
+
+def load_cached_page(url: str, cache: CacheBackend, max_age: float | None) -> Optional[CachedPage]:
+    entry = cache.get("html", url)
+    if entry is None:
+        return None
+    # Entries without a fetch time (pre-metadata caches) count as stale.
+    age = time.time() - float(entry.meta.get("fetched_at", 0) or 0)
+    fresh = max_age is None or age < max_age
+    return CachedPage(html=entry.value, meta=entry.meta, fresh=fresh)
+
+
+def revalidation_headers(meta: Dict[str, Any]) -> Dict[str, str]:
+    # Conditional GET headers so an unchanged page costs a 304 instead of a full body.
+    headers: Dict[str, str] = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = str(meta["etag"])
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = str(meta["last_modified"])
+    return headers
+
+
+def store_page(
+    url: str,
+    cache: CacheBackend,
+    html: str,
+    status: int,
+    final_url: str,
+    etag: Optional[str],
+    last_modified: Optional[str],
+    truncated: bool = False,
+    previous_html: Optional[str] = None,
+) -> None:
+    meta = {
+        "url": url,
+        "fetched_at": time.time(),
+        "status": status,
+        "final_url": final_url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "truncated": truncated,
+    }
+    cache.put("html", url, html, meta)
+    # Extracted text and fingerprints are only reused for the body they came from.
+    if previous_html is None or previous_html != html:
+        for kind in DERIVED_KINDS:
+            cache.delete(kind, url)
+
+
+def mark_revalidated(url: str, cache: CacheBackend, meta: Dict[str, Any]) -> None:
+    # A 304 restarts the freshness clock without touching the body.
+    cache.update_meta("html", url, {**meta, "fetched_at": time.time(), "status": 304})
+
+
+def fetch_url(
+    url: str,
+    cache: CacheBackend | Path | None = None,
+    client: HttpClient | None = None,
+    scheduler: PolitenessScheduler | None = None,
+    max_age: float | None = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    timeout: float = FETCH_TIMEOUT,
+) -> Tuple[Optional[str], Optional[str]]:
+    # max_age=None serves cached pages forever; otherwise stale pages are revalidated.
+    # A plain directory uses the file layout; engines pass their own backend.
+    cache = resolve_cache(cache)
+    cached: Optional[CachedPage] = None
+    if cache is not None:
+        cached = load_cached_page(url, cache, max_age)
+        if cached is not None and cached.fresh:
+            return cached.html, "cached"
 
     # Use a realistic user agent to reduce blocks.
     headers = {"User-Agent": USER_AGENT}
+    if cached is not None:
+        headers.update(revalidation_headers(cached.meta))
     try:
-        # Fetch the page with a timeout to avoid hanging.
-        resp = requests.get(url, headers=headers, timeout=15)
+        # Wait for this domain's politeness slot, then stream the page with a timeout.
+        with (scheduler or POLITENESS).slot(url):
+            with resolve_client(client).get(
+                url, headers=headers, timeout=timeout, stream=True
+            ) as resp:
+                if resp.status_code == 304 and cached is not None and cache is not None:
+                    mark_revalidated(url, cache, cached.meta)
+                    return cached.html, "revalidated"
+
+                error = error_for_status(resp.status_code)
+                if error:
+                    if cached is not None and resp.status_code >= 500:
+                        return cached.html, "stale"
+                    return None, error
+
+                # Decide from the headers alone whether the body is worth downloading.
+                content_type = resp.headers.get("Content-Type", "")
+                if not is_supported_content_type(content_type):
+                    return None, f"unsupported_content_type: {content_type}"
+
+                body, truncated = read_capped(resp.iter_content(CHUNK_SIZE), max_bytes)
     except requests.RequestException as e:
+        if cached is not None:
+            # Serve the stale copy rather than nothing when the origin is unreachable.
+            return cached.html, "stale"
         return None, f"request_error: {e}"
 
-    # Treat common block status codes as failures.
-    if resp.status_code in (403, 429):
-        return None, f"blocked_status: {resp.status_code}"
-    if resp.status_code >= 400:
-        return None, f"http_error: {resp.status_code}"
-
-    # Cache the fetched HTML for reuse.
-    text = resp.text
-    if html_path is not None:
-        html_path.write_text(text, encoding="utf-8", errors="ignore")
-    # Small delay to be polite to servers.
-    time.sleep(0.5)
+    text = decode_body(body, content_type)
+    # Cache the fetched HTML and its validators for reuse.
+    if cache is not None:
+        store_page(
+            url,
+            cache,
+            text,
+            resp.status_code,
+            resp.url,
+            resp.headers.get("ETag"),
+            resp.headers.get("Last-Modified"),
+            truncated=truncated,
+            previous_html=cached.html if cached is not None else None,
+        )
     return text, "fetched"
@@ -0,0 +1,112 @@
+# Stable 64-bit hashes of fingerprint features.
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Tuple
+
+# Cache backends and the tokenizer shared with relevance ranking.
+from .cache import CacheBackend
+from .relevance import tokenize
+
+BITS = 64
+# Pages whose fingerprints differ in at most this many bits are the same document.
+SOURCE_MAX_DISTANCE = 3
+# Sentences are short, so one changed word moves their fingerprint further.
+SENTENCE_MAX_DISTANCE = 6
+# Word n-grams hashed for a page; sentences use single words and pairs.
+SOURCE_SHINGLE = 3
+
+
+# Per-bit feature counts are kept side by side in one big integer, LANE bits each, so
+# adding a feature is eight table lookups and additions instead of 64 bit tests.
+LANE = 32
+_LANE_MASK = (1 << LANE) - 1
+# _SPREAD[position][byte]: a 1 in the lane of every bit set in that byte of a feature hash.
+_SPREAD = [
+    [
+        sum(1 << ((position * 8 + bit) * LANE) for bit in range(8) if byte >> bit & 1)
+        for byte in range(256)
+    ]
+    for position in range(BITS // 8)
+]
+
+
+def simhash(features: Iterable[str]) -> int:
+    """64-bit SimHash of a bag of features; similar bags give nearby fingerprints."""
+    s0, s1, s2, s3, s4, s5, s6, s7 = _SPREAD
+    lanes = 0
+    total = 0
+    for feature in features:
+        digest = blake2b(feature.encode("utf-8"), digest_size=BITS // 8).digest()
+        b0, b1, b2, b3, b4, b5, b6, b7 = digest
+        lanes += s0[b0] + s1[b1] + s2[b2] + s3[b3] + s4[b4] + s5[b5] + s6[b6] + s7[b7]
+        total += 1
+    fingerprint = 0
+    for bit in range(BITS):
+        # A bit is set when most features have it set.
+        if 2 * (lanes >> (bit * LANE) & _LANE_MASK) > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def text_fingerprint(text: str, shingle: int = SOURCE_SHINGLE) -> int:
+    words = tokenize(text)
+    if len(words) <= shingle:
+        return simhash([" ".join(words)])
+    return simhash(" ".join(words[i : i + shingle]) for i in range(len(words) - shingle + 1))
+
+
+def sentence_fingerprint(sentence: str) -> int:
+    words = tokenize(sentence)
+    return simhash(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def near_duplicate(fingerprint: int, seen: Iterable[int], max_distance: int) -> bool:
+    return any((fingerprint ^ other).bit_count() <= max_distance for other in seen)
+
+
+def cached_fingerprint(url: str, text: str, cache: CacheBackend | None = None) -> int:
+    """Fingerprint of a page's extracted text, kept in the cache next to that text."""
+    if cache is not None:
+        entry = cache.get("simhash", url)
+        # The length guards against a fingerprint outliving the text it was taken from.
+        if entry is not None and entry.meta.get("chars") == len(text):
+            try:
+                return int(entry.value, 16)
+            except ValueError:
+                pass
+    fingerprint = text_fingerprint(text)
+    if cache is not None:
+        cache.put("simhash", url, f"{fingerprint:016x}", {"chars": len(text)})
+    return fingerprint
+
+
+def collapse_duplicate_sources(
+    source_summaries: List[Dict[str, object]],
+    max_distance: int = SOURCE_MAX_DISTANCE,
+) -> List[Dict[str, object]]:
+    """Keep the best-ranked copy of each group of near-duplicate sources.
+
+    Summaries are expected in ranking order and may carry a ``fingerprint``;
+    the URLs of dropped copies are listed under ``duplicates`` on the kept one.
+    """
+    kept: List[Dict[str, object]] = []
+    # (position in kept, fingerprint) of every kept summary that has one.
+    fingerprints: List[Tuple[int, int]] = []
+    for summary in source_summaries:
+        fingerprint = summary.get("fingerprint")
+        if isinstance(fingerprint, int):
+            for position, other in fingerprints:
+                if hamming_distance(fingerprint, other) <= max_distance:
+                    original = kept[position]
+                    duplicates = list(original.get("duplicates", []))  # type: ignore[call-overload]
+                    kept[position] = {**original, "duplicates": duplicates + [summary["url"]]}
+                    break
+            else:
+                fingerprints.append((len(kept), fingerprint))
+                kept.append(summary)
+        else:
+            kept.append(summary)
+    return kept
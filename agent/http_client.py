@@ -0,0 +1,119 @@
+# Locks for lazily shared state, per-thread DDGS clients and typing helpers.
+import threading
+import weakref
+from typing import Any, Optional
+
+# HTTP client, connection pooling and retry policy.
+import requests
+from duckduckgo_search import DDGS
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared browser-like user agent.
+from .utils import USER_AGENT
+
+
+class HttpClient:
+    """Pooled HTTP layer shared by page fetches, robots checks and providers.
+
+    Wraps one ``requests.Session`` with per-host keep-alive pools and a retry
+    policy for transient 5xx/connection errors, plus one DDGS client per
+    thread. Safe to share between the engine's worker threads.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 32,
+        pool_maxsize: int = 16,
+        retries: int = 2,
+        backoff_factor: float = 0.3,
+        user_agent: str = USER_AGENT,
+        ddgs_timeout: int = 10,
+    ) -> None:
+        self.user_agent = user_agent
+        self.ddgs_timeout = ddgs_timeout
+        # 429 is left to the callers: it means back off, not retry. Read timeouts
+        # are not retried either, since that would multiply the caller's timeout, and
+        # Retry-After is ignored because its sleep is not bounded by the timeout.
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._local = threading.local()
+        # Every live DDGS client, so close() can close them; dead threads' clients drop out.
+        self._ddgs_clients: "weakref.WeakSet[DDGS]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.session.post(url, **kwargs)
+
+    def ddgs(self) -> DDGS:
+        # DDGS is not thread-safe, so each thread reuses its own client across queries
+        # and backend attempts, keeping its connections to DuckDuckGo warm.
+        ddgs = getattr(self._local, "ddgs", None)
+        if ddgs is None:
+            ddgs = DDGS(timeout=self.ddgs_timeout)
+            self._local.ddgs = ddgs
+            with self._lock:
+                self._ddgs_clients.add(ddgs)
+        return ddgs
+
+    def discard_ddgs(self, ddgs: DDGS) -> None:
+        # A DDGS client refuses every call after its first error; the thread gets a new one.
+        if getattr(self._local, "ddgs", None) is ddgs:
+            self._local.ddgs = None
+        with self._lock:
+            self._ddgs_clients.discard(ddgs)
+        _close_ddgs(ddgs)
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._ddgs_clients)
+            self._ddgs_clients.clear()
+        for ddgs in clients:
+            _close_ddgs(ddgs)
+        self._local = threading.local()
+        self.session.close()
+
+
+def _close_ddgs(ddgs: DDGS) -> None:
+    try:
+        ddgs._close_session()
+    except Exception:
+        pass
+
+
+_default_client: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+
+def default_client() -> HttpClient:
+    # Process-wide client used when callers do not inject their own.
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+def resolve_client(client: Optional[HttpClient]) -> HttpClient:
+    return client if client is not None else default_client()
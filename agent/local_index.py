@@ -0,0 +1,179 @@
+# HTML title sniffing, SQLite FTS5 store and filesystem helpers.
+import html as html_lib
+import logging
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Per-thread SQLite connections shared with the cache; sentence splitting and query terms.
+from .cache import ThreadConnections
+from .relevance import query_terms, tokenize
+from .summarize import _split_sentences
+from .utils import domain_from_url, ensure_dir, score_domain
+
+INDEX_FILENAME = "index.sqlite3"
+# Oldest documents are dropped beyond this many, so the index cannot outgrow the cache.
+DEFAULT_MAX_DOCUMENTS = 5000
+# cache_first counts a page as a match only if it covers this share of the query terms.
+MIN_COVERAGE = 0.6
+
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.I | re.S)
+
+logger = logging.getLogger(__name__)
+
+
+def html_title(html: str) -> str:
+    match = _TITLE_RE.search(html[:65536]) if html else None
+    return " ".join(html_lib.unescape(match.group(1)).split()) if match else ""
+
+
+def _fts_query(terms: List[str]) -> str:
+    # Quote every term so user input can never be read as FTS5 query syntax.
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+@dataclass(slots=True)
+class LocalHit:
+    url: str
+    title: str
+    # Sum of the BM25 scores of the matching sentences; higher is better.
+    score: float
+    # Share of the query terms found in the matching sentences (0..1).
+    coverage: float
+    sentences: List[str] = field(default_factory=list)
+
+
+class LocalIndex:
+    """Persistent full-text index over extracted page text, one row per sentence.
+
+    Backed by an SQLite FTS5 table next to the cache. ``cached_extract`` adds
+    every page it extracts, so the index grows with the cache, and ``search``
+    ranks cached pages for a query with FTS5's BM25 in milliseconds.
+    """
+
+    def __init__(self, path: Path | str, max_documents: int = DEFAULT_MAX_DOCUMENTS) -> None:
+        self.path = Path(path)
+        self.max_documents = max_documents
+        ensure_dir(self.path.parent)
+        self._connections = ThreadConnections(self.path)
+        self._init_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    def _init_schema(self) -> None:
+        self._connection().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                url TEXT PRIMARY KEY,
+                title TEXT NOT NULL DEFAULT '',
+                indexed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS documents_indexed ON documents (indexed_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS sentences USING fts5(
+                url UNINDEXED, sentence, tokenize = 'unicode61 remove_diacritics 2'
+            );
+            """
+        )
+
+    def has(self, url: str) -> bool:
+        row = self._connection().execute("SELECT 1 FROM documents WHERE url = ?", (url,))
+        return row.fetchone() is not None
+
+    def add(self, url: str, text: str, title: str = "") -> None:
+        sentences = _split_sentences(text)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM sentences WHERE url = ?", (url,))
+            conn.executemany(
+                "INSERT INTO sentences (url, sentence) VALUES (?, ?)",
+                [(url, sentence) for sentence in sentences],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (url, title, indexed_at) VALUES (?, ?, ?)",
+                (url, title, time.time()),
+            )
+            self._trim(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def update(self, url: str, text: str, html: str = "", replace: bool = True) -> None:
+        # Called on the extraction path: a broken or busy index must never cost the source.
+        try:
+            if replace or not self.has(url):
+                self.add(url, text, html_title(html))
+        except sqlite3.Error:
+            logger.warning("Could not index %s", url, exc_info=True)
+
+    def search(self, query: str, limit: int = 10, max_sentences: int = 200) -> List[LocalHit]:
+        """Cached pages matching ``query``, best first, with their matching sentences."""
+        terms = query_terms(query)
+        if not terms:
+            return []
+        rows = self._connection().execute(
+            """
+            SELECT s.url, s.sentence, -bm25(sentences), d.title
+            FROM sentences AS s JOIN documents AS d ON d.url = s.url
+            WHERE sentences MATCH ?
+            ORDER BY bm25(sentences)
+            LIMIT ?
+            """,
+            (_fts_query(terms), max_sentences),
+        ).fetchall()
+
+        hits: Dict[str, LocalHit] = {}
+        found: Dict[str, set] = {}
+        wanted = set(terms)
+        for url, sentence, score, title in rows:
+            hit = hits.get(url)
+            if hit is None:
+                hit = hits[url] = LocalHit(url=url, title=title, score=0.0, coverage=0.0)
+                found[url] = set()
+            hit.score += score
+            hit.sentences.append(sentence)
+            found[url].update(wanted.intersection(tokenize(sentence)))
+        for url, hit in hits.items():
+            hit.coverage = len(found[url]) / len(wanted)
+        ranked = sorted(hits.values(), key=lambda hit: (-hit.coverage, -hit.score))
+        return ranked[:limit]
+
+    def document_count(self) -> int:
+        return int(self._connection().execute("SELECT COUNT(*) FROM documents").fetchone()[0])
+
+    def _trim(self, conn: sqlite3.Connection) -> None:
+        excess = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] - self.max_documents
+        if excess <= 0:
+            return
+        victims = conn.execute(
+            "SELECT url FROM documents ORDER BY indexed_at LIMIT ?", (excess,)
+        ).fetchall()
+        conn.executemany("DELETE FROM sentences WHERE url = ?", victims)
+        conn.executemany("DELETE FROM documents WHERE url = ?", victims)
+
+    def close(self) -> None:
+        self._connections.close()
+
+
+def open_local_index(cache_dir: Path | str | None) -> Optional[LocalIndex]:
+    # The index lives next to the cache; no cache directory means no index.
+    if cache_dir is None:
+        return None
+    return LocalIndex(Path(cache_dir) / INDEX_FILENAME)
+
+
+def local_result(hit: LocalHit) -> Dict[str, object]:
+    # Shaped like a provider result so the rest of the pipeline cannot tell the difference.
+    domain = domain_from_url(hit.url)
+    return {
+        "url": hit.url,
+        "title": hit.title or hit.url,
+        "snippet": hit.sentences[0] if hit.sentences else "",
+        "domain": domain,
+        "score": score_domain(domain),
+    }
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Literal, cast
+from typing import Any, Callable, Dict, List, Literal, Union, cast
 
 ProviderName = Literal["auto", "duckduckgo", "google_cse", "wikipedia"]
 PROVIDER_CHOICES: tuple[ProviderName, ...] = (
@@ -10,6 +11,15 @@ PROVIDER_CHOICES: tuple[ProviderName, ...] = (
     "google_cse",
     "wikipedia",
 )
+# full: fetch and summarize before answering; lazy: summarize on first read of the summary;
+# off: ranked results only.
+SummaryMode = Literal["full", "lazy", "off"]
+SUMMARY_MODES: tuple[SummaryMode, ...] = ("full", "lazy", "off")
+# off: always ask providers; cache_first: answer from the local index when it has enough
+# matching pages, else ask providers; offline: answer from the local index only.
+LocalSearchMode = Literal["off", "cache_first", "offline"]
+LOCAL_SEARCH_MODES: tuple[LocalSearchMode, ...] = ("off", "cache_first", "offline")
+
 
 def _coerce_bool(value: Any, default: bool = True) -> bool:
     if isinstance(value, bool):
@@ -21,39 +31,156 @@ def _coerce_bool(value: Any, default: bool = True) -> bool:
     return default
 
 
+def _coerce_int(value: Any, default: int, minimum: int, maximum: int) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = default
+    return max(minimum, min(maximum, number))
+
+
+def _coerce_float(value: Any, default: float, minimum: float, maximum: float) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = default
+    if number != number:
+        number = default
+    return max(minimum, min(maximum, number))
+
+
 @dataclass(slots=True)
 class SearchSettings:
     max_results: int = 10
     safe_search: bool = True
     provider: ProviderName = "auto"
+    # Upper bound on sources fetched and extracted at the same time.
+    max_workers: int = 4
+    # Auto mode only: start the next provider after this many seconds instead of
+    # waiting for the previous one to fail. None keeps the sequential cascade.
+    hedge_delay: float | None = None
+    # Providers started at once when hedging.
+    hedge_parallel: int = 1
+    # Seconds after the first good result set during which later sets are merged in.
+    hedge_merge_window: float = 0.0
+    # Total time budget for one query in seconds; None waits for every stage to finish.
+    deadline: float | None = None
+    # When sources are fetched and summarized; see SUMMARY_MODES.
+    summary_mode: SummaryMode = "full"
+    # Whether the local index of cached pages can answer; see LOCAL_SEARCH_MODES.
+    local_search: LocalSearchMode = "off"
+    # cache_first only: well-matching cached pages needed to skip the providers.
+    local_min_sources: int = 3
+    # Stop reading sources once this many distinct, relevant sentences were collected;
+    # None reads every extraction candidate.
+    evidence_sentences: int | None = None
+    # ...and they come from at least this many different domains.
+    evidence_domains: int = 2
 
     @classmethod
     def from_mapping(cls, payload: Dict[str, Any] | None) -> "SearchSettings":
         payload = payload or {}
+        # Slotted dataclasses do not expose field defaults as class attributes.
+        defaults = cls()
 
-        raw_max_results = payload.get("max_results", cls.max_results)
-        try:
-            max_results = int(raw_max_results)
-        except (TypeError, ValueError):
-            max_results = cls.max_results
-        max_results = max(1, min(30, max_results))
+        max_results = _coerce_int(
+            payload.get("max_results", defaults.max_results), defaults.max_results, 1, 30
+        )
 
-        provider_raw = str(payload.get("provider", cls.provider)).strip().lower()
+        provider_raw = str(payload.get("provider", defaults.provider)).strip().lower()
         provider: ProviderName
         if provider_raw in PROVIDER_CHOICES:
             provider = cast(ProviderName, provider_raw)
         else:
             provider = "auto"
 
-        safe_search = _coerce_bool(payload.get("safe_search", cls.safe_search), default=True)
+        safe_search = _coerce_bool(payload.get("safe_search", defaults.safe_search), default=True)
 
-        return cls(max_results=max_results, safe_search=safe_search, provider=provider)
+        max_workers = _coerce_int(
+            payload.get("max_workers", defaults.max_workers), defaults.max_workers, 1, 16
+        )
+
+        hedge_delay_raw = payload.get("hedge_delay", defaults.hedge_delay)
+        hedge_delay = (
+            None if hedge_delay_raw is None else _coerce_float(hedge_delay_raw, 1.5, 0.0, 30.0)
+        )
+        hedge_parallel = _coerce_int(
+            payload.get("hedge_parallel", defaults.hedge_parallel), defaults.hedge_parallel, 1, 7
+        )
+        hedge_merge_window = _coerce_float(
+            payload.get("hedge_merge_window", defaults.hedge_merge_window),
+            defaults.hedge_merge_window,
+            0.0,
+            30.0,
+        )
+
+        deadline_raw = payload.get("deadline", defaults.deadline)
+        deadline = None if deadline_raw is None else _coerce_float(deadline_raw, 20.0, 1.0, 300.0)
+
+        summary_mode_raw = str(payload.get("summary_mode", defaults.summary_mode)).strip().lower()
+        summary_mode: SummaryMode
+        if summary_mode_raw in SUMMARY_MODES:
+            summary_mode = cast(SummaryMode, summary_mode_raw)
+        else:
+            summary_mode = "full"
+
+        local_search_raw = str(payload.get("local_search", defaults.local_search)).strip().lower()
+        local_search: LocalSearchMode
+        if local_search_raw in LOCAL_SEARCH_MODES:
+            local_search = cast(LocalSearchMode, local_search_raw)
+        else:
+            local_search = "off"
+        local_min_sources = _coerce_int(
+            payload.get("local_min_sources", defaults.local_min_sources),
+            defaults.local_min_sources,
+            1,
+            10,
+        )
+
+        evidence_sentences_raw = payload.get("evidence_sentences", defaults.evidence_sentences)
+        evidence_sentences = (
+            None
+            if evidence_sentences_raw is None
+            else _coerce_int(evidence_sentences_raw, 10, 1, 50)
+        )
+        evidence_domains = _coerce_int(
+            payload.get("evidence_domains", defaults.evidence_domains),
+            defaults.evidence_domains,
+            1,
+            10,
+        )
+
+        return cls(
+            max_results=max_results,
+            safe_search=safe_search,
+            provider=provider,
+            max_workers=max_workers,
+            hedge_delay=hedge_delay,
+            hedge_parallel=hedge_parallel,
+            hedge_merge_window=hedge_merge_window,
+            deadline=deadline,
+            summary_mode=summary_mode,
+            local_search=local_search,
+            local_min_sources=local_min_sources,
+            evidence_sentences=evidence_sentences,
+            evidence_domains=evidence_domains,
+        )
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "max_results": self.max_results,
             "safe_search": self.safe_search,
             "provider": self.provider,
+            "max_workers": self.max_workers,
+            "hedge_delay": self.hedge_delay,
+            "hedge_parallel": self.hedge_parallel,
+            "hedge_merge_window": self.hedge_merge_window,
+            "deadline": self.deadline,
+            "summary_mode": self.summary_mode,
+            "local_search": self.local_search,
+            "local_min_sources": self.local_min_sources,
+            "evidence_sentences": self.evidence_sentences,
+            "evidence_domains": self.evidence_domains,
         }
 
 
@@ -92,6 +219,8 @@ class SearchResponse:
     summary: str = ""
     sources: List[str] = field(default_factory=list)
     error: str | None = None
+    # True when the deadline ran out and the answer only covers the stages that finished.
+    partial: bool = False
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -100,9 +229,121 @@ class SearchResponse:
             "summary": self.summary,
             "sources": self.sources,
             "error": self.error,
+            "partial": self.partial,
         }
 
 
+# SearchResponse's own storage for the fields LazySearchResponse computes on demand.
+_SUMMARY_SLOT = SearchResponse.__dict__["summary"]
+_SOURCES_SLOT = SearchResponse.__dict__["sources"]
+
+
+def _ignore_event(event: SearchEvent) -> None:
+    pass
+
+
+class LazySearchResponse(SearchResponse):
+    """A SearchResponse whose summary is only computed when it is first read.
+
+    Reading ``summary`` or ``sources`` (``to_dict`` reads both) calls
+    ``loader`` once, which fetches and summarizes the sources and returns the
+    full response; ``error`` and ``partial`` are taken from it as well.
+    Callers that only look at ``results`` never pay for the fetches. Callers
+    that want progress call ``load`` with a callback for the events of that
+    reading stage.
+    """
+
+    __slots__ = ("_loader", "_lock")
+
+    def __init__(
+        self,
+        query: str,
+        results: List[SearchResult],
+        loader: Callable[[Callable[[SearchEvent], None]], SearchResponse],
+    ) -> None:
+        self._loader: Callable[[Callable[[SearchEvent], None]], SearchResponse] | None = loader
+        self._lock = threading.Lock()
+        SearchResponse.__init__(self, query=query, results=results)
+
+    @property
+    def summary_loaded(self) -> bool:
+        return self._loader is None
+
+    @property  # type: ignore[override]
+    def summary(self) -> str:
+        self.load()
+        return _SUMMARY_SLOT.__get__(self)
+
+    @summary.setter
+    def summary(self, value: str) -> None:
+        _SUMMARY_SLOT.__set__(self, value)
+
+    @property  # type: ignore[override]
+    def sources(self) -> List[str]:
+        self.load()
+        return _SOURCES_SLOT.__get__(self)
+
+    @sources.setter
+    def sources(self, value: List[str]) -> None:
+        _SOURCES_SLOT.__set__(self, value)
+
+    def __repr__(self) -> str:
+        if self._loader is None:
+            return SearchResponse.__repr__(self)
+        return (
+            f"LazySearchResponse(query={self.query!r}, results={len(self.results)}, "
+            "summary=<pending>)"
+        )
+
+    def load(self, on_event: Callable[[SearchEvent], None] | None = None) -> None:
+        # Computes the summary now; a no-op once it is loaded.
+        if self._loader is None:
+            return
+        with self._lock:
+            # Readers that lost the race wait here until the first one has filled the fields.
+            if self._loader is None:
+                return
+            full = self._loader(on_event or _ignore_event)
+            _SUMMARY_SLOT.__set__(self, full.summary)
+            _SOURCES_SLOT.__set__(self, full.sources)
+            self.error = full.error
+            self.partial = full.partial
+            self._loader = None
+
+
+@dataclass(slots=True)
+class ResultsRanked:
+    # Provider results are in; nothing has been fetched yet.
+    query: str
+    results: List[SearchResult]
+    # How many of the top results will be fetched and summarized.
+    sources_to_read: int = 0
+
+
+@dataclass(slots=True)
+class SourceFetched:
+    url: str
+    # fetch_url status ("fetched", "cached", "revalidated", "stale"), "shared" when the page
+    # was read for an earlier stage or another query, or the failure reason.
+    status: str
+    ok: bool
+
+
+@dataclass(slots=True)
+class SourceExtracted:
+    url: str
+    bullets: List[str]
+
+
+@dataclass(slots=True)
+class SummaryReady:
+    # Always the last event of a run, including runs that end in an error.
+    response: SearchResponse
+
+
+SearchEvent = Union[ResultsRanked, SourceFetched, SourceExtracted, SummaryReady]
+
+
 @dataclass(slots=True)
 class UserPreferences:
     settings: SearchSettings = field(default_factory=SearchSettings)
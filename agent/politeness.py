@@ -0,0 +1,130 @@
+# asyncio/threading primitives, time for spacing, typing helpers.
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+# Crawl-delay comes from the shared robots cache; domains key the schedule.
+from .robots import ROBOTS_CACHE, RobotsCache
+from .utils import USER_AGENT, domain_from_url
+
+
+@dataclass(slots=True)
+class _DomainState:
+    semaphore: threading.BoundedSemaphore
+    next_start: float = 0.0
+    # Callers inside or waiting for a slot; idle states are dropped once their interval passed.
+    holders: int = 0
+    # asyncio semaphores are bound to one loop, so keep one per running loop.
+    async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = field(
+        default_factory=weakref.WeakKeyDictionary
+    )
+
+
+class PolitenessScheduler:
+    """Per-domain request spacing and concurrency limits.
+
+    Requests to one domain start at least ``min_interval`` seconds apart (or the
+    robots.txt Crawl-delay, capped at ``max_crawl_delay``) with at most
+    ``max_per_domain`` in flight. Requests to other domains are not delayed.
+    A domain's state is forgotten once nobody holds a slot and its next start
+    time has passed, so long-running processes only keep recently used hosts.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.5,
+        max_per_domain: int = 2,
+        respect_crawl_delay: bool = True,
+        max_crawl_delay: float = 10.0,
+        robots: RobotsCache | None = None,
+        user_agent: str = USER_AGENT,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_per_domain = max(1, max_per_domain)
+        self.respect_crawl_delay = respect_crawl_delay
+        self.max_crawl_delay = max_crawl_delay
+        self.robots = robots or ROBOTS_CACHE
+        self.user_agent = user_agent
+        self._domains: Dict[str, _DomainState] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        # Block the calling thread until this domain may be contacted again.
+        state = self._enter(domain_from_url(url))
+        try:
+            with state.semaphore:
+                wait = self._reserve(url, state)
+                if wait > 0:
+                    time.sleep(wait)
+                yield
+        finally:
+            self._leave(state)
+
+    @asynccontextmanager
+    async def async_slot(self, url: str) -> AsyncIterator[None]:
+        # Same schedule as slot(), but only the awaiting coroutine waits.
+        state = self._enter(domain_from_url(url))
+        try:
+            loop = asyncio.get_running_loop()
+            with self._lock:
+                semaphore = state.async_semaphores.get(loop)
+                if semaphore is None:
+                    semaphore = asyncio.Semaphore(self.max_per_domain)
+                    state.async_semaphores[loop] = semaphore
+            async with semaphore:
+                wait = self._reserve(url, state)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                yield
+        finally:
+            self._leave(state)
+
+    def interval_for(self, url: str) -> float:
+        interval = self.min_interval
+        if self.respect_crawl_delay:
+            crawl_delay: Optional[float] = self.robots.crawl_delay(url, self.user_agent)
+            if crawl_delay is not None:
+                interval = max(interval, min(crawl_delay, self.max_crawl_delay))
+        return interval
+
+    def _enter(self, domain: str) -> _DomainState:
+        with self._lock:
+            state = self._domains.get(domain)
+            if state is None:
+                # A new host is a good moment to forget the ones that went quiet.
+                self._prune(time.monotonic())
+                state = _DomainState(semaphore=threading.BoundedSemaphore(self.max_per_domain))
+                self._domains[domain] = state
+            state.holders += 1
+            return state
+
+    def _leave(self, state: _DomainState) -> None:
+        with self._lock:
+            state.holders -= 1
+
+    def _prune(self, now: float) -> None:
+        idle = [
+            domain
+            for domain, state in self._domains.items()
+            if state.holders == 0 and state.next_start <= now
+        ]
+        for domain in idle:
+            del self._domains[domain]
+
+    def _reserve(self, url: str, state: _DomainState) -> float:
+        # Claim the next start time for this domain and return how long to wait for it.
+        interval = self.interval_for(url)
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, state.next_start)
+            state.next_start = start + interval
+        return start - now
+
+
+# Process-wide schedule so separate engines still share each domain's budget.
+POLITENESS = PolitenessScheduler()
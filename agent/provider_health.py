@@ -0,0 +1,211 @@
+# Percentiles, threading for shared state, time for latencies and cool-downs.
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Sequence, Tuple, TypeVar
+
+# Circuit states.
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Call outcomes.
+OK = "ok"
+EMPTY = "empty"
+ERROR = "error"
+RATE_LIMITED = "rate_limited"
+
+Stage = TypeVar("Stage", bound=Tuple)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    # requests/aiohttp HTTP 429s and duckduckgo_search's RatelimitException.
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "status", None)
+    return status == 429 or "ratelimit" in type(error).__name__.lower()
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    # Nearest-rank percentile of an unsorted sample.
+    ordered = sorted(values)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+@dataclass(slots=True)
+class _ProviderState:
+    # (outcome, latency in seconds) for the most recent calls.
+    calls: Deque[Tuple[str, float]]
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    opened_until: float = 0.0
+    trial_in_flight: bool = False
+    total_calls: int = 0
+    rate_limited: int = 0
+
+    def latencies(self) -> List[float]:
+        return [latency for _, latency in self.calls]
+
+    def success_rate(self) -> float:
+        if not self.calls:
+            return 1.0
+        good = sum(1 for outcome, _ in self.calls if outcome in (OK, EMPTY))
+        return good / len(self.calls)
+
+
+class ProviderHealth:
+    """Per-provider success rates, latencies and circuit breakers.
+
+    A provider's circuit opens after ``failure_threshold`` consecutive errors
+    (for ``cooldown`` seconds) or immediately on a rate-limit response (for
+    ``rate_limit_cooldown`` seconds). Once the cool-down passes a single trial
+    call is let through; success closes the circuit, failure re-opens it.
+    ``order`` puts providers with a poor success rate or slow median latency
+    behind the healthy ones and drops open circuits; when every circuit is
+    open, the one whose cool-down ends first is half-opened early for a probe.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown: float = 60.0,
+        rate_limit_cooldown: float = 300.0,
+        window: int = 50,
+        min_samples: int = 3,
+        min_success_rate: float = 0.5,
+        slow_latency: float = 8.0,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.rate_limit_cooldown = rate_limit_cooldown
+        self.window = window
+        self.min_samples = min_samples
+        self.min_success_rate = min_success_rate
+        self.slow_latency = slow_latency
+        self._providers: Dict[str, _ProviderState] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, latency: float, outcome: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(name)
+            state.calls.append((outcome, latency))
+            state.total_calls += 1
+            state.trial_in_flight = False
+            if outcome in (OK, EMPTY):
+                state.consecutive_failures = 0
+                state.state = CLOSED
+                return
+            state.consecutive_failures += 1
+            if outcome == RATE_LIMITED:
+                state.rate_limited += 1
+                self._open(state, now + self.rate_limit_cooldown)
+            elif state.state == HALF_OPEN or state.consecutive_failures >= self.failure_threshold:
+                self._open(state, now + self.cooldown)
+
+    def record_result(self, name: str, latency: float, results: Sequence[object]) -> None:
+        self.record(name, latency, OK if results else EMPTY)
+
+    def record_error(self, name: str, latency: float, error: BaseException) -> None:
+        self.record(name, latency, RATE_LIMITED if is_rate_limit_error(error) else ERROR)
+
+    def available(self, name: str) -> bool:
+        # Claims the half-open trial slot, so only call this right before calling the provider.
+        now = time.monotonic()
+        with self._lock:
+            state = self._providers.get(name)
+            if state is None or state.state == CLOSED:
+                return True
+            if state.state == OPEN and now >= state.opened_until:
+                state.state = HALF_OPEN
+                state.trial_in_flight = False
+            if state.state == HALF_OPEN and not state.trial_in_flight:
+                state.trial_in_flight = True
+                return True
+            return False
+
+    def order(self, stages: Sequence[Stage]) -> List[Stage]:
+        """Sort ``(name, ...)`` stages by health, dropping providers that are cooling down.
+
+        Healthy or unmeasured providers keep their given order; degraded ones
+        follow, best success rate first.
+        """
+        now = time.monotonic()
+        healthy: List[Stage] = []
+        degraded: List[Tuple[float, float, int, Stage]] = []
+        cooling: List[Tuple[float, int, Stage]] = []
+        with self._lock:
+            for index, stage in enumerate(stages):
+                state = self._providers.get(stage[0])
+                if state is None:
+                    healthy.append(stage)
+                    continue
+                if state.state != CLOSED and now < state.opened_until:
+                    cooling.append((state.opened_until, index, stage))
+                    continue
+                if len(state.calls) < self.min_samples:
+                    healthy.append(stage)
+                    continue
+                success_rate = state.success_rate()
+                median = _percentile(state.latencies(), 0.5)
+                if (
+                    state.state == CLOSED
+                    and success_rate >= self.min_success_rate
+                    and median <= self.slow_latency
+                ):
+                    healthy.append(stage)
+                else:
+                    degraded.append((-success_rate, median, index, stage))
+            if stages and not healthy and not degraded:
+                # Never go silent for a whole cool-down: probe the provider due back first.
+                _, _, stage = min(cooling, key=lambda entry: entry[:2])
+                state = self._providers[stage[0]]
+                if state.state == OPEN:
+                    state.state = HALF_OPEN
+                    state.trial_in_flight = False
+                return [stage]
+        degraded.sort(key=lambda entry: entry[:3])
+        return healthy + [entry[-1] for entry in degraded]
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """Current per-provider stats, suitable for logging or a debug view."""
+        now = time.monotonic()
+        stats: Dict[str, Dict[str, object]] = {}
+        with self._lock:
+            for name, state in sorted(self._providers.items()):
+                latencies = state.latencies()
+                empty = sum(1 for outcome, _ in state.calls if outcome == EMPTY)
+                open_for = state.opened_until - now if state.state == OPEN else 0.0
+                stats[name] = {
+                    "state": state.state,
+                    "calls": state.total_calls,
+                    "success_rate": round(state.success_rate(), 3),
+                    "empty_rate": round(empty / len(state.calls), 3) if state.calls else 0.0,
+                    "p50_ms": round(_percentile(latencies, 0.5) * 1000) if latencies else None,
+                    "p95_ms": round(_percentile(latencies, 0.95) * 1000) if latencies else None,
+                    "consecutive_failures": state.consecutive_failures,
+                    "rate_limited": state.rate_limited,
+                    "retry_in": round(max(0.0, open_for), 1),
+                }
+        return stats
+
+    def reset(self) -> None:
+        with self._lock:
+            self._providers.clear()
+
+    def _state(self, name: str) -> _ProviderState:
+        state = self._providers.get(name)
+        if state is None:
+            state = _ProviderState(calls=deque(maxlen=self.window))
+            self._providers[name] = state
+        return state
+
+    def _open(self, state: _ProviderState, until: float) -> None:
+        state.state = OPEN
+        state.opened_until = max(state.opened_until, until)
+
+
+# Process-wide registry so every engine learns from every query.
+PROVIDER_HEALTH = ProviderHealth()
@@ -0,0 +1,101 @@
+# JSON payloads, threading for shared state, time for TTLs, Unicode normalization.
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Optional persistent tier.
+from .cache import CacheBackend, monotonic_expiry, put_best_effort
+
+# Ranked result lists as returned by search.search_web.
+Results = List[Dict[str, object]]
+
+
+def normalize_query(query: str) -> str:
+    # Case, Unicode form and whitespace differences should not miss the cache.
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def query_cache_key(query: str, provider: str, safe_search: bool, max_results: int) -> str:
+    safe_mode = "safe" if safe_search else "off"
+    parts = (provider.strip().lower(), safe_mode, str(max_results), normalize_query(query))
+    return "|".join(parts)
+
+
+@dataclass(slots=True)
+class _QueryEntry:
+    results: Results
+    expires_at: float
+
+
+class QueryCache:
+    """TTL cache for ranked search results keyed by normalized query and options.
+
+    Recent answers are held in an in-memory LRU of ``max_entries``. Given a
+    cache backend, results are also persisted there (kind ``"query"``) so a
+    restarted process can reuse them. Empty result lists are never cached.
+    """
+
+    def __init__(self, ttl: float = 900.0, max_entries: int = 256) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _QueryEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, cache: CacheBackend | None = None) -> Optional[Results]:
+        results = self._memory_get(key)
+        if results is None and cache is not None:
+            results = self._persisted_get(key, cache)
+        # Callers may mutate the dicts, so never hand out the cached ones.
+        return [dict(result) for result in results] if results is not None else None
+
+    def put(self, key: str, results: Results, cache: CacheBackend | None = None) -> None:
+        if not results or self.ttl <= 0:
+            return
+        stored = [dict(result) for result in results]
+        fetched_at = time.time()
+        self._memory_put(key, stored, fetched_at)
+        if cache is not None:
+            put_best_effort(cache, "query", key, json.dumps(stored), {"fetched_at": fetched_at})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _memory_get(self, key: str) -> Optional[Results]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry.results
+
+    def _memory_put(self, key: str, results: Results, fetched_at: float) -> None:
+        entry = _QueryEntry(results=results, expires_at=monotonic_expiry(fetched_at, self.ttl))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _persisted_get(self, key: str, cache: CacheBackend) -> Optional[Results]:
+        try:
+            stored = cache.get("query", key)
+            if stored is None:
+                return None
+            fetched_at = float(stored.meta["fetched_at"])
+            if time.time() - fetched_at >= self.ttl:
+                return None
+            results = json.loads(stored.value)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not isinstance(results, list) or not results:
+            return None
+        self._memory_put(key, results, fetched_at)
+        return results
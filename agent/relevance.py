@@ -0,0 +1,73 @@
+# Regex tokenizer, math for IDF, Counter for term frequencies.
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+_TOKEN_RE = re.compile(r"\w+")
+# Question words and glue that say nothing about what a sentence should contain.
+STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by can did do does for from had has have how i in
+    into is it its of on or so than that the their them then there these they this to
+    was were what when where which who whom why will with would you your about tell me
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def query_terms(query: str) -> List[str]:
+    # Distinct content words of the query, in order; all of them if every word is a stopword.
+    tokens = list(dict.fromkeys(tokenize(query)))
+    return [token for token in tokens if token not in STOPWORDS] or tokens
+
+
+class SentenceIndex:
+    """In-memory inverted index over candidate sentences, ranked with Okapi BM25.
+
+    Built once per query over every sentence that could go into the answer;
+    only the postings of the query terms are touched when scoring, so scoring
+    costs are proportional to how often the query terms occur.
+    """
+
+    def __init__(self, sentences: Sequence[str], k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.size = len(sentences)
+        self._lengths: List[int] = []
+        # term -> [(sentence index, term frequency)]
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        for index, sentence in enumerate(sentences):
+            counts = Counter(tokenize(sentence))
+            self._lengths.append(sum(counts.values()))
+            for term, frequency in counts.items():
+                self._postings.setdefault(term, []).append((index, frequency))
+        average_length = sum(self._lengths) / self.size if self.size else 0.0
+        # Per-sentence length normalization, the only part of BM25 that does not depend on a term.
+        self._norms = [
+            k1 * (1.0 - b + b * length / average_length) if average_length else k1
+            for length in self._lengths
+        ]
+
+    def idf(self, term: str) -> float:
+        # Lucene's smoothed IDF stays positive even for terms in most sentences.
+        matching = len(self._postings.get(term, ()))
+        return math.log(1.0 + (self.size - matching + 0.5) / (matching + 0.5))
+
+    def scores(self, terms: Sequence[str]) -> List[float]:
+        scores = [0.0] * self.size
+        for term in dict.fromkeys(terms):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            boost = idf * (self.k1 + 1.0)
+            for index, frequency in postings:
+                scores[index] += boost * frequency / (frequency + self._norms[index])
+        return scores
+
+    def rank(self, query: str) -> List[float]:
+        return self.scores(query_terms(query))
@@ -0,0 +1,211 @@
+# Threading for shared state, time for TTLs.
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+# HTTP client.
+import requests
+
+# Cache backends, pooled HTTP client and shared constants.
+from .cache import CacheBackend, monotonic_expiry, put_best_effort
+from .http_client import HttpClient, resolve_client
+from .utils import USER_AGENT
+
+# Status recorded when robots.txt could not be downloaded at all.
+UNREACHABLE = 0
+
+
+def robots_url(url: str) -> str:
+    # Build the robots.txt URL for a given page URL.
+    parsed = urlparse(url)
+    return urljoin(f"{parsed.scheme}://{parsed.netloc}", "/robots.txt")
+
+
+def robots_origin(url: str) -> str:
+    # Cache key: robots.txt rules apply per scheme + host (+ port).
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+
+def robots_parser_from_response(location: str, status: int, text: str) -> RobotFileParser:
+    # Mirror RobotFileParser.read(): 401/403 deny everything, other 4xx allow everything.
+    # An unreachable robots.txt parses as empty, which allows everything.
+    rp = RobotFileParser()
+    rp.set_url(location)
+    if status in (401, 403):
+        rp.disallow_all = True
+    elif 400 <= status < 500:
+        rp.allow_all = True
+    elif status < 400:
+        rp.parse(text.splitlines())
+    return rp
+
+
+@dataclass(slots=True)
+class _RobotsEntry:
+    parser: RobotFileParser
+    status: int
+    expires_at: float
+
+
+class RobotsCache:
+    """Thread-safe robots.txt cache keyed by scheme + host.
+
+    Successful lookups live for ``ttl`` seconds. Unreachable or 5xx robots files
+    are cached for the shorter ``negative_ttl`` so a dead host is not retried on
+    every URL. Given a cache backend the raw robots.txt is also persisted
+    there and reused across processes.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        negative_ttl: float = 300.0,
+        timeout: float = 10.0,
+        max_entries: int = 1024,
+    ) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _RobotsEntry]" = OrderedDict()
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def allowed(
+        self,
+        url: str,
+        user_agent: str = USER_AGENT,
+        timeout: float | None = None,
+        cache: CacheBackend | None = None,
+        client: HttpClient | None = None,
+    ) -> bool:
+        # Ask the parser whether the user agent is allowed to fetch this URL.
+        rp = self.parser_for(url, timeout=timeout, cache=cache, client=client)
+        return rp.can_fetch(user_agent, url)
+
+    def crawl_delay(self, url: str, user_agent: str = USER_AGENT) -> Optional[float]:
+        # Crawl-delay from an already cached robots.txt; never triggers a download.
+        entry = self._memory_get(robots_origin(url))
+        if entry is None:
+            return None
+        delay = entry.parser.crawl_delay(user_agent)
+        return float(delay) if delay is not None else None
+
+    def parser_for(
+        self,
+        url: str,
+        timeout: float | None = None,
+        cache: CacheBackend | None = None,
+        client: HttpClient | None = None,
+    ) -> RobotFileParser:
+        origin = robots_origin(url)
+        cached = self.get(url, cache)
+        if cached is not None:
+            return cached
+
+        # Only one thread downloads a given host's robots.txt; the rest wait for it.
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(origin, threading.Lock())
+        with fetch_lock:
+            cached = self.get(url, cache)
+            if cached is not None:
+                return cached
+            status, text = self._download(robots_url(url), timeout or self.timeout, client)
+            return self.store(url, status, text, cache)
+
+    def get(self, url: str, cache: CacheBackend | None = None) -> Optional[RobotFileParser]:
+        # Memory first, then the persistent layer; None means the caller must download it.
+        origin = robots_origin(url)
+        entry = self._memory_get(origin)
+        if entry is None and cache is not None:
+            entry = self._persisted_get(origin, cache)
+            if entry is not None:
+                self._memory_put(origin, entry)
+        return entry.parser if entry is not None else None
+
+    def store(
+        self, url: str, status: int, text: str, cache: CacheBackend | None = None
+    ) -> RobotFileParser:
+        # Record a downloaded (or failed) robots.txt and return its parser.
+        origin = robots_origin(url)
+        fetched_at = time.time()
+        entry = self._make_entry(origin, status, text, fetched_at)
+        self._memory_put(origin, entry)
+        if cache is not None:
+            self._persisted_put(origin, status, text, fetched_at, cache)
+        return entry.parser
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._fetch_locks.clear()
+
+    def _download(
+        self, location: str, timeout: float, client: HttpClient | None
+    ) -> Tuple[int, str]:
+        try:
+            resp = resolve_client(client).get(
+                location, headers={"User-Agent": USER_AGENT}, timeout=timeout
+            )
+        except requests.RequestException:
+            return UNREACHABLE, ""
+        return resp.status_code, resp.text if resp.status_code < 400 else ""
+
+    def _lifetime(self, status: int) -> float:
+        if status == UNREACHABLE or status >= 500:
+            return self.negative_ttl
+        return self.ttl
+
+    def _make_entry(self, origin: str, status: int, text: str, fetched_at: float) -> _RobotsEntry:
+        expires_at = monotonic_expiry(fetched_at, self._lifetime(status))
+        parser = robots_parser_from_response(f"{origin}/robots.txt", status, text)
+        return _RobotsEntry(parser=parser, status=status, expires_at=expires_at)
+
+    def _memory_get(self, origin: str) -> Optional[_RobotsEntry]:
+        with self._lock:
+            entry = self._entries.get(origin)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[origin]
+                # The origin's fetch lock goes with its entry, so locks stay as bounded.
+                self._fetch_locks.pop(origin, None)
+                return None
+            self._entries.move_to_end(origin)
+            return entry
+
+    def _memory_put(self, origin: str, entry: _RobotsEntry) -> None:
+        with self._lock:
+            self._entries[origin] = entry
+            self._entries.move_to_end(origin)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._fetch_locks.pop(evicted, None)
+
+    def _persisted_get(self, origin: str, cache: CacheBackend) -> Optional[_RobotsEntry]:
+        try:
+            stored = cache.get("robots", origin)
+            if stored is None:
+                return None
+            status = int(stored.meta["status"])
+            fetched_at = float(stored.meta["fetched_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if time.time() - fetched_at >= self._lifetime(status):
+            return None
+        return self._make_entry(origin, status, stored.value, fetched_at)
+
+    def _persisted_put(
+        self, origin: str, status: int, text: str, fetched_at: float, cache: CacheBackend
+    ) -> None:
+        meta = {"status": status, "fetched_at": fetched_at}
+        put_best_effort(cache, "robots", origin, text, meta)
+
+
+# Process-wide cache shared by every engine and thread.
+ROBOTS_CACHE = RobotsCache()
@@ -1,30 +1,90 @@
 # Environment variables for API keys, typing helpers, and URL parsing.
 import logging
 import os
-from typing import Dict, List, Tuple
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
 from urllib.parse import parse_qs, unquote, urlparse
 
-# HTTP client and search/HTML parsing helpers.
-import requests
-from duckduckgo_search import DDGS
+# Search/HTML parsing helpers.
 from bs4 import BeautifulSoup
 
+# Pooled HTTP client shared with the fetch layer.
+from .cache import CacheBackend
+from .deadline import Deadline, bounded_timeout, expired
+from .http_client import HttpClient, resolve_client
+from .provider_health import ProviderHealth
+from .query_cache import QueryCache, query_cache_key
 # URL normalization and domain scoring utilities.
 from .utils import canonicalize_url, domain_from_url, score_domain
 
 VALID_PROVIDERS = {"auto", "duckduckgo", "google_cse", "wikipedia"}
+DDGS_BACKENDS = ("api", "html", "lite")
+# Browser-like headers for the DDG HTML/lite scrapers.
+DDG_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+DDG_HTML_ENDPOINTS = (
+    ("https://duckduckgo.com/html/", "post"),
+    ("https://html.duckduckgo.com/html/", "post"),
+    ("https://duckduckgo.com/html/", "get"),
+)
+DDG_LITE_URL = "https://duckduckgo.com/lite/"
+WIKI_API_URL = "https://en.wikipedia.org/w/api.php"
+GOOGLE_CSE_URL = "https://www.googleapis.com/customsearch/v1"
 logger = logging.getLogger(__name__)
 
 
+def _result_entry(url: str, title: str, snippet: str) -> Dict[str, str]:
+    # Shape a provider hit into the dict every caller expects.
+    domain = domain_from_url(url)
+    return {
+        "url": url,
+        "title": title,
+        "snippet": snippet,
+        "domain": domain,
+        "score": score_domain(domain),
+    }
+
+
+def _normalize_ddgs_results(raw_results: Iterable[Dict[str, str]]) -> List[Dict[str, str]]:
+    # Normalize and de-duplicate duckduckgo_search hits.
+    results: List[Dict[str, str]] = []
+    seen = set()
+    for r in raw_results:
+        # Normalize and validate URLs before storing.
+        url = r.get("href") or r.get("url") or ""
+        if not url.startswith("http"):
+            continue
+        url = canonicalize_url(url)
+        if url in seen:
+            continue
+        seen.add(url)
+        # Capture metadata needed for summarization and ranking.
+        results.append(_result_entry(url, r.get("title") or "", r.get("body") or ""))
+    return results
+
+
 def _collect_results(
-    query: str, max_results: int, backend: str, safe_search: bool = True
+    query: str,
+    max_results: int,
+    backend: str,
+    safe_search: bool = True,
+    client: HttpClient | None = None,
 ) -> List[Dict[str, str]]:
     # Primary DDG search via the duckduckgo_search library.
-    results: List[Dict[str, str]] = []
-    seen = set()
     safe_mode = "moderate" if safe_search else "off"
+    client = resolve_client(client)
+    ddgs = client.ddgs()
 
-    with DDGS() as ddgs:
+    try:
         try:
             ddg_iterator = ddgs.text(
                 query,
@@ -35,31 +95,11 @@ def _collect_results(
         except TypeError:
             # Compatibility with older versions that do not expose safesearch.
             ddg_iterator = ddgs.text(query, max_results=max_results, backend=backend)
+    except Exception:
+        client.discard_ddgs(ddgs)
+        raise
 
-        for r in ddg_iterator:
-            # Normalize and validate URLs before storing.
-            url = r.get("href") or r.get("url") or ""
-            if not url.startswith("http"):
-                continue
-            url = canonicalize_url(url)
-            if url in seen:
-                continue
-            seen.add(url)
-            # Capture metadata needed for summarization and ranking.
-            title = r.get("title") or ""
-            snippet = r.get("body") or ""
-            domain = domain_from_url(url)
-            results.append(
-                {
-                    "url": url,
-                    "title": title,
-                    "snippet": snippet,
-                    "domain": domain,
-                    "score": score_domain(domain),
-                }
-            )
-
-    return results
+    return _normalize_ddgs_results(ddg_iterator or [])
 
 
 def _decode_ddg_url(raw_url: str) -> str:
@@ -75,166 +115,155 @@ def _decode_ddg_url(raw_url: str) -> str:
     return raw_url
 
 
-def _ddg_html_search(query: str, max_results: int = 10) -> List[Dict[str, str]]:
-    # Fallback search by scraping DDG HTML endpoints.
+def _parse_ddg_links(
+    html: str,
+    selector: str,
+    max_results: int,
+    results: List[Dict[str, str]],
+    seen: set,
+) -> None:
+    # Append result links from a DDG HTML/lite page until max_results is reached.
+    soup = BeautifulSoup(html, "lxml")
+    for a in soup.select(selector):
+        href = a.get("href") or ""
+        title = a.get_text(strip=True) or ""
+        href = _decode_ddg_url(href)
+        if not href.startswith("http"):
+            continue
+        href = canonicalize_url(href)
+        if href in seen:
+            continue
+        seen.add(href)
+        results.append(_result_entry(href, title, ""))
+        if len(results) >= max_results:
+            return
+
+
+def _parse_wiki_results(data: Dict[str, object]) -> List[Dict[str, str]]:
+    # Convert MediaWiki search API JSON into result dicts.
     results: List[Dict[str, str]] = []
     seen = set()
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        ),
-        "Accept-Language": "en-US,en;q=0.9",
+    for item in data.get("query", {}).get("search", []):
+        # Convert titles into canonical article URLs.
+        title = item.get("title") or ""
+        if not title:
+            continue
+        url = f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
+        url = canonicalize_url(url)
+        if url in seen:
+            continue
+        seen.add(url)
+        results.append(_result_entry(url, title, item.get("snippet") or ""))
+    return results
+
+
+def _parse_google_cse_items(
+    items: List[Dict[str, str]],
+    max_results: int,
+    results: List[Dict[str, str]],
+    seen: set,
+) -> None:
+    for item in items:
+        # Extract URL metadata and score by domain.
+        url = item.get("link") or ""
+        if not url.startswith("http"):
+            continue
+        url = canonicalize_url(url)
+        if url in seen:
+            continue
+        seen.add(url)
+        results.append(_result_entry(url, item.get("title") or "", item.get("snippet") or ""))
+        if len(results) >= max_results:
+            return
+
+
+def _wiki_params(query: str, max_results: int) -> Dict[str, object]:
+    return {
+        "action": "query",
+        "list": "search",
+        "srsearch": query,
+        "srlimit": max_results,
+        "format": "json",
     }
-    endpoints = [
-        ("https://duckduckgo.com/html/", "post"),
-        ("https://html.duckduckgo.com/html/", "post"),
-        ("https://duckduckgo.com/html/", "get"),
-    ]
 
-    for url, method in endpoints:
+
+def _google_cse_credentials() -> Tuple[str | None, str | None]:
+    api_key = os.getenv("GOOGLE_CSE_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    return api_key, os.getenv("GOOGLE_CSE_ID")
+
+
+def _ddg_html_search(
+    query: str, max_results: int = 10, client: HttpClient | None = None, timeout: float = 15
+) -> List[Dict[str, str]]:
+    # Fallback search by scraping DDG HTML endpoints.
+    client = resolve_client(client)
+    results: List[Dict[str, str]] = []
+    seen = set()
+    answered = False
+    last_error: Exception | None = None
+
+    for url, method in DDG_HTML_ENDPOINTS:
         try:
             # Try multiple endpoints and methods to maximize reliability.
             if method == "post":
-                resp = requests.post(url, data={"q": query}, headers=headers, timeout=15)
+                resp = client.post(url, data={"q": query}, headers=DDG_HEADERS, timeout=timeout)
             else:
-                resp = requests.get(url, params={"q": query}, headers=headers, timeout=15)
+                resp = client.get(url, params={"q": query}, headers=DDG_HEADERS, timeout=timeout)
             resp.raise_for_status()
+            answered = True
             # Parse the HTML search results and extract links.
-            soup = BeautifulSoup(resp.text, "lxml")
-            for a in soup.select("a.result__a"):
-                href = a.get("href") or ""
-                title = a.get_text(strip=True) or ""
-                href = _decode_ddg_url(href)
-                if not href.startswith("http"):
-                    continue
-                href = canonicalize_url(href)
-                if href in seen:
-                    continue
-                seen.add(href)
-                domain = domain_from_url(href)
-                snippet = ""
-                results.append(
-                    {
-                        "url": href,
-                        "title": title,
-                        "snippet": snippet,
-                        "domain": domain,
-                        "score": score_domain(domain),
-                    }
-                )
-                if len(results) >= max_results:
-                    return results
+            _parse_ddg_links(resp.text, "a.result__a", max_results, results, seen)
             if results:
                 return results
-        except Exception:
+        except Exception as error:
             # Move to the next endpoint if this one fails.
+            last_error = error
             continue
+    # Report a failure (for provider health) only when no endpoint answered at all.
+    if not answered and last_error is not None:
+        raise last_error
     return results
 
 
-def _ddg_lite_search(query: str, max_results: int = 10) -> List[Dict[str, str]]:
+def _ddg_lite_search(
+    query: str, max_results: int = 10, client: HttpClient | None = None, timeout: float = 15
+) -> List[Dict[str, str]]:
     # Additional fallback using the DDG lite UI.
+    client = resolve_client(client)
     results: List[Dict[str, str]] = []
     seen = set()
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        ),
-        "Accept-Language": "en-US,en;q=0.9",
-    }
-    try:
-        # Request the lite interface and parse its links.
-        resp = requests.get(
-            "https://duckduckgo.com/lite/",
-            params={"q": query},
-            headers=headers,
-            timeout=15,
-        )
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "lxml")
-        for a in soup.select("a.result-link"):
-            href = a.get("href") or ""
-            title = a.get_text(strip=True) or ""
-            href = _decode_ddg_url(href)
-            if not href.startswith("http"):
-                continue
-            href = canonicalize_url(href)
-            if href in seen:
-                continue
-            seen.add(href)
-            domain = domain_from_url(href)
-            results.append(
-                {
-                    "url": href,
-                    "title": title,
-                    "snippet": "",
-                    "domain": domain,
-                    "score": score_domain(domain),
-                }
-            )
-            if len(results) >= max_results:
-                break
-    except Exception:
-        return results
+    # Request the lite interface and parse its links; errors propagate to the caller.
+    resp = client.get(
+        DDG_LITE_URL,
+        params={"q": query},
+        headers=DDG_HEADERS,
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    _parse_ddg_links(resp.text, "a.result-link", max_results, results, seen)
     return results
 
 
-def _wiki_search(query: str, max_results: int = 10) -> List[Dict[str, str]]:
+def _wiki_search(
+    query: str, max_results: int = 10, client: HttpClient | None = None, timeout: float = 10
+) -> List[Dict[str, str]]:
     # Wikipedia API fallback for broad topics.
-    results: List[Dict[str, str]] = []
-    seen = set()
-    params = {
-        "action": "query",
-        "list": "search",
-        "srsearch": query,
-        "srlimit": max_results,
-        "format": "json",
-    }
-    try:
-        # Use the MediaWiki search API.
-        resp = requests.get(
-            "https://en.wikipedia.org/w/api.php", params=params, timeout=10
-        )
-        resp.raise_for_status()
-        data = resp.json()
-    except Exception:
-        return results
-
-    for item in data.get("query", {}).get("search", []):
-        # Convert titles into canonical article URLs.
-        title = item.get("title") or ""
-        if not title:
-            continue
-        url = f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
-        url = canonicalize_url(url)
-        if url in seen:
-            continue
-        seen.add(url)
-        domain = domain_from_url(url)
-        snippet = item.get("snippet") or ""
-        results.append(
-            {
-                "url": url,
-                "title": title,
-                "snippet": snippet,
-                "domain": domain,
-                "score": score_domain(domain),
-            }
-        )
-    return results
-
-
-def _google_cse_search(query: str, max_results: int = 10) -> List[Dict[str, str]]:
-    # Optional Google Custom Search fallback (requires env vars).
-    api_key = os.getenv("GOOGLE_CSE_API_KEY") or os.getenv("GOOGLE_API_KEY")
-    cse_id = os.getenv("GOOGLE_CSE_ID")
+    client = resolve_client(client)
+    # Use the MediaWiki search API; errors propagate to the caller.
+    resp = client.get(WIKI_API_URL, params=_wiki_params(query, max_results), timeout=timeout)
+    resp.raise_for_status()
+    return _parse_wiki_results(resp.json())
+
+
+def _google_cse_search(
+    query: str, max_results: int = 10, client: HttpClient | None = None, timeout: float = 15
+) -> Iterator[List[Dict[str, str]]]:
+    # Optional Google Custom Search fallback (requires env vars); yields one page at a time.
+    api_key, cse_id = _google_cse_credentials()
     if not api_key or not cse_id:
-        return []
+        return
 
+    client = resolve_client(client)
     results: List[Dict[str, str]] = []
     seen = set()
     start = 1
@@ -248,68 +277,238 @@ def _google_cse_search(query: str, max_results: int = 10) -> List[Dict[str, str]
         }
         try:
             # Call the CSE API and parse JSON results.
-            resp = requests.get(
-                "https://www.googleapis.com/customsearch/v1",
-                params=params,
-                timeout=15,
-            )
+            resp = client.get(GOOGLE_CSE_URL, params=params, timeout=timeout)
             resp.raise_for_status()
             data = resp.json()
         except Exception:
+            # Keep the pages already collected; fail only if there are none.
+            if not results:
+                raise
             break
 
         items = data.get("items", [])
         if not items:
             break
-        for item in items:
-            # Extract URL metadata and score by domain.
-            url = item.get("link") or ""
-            if not url.startswith("http"):
-                continue
-            url = canonicalize_url(url)
-            if url in seen:
-                continue
-            seen.add(url)
-            title = item.get("title") or ""
-            snippet = item.get("snippet") or ""
-            domain = domain_from_url(url)
-            results.append(
-                {
-                    "url": url,
-                    "title": title,
-                    "snippet": snippet,
-                    "domain": domain,
-                    "score": score_domain(domain),
-                }
-            )
-            if len(results) >= max_results:
-                break
+        collected = len(results)
+        _parse_google_cse_items(items, max_results, results, seen)
+        yield results[collected:]
         start += len(items)
         # Google CSE only supports a limited pagination window.
         if start > 91:
             break
+
+
+# A provider returns its results as one list, or yields them a page at a time.
+ProviderOutput = List[Dict[str, str]] | Iterator[List[Dict[str, str]]]
+ResultsCallback = Callable[[List[Dict[str, str]]], None]
+ProviderStage = Tuple[str, Callable[[], ProviderOutput]]
+
+
+def _bounded_call(
+    search: Callable[..., ProviderOutput],
+    cap: float,
+    deadline: Deadline | None,
+    **kwargs: object,
+) -> Callable[[], ProviderOutput]:
+    def run() -> ProviderOutput:
+        return search(timeout=bounded_timeout(deadline, cap), **kwargs)
+
+    return run
+
+
+def _provider_stages(
+    provider: str,
+    query: str,
+    max_results: int,
+    safe_search: bool,
+    client: HttpClient | None,
+    deadline: Deadline | None = None,
+) -> List[ProviderStage]:
+    # The providers a setting may use, in their default order of reliability.
+    stages: List[ProviderStage] = []
+    if provider in {"auto", "duckduckgo"}:
+        stages += [
+            (
+                f"ddgs:{backend}",
+                partial(
+                    _collect_results,
+                    query,
+                    max_results=max_results,
+                    backend=backend,
+                    safe_search=safe_search,
+                    client=client,
+                ),
+            )
+            for backend in DDGS_BACKENDS
+        ]
+    # Request timeouts are worked out when a stage starts, so late stages get what is left.
+    bounded = partial(_bounded_call, deadline=deadline, query=query, max_results=max_results)
+    # Google CSE is skipped outright when it has no credentials configured.
+    if provider in {"auto", "google_cse"} and all(_google_cse_credentials()):
+        stages.append(("google_cse", bounded(_google_cse_search, 15, client=client)))
+    if provider in {"auto", "duckduckgo"}:
+        stages += [
+            ("ddg_html", bounded(_ddg_html_search, 15, client=client)),
+            ("ddg_lite", bounded(_ddg_lite_search, 15, client=client)),
+        ]
+    if provider in {"auto", "wikipedia"}:
+        stages.append(("wikipedia", bounded(_wiki_search, 10, client=client)))
+    return stages
+
+
+def _run_stage(
+    stage: ProviderStage,
+    health: ProviderHealth | None,
+    on_results: ResultsCallback | None = None,
+) -> List[Dict[str, str]]:
+    # Call one provider and record its latency and outcome. Each batch of results is
+    # passed to on_results as soon as the provider has it, before the final ranking.
+    name, run = stage
+    started = time.monotonic()
+    results: List[Dict[str, str]] = []
+    try:
+        output = run()
+        for page in [output] if isinstance(output, list) else output:
+            results.extend(page)
+            if page and on_results is not None:
+                on_results(page)
+    except Exception as error:
+        if health is not None:
+            health.record_error(name, time.monotonic() - started, error)
+        raise
+    if health is not None:
+        health.record_result(name, time.monotonic() - started, results)
     return results
 
 
-def _run_duckduckgo_search(
-    query: str, max_results: int, safe_search: bool
-) -> Tuple[List[Dict[str, str]], Exception | None]:
-    backends = ["api", "html", "lite"]
+def _cascade_search(
+    stages: Sequence[ProviderStage],
+    health: ProviderHealth | None = None,
+    deadline: Deadline | None = None,
+    on_results: ResultsCallback | None = None,
+) -> List[Dict[str, str]]:
+    # Try providers one after another until one returns results.
     last_error: Exception | None = None
-    results: List[Dict[str, str]] = []
-    for backend in backends:
+    for stage in stages:
+        if expired(deadline):
+            logger.info("Search deadline reached before provider %s", stage[0])
+            break
+        if health is not None and not health.available(stage[0]):
+            continue
         try:
-            results = _collect_results(
-                query,
-                max_results=max_results,
-                backend=backend,
-                safe_search=safe_search,
-            )
-            if results:
-                break
+            results = _run_stage(stage, health, on_results)
         except Exception as error:
             last_error = error
-    return results, last_error
+            continue
+        if results:
+            return results
+    if last_error is not None:
+        logger.warning("Search failed: %s", last_error)
+    return []
+
+
+@dataclass(slots=True)
+class HedgePolicy:
+    """How search_web races the "auto" providers instead of trying them in turn.
+
+    ``parallel`` providers start at once and the next one is launched every
+    ``delay`` seconds while nothing useful has arrived. The first non-empty
+    result set wins; with ``merge_window`` > 0, sets that finish within that
+    many seconds of it are merged in. Providers still queued are cancelled.
+    """
+
+    delay: float = 1.5
+    parallel: int = 1
+    merge_window: float = 0.0
+
+
+def merge_result_sets(result_sets: Iterable[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    # Concatenate provider result sets in arrival order, keeping the first hit per URL.
+    merged: List[Dict[str, str]] = []
+    seen = set()
+    for results in result_sets:
+        for result in results:
+            if result["url"] in seen:
+                continue
+            seen.add(result["url"])
+            merged.append(result)
+    return merged
+
+
+def _hedged_search(
+    stages: Sequence[ProviderStage],
+    policy: HedgePolicy,
+    health: ProviderHealth | None = None,
+    deadline: Deadline | None = None,
+    on_results: ResultsCallback | None = None,
+) -> List[Dict[str, str]]:
+    if not stages:
+        return []
+    pool = ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix="search-hedge")
+    pending: Dict[Future, str] = {}
+    winners: List[List[Dict[str, str]]] = []
+    first_win_at: float | None = None
+    next_stage = 0
+    next_launch_at = 0.0
+
+    def launch() -> None:
+        # Start the next provider whose circuit lets a call through.
+        nonlocal next_stage, next_launch_at
+        while next_stage < len(stages):
+            stage = stages[next_stage]
+            next_stage += 1
+            if health is None or health.available(stage[0]):
+                pending[pool.submit(_run_stage, stage, health, on_results)] = stage[0]
+                break
+        next_launch_at = time.monotonic() + policy.delay
+
+    try:
+        for _ in range(max(1, policy.parallel)):
+            launch()
+        while pending:
+            now = time.monotonic()
+            if first_win_at is not None:
+                timeout: float | None = first_win_at + policy.merge_window - now
+            elif next_stage < len(stages):
+                timeout = next_launch_at - now
+            else:
+                timeout = None
+            if deadline is not None:
+                left = deadline.remaining()
+                timeout = left if timeout is None else min(timeout, left)
+            done, _ = wait(
+                pending,
+                timeout=max(0.0, timeout) if timeout is not None else None,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as error:
+                    logger.info("Search provider %s failed: %s", name, error)
+                    continue
+                if results:
+                    winners.append(results)
+                    if first_win_at is None:
+                        first_win_at = time.monotonic()
+
+            now = time.monotonic()
+            if expired(deadline):
+                break
+            if first_win_at is not None:
+                if now >= first_win_at + policy.merge_window:
+                    break
+                continue
+            # Nothing useful yet: hedge with the next provider once the delay is up,
+            # or straight away if every running provider has already given up.
+            if next_stage < len(stages) and (not pending or now >= next_launch_at):
+                launch()
+    finally:
+        # Queued providers never start; running ones finish in the background and are ignored.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return merge_result_sets(winners)
 
 
 def search_web(
@@ -317,47 +516,44 @@ def search_web(
     max_results: int = 15,
     provider: str = "auto",
     safe_search: bool = True,
+    client: HttpClient | None = None,
+    query_cache: QueryCache | None = None,
+    cache: CacheBackend | None = None,
+    hedge: HedgePolicy | None = None,
+    health: ProviderHealth | None = None,
+    deadline: Deadline | None = None,
+    on_results: ResultsCallback | None = None,
 ) -> List[Dict[str, str]]:
-    # Try multiple backends in order of reliability.
+    """Search the configured providers and return their results ranked by domain score.
+
+    ``on_results`` (when given) sees each batch of results the moment a provider
+    has it, unranked and possibly from a provider whose results end up unused,
+    so callers can start on the best URLs before the final ranking is known.
+    """
     provider = provider.strip().lower()
     if provider not in VALID_PROVIDERS:
         provider = "auto"
 
-    results: List[Dict[str, str]] = []
-    last_error: Exception | None = None
-
-    if provider in {"auto", "duckduckgo"}:
-        results, last_error = _run_duckduckgo_search(
-            query=query,
-            max_results=max_results,
-            safe_search=safe_search,
-        )
-
-    # If configured provider is Google CSE, only run Google CSE.
-    if provider == "google_cse":
-        results = _google_cse_search(query, max_results=max_results)
-
-    # Wikipedia only mode for tighter control from the UI.
-    if provider == "wikipedia":
-        results = _wiki_search(query, max_results=max_results)
-
-    # In auto mode, cascade through all available providers.
-    if provider == "auto" and not results:
-        results = _google_cse_search(query, max_results=max_results)
-
-    if provider in {"auto", "duckduckgo"} and not results:
-        results = _ddg_html_search(query, max_results=max_results)
-
-    if provider in {"auto", "duckduckgo"} and not results:
-        results = _ddg_lite_search(query, max_results=max_results)
-
-    if provider == "auto" and not results:
-        wiki_results = _wiki_search(query, max_results=max_results)
-        if wiki_results:
-            results = wiki_results
-        elif last_error:
-            logger.warning("Search failed: %s", last_error)
+    # Repeated queries are answered from the result cache without touching providers.
+    cache_key = query_cache_key(query, provider, safe_search, max_results)
+    if query_cache is not None:
+        cached = query_cache.get(cache_key, cache)
+        if cached is not None:
+            return cached
+
+    stages = _provider_stages(provider, query, max_results, safe_search, client, deadline)
+    if health is not None:
+        # Healthy providers first; ones cooling down after failures are skipped.
+        stages = health.order(stages)
+    if provider == "auto" and hedge is not None:
+        results = _hedged_search(stages, hedge, health, deadline, on_results)
+        if not results:
+            logger.warning("Search failed: no provider returned results")
+    else:
+        results = _cascade_search(stages, health, deadline, on_results)
 
     # Rank results by domain reputation score.
     results.sort(key=lambda x: x["score"], reverse=True)
+    if query_cache is not None:
+        query_cache.put(cache_key, results, cache)
     return results
@@ -1,49 +1,114 @@
-# Regex utilities and typing helpers.
+# Regex utilities, bisect/heapq for batch scoring and top-k selection, typing helpers.
+import heapq
 import re
+from bisect import bisect_right
 from typing import Dict, List, Tuple
 
-
-def _split_sentences(text: str) -> List[str]:
+# Near-duplicate detection and query relevance.
+from .fingerprint import SENTENCE_MAX_DISTANCE, near_duplicate, sentence_fingerprint
+from .relevance import SentenceIndex
+
+# Whitespace between sentences after normalization.
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?])\s+")
+# Wikipedia-style bracketed citations.
+_CITATION_RE = re.compile(r"\[[^\]]+\]")
+# Sentence features and their weights: dates, percentages, large numbers, proper nouns.
+# Each pattern is the plain ``\b...`` form rewritten to start with a character class
+# (the word boundary becomes a lookbehind after it), which lets the regex engine skip
+# ahead to candidate characters instead of testing a boundary at every position.
+# They match exactly the same spans as r"\b\d{4}\b", r"\b\d+(?:\.\d+)?%\b",
+# r"\b\d+(?:,\d{3})+\b" and r"\b[A-Z][a-z]+\b". The optional literal is a substring
+# every match contains, so documents without it skip that feature entirely.
+_FEATURES: Tuple[Tuple["re.Pattern[str]", int, str], ...] = (
+    (re.compile(r"\d(?<!\w\d)\d{3}(?!\w)"), 3, ""),
+    (re.compile(r"\d(?<!\w\d)\d*(?:\.\d+)?%\b"), 2, "%"),
+    (re.compile(r"\d(?<!\w\d)\d*(?:,\d{3})+\b"), 2, ","),
+    (re.compile(r"[A-Z](?<!\w[A-Z])[a-z]+\b"), 1, ""),
+)
+_CONFLICT_RE = re.compile(
+    r"\\b([A-Za-z][A-Za-z\\-]{3,})[^\\d]{0,10}(\\d{4}|\\d+(?:,\\d{3})+|\\d+%|\\d+\\.\\d+)\\b"
+)
+# Fragments this short are not sentences worth keeping.
+_MIN_SENTENCE_CHARS = 20
+
+
+def _sentence_spans(text: str) -> Tuple[str, List[Tuple[int, int]]]:
     # Normalize whitespace to make sentence splitting more reliable.
-    text = re.sub(r"\s+", " ", text).strip()
-    if not text:
-        return []
-    # Split on sentence-ending punctuation followed by whitespace.
-    sentences = re.split(r"(?<=[.!?])\s+", text)
+    text = " ".join(text.split())
+    spans = []
+    start = 0
+    # Split on sentence-ending punctuation followed by whitespace, keeping offsets.
+    for match in _SENTENCE_BREAK_RE.finditer(text):
+        spans.append((start, match.start()))
+        start = match.end()
+    spans.append((start, len(text)))
     # Filter out very short fragments.
-    return [s.strip() for s in sentences if len(s.strip()) > 20]
+    return text, [(a, b) for a, b in spans if b - a > _MIN_SENTENCE_CHARS]
+
+
+def _split_sentences(text: str) -> List[str]:
+    text, spans = _sentence_spans(text)
+    return [text[a:b] for a, b in spans]
 
 
 def _clean_text(text: str) -> str:
     # Remove Wikipedia-style bracketed citations and collapse whitespace.
-    text = re.sub(r"\[[^\]]+\]", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    if "[" in text:
+        text = _CITATION_RE.sub("", text)
+    return " ".join(text.split())
 
 
 def _score_sentence(sentence: str) -> int:
     # Heuristic scoring: prefer sentences with dates, numbers, and proper nouns.
-    score = 0
-    if re.search(r"\b\d{4}\b", sentence):
-        score += 3
-    if re.search(r"\b\d+(?:\.\d+)?%\b", sentence):
-        score += 2
-    if re.search(r"\b\d+(?:,\d{3})+\b", sentence):
-        score += 2
-    if re.search(r"\b[A-Z][a-z]+\b", sentence):
-        score += 1
-    return score
-
-
-def source_bullets(text: str, max_bullets: int = 8) -> List[str]:
-    # Select the best sentences to represent a source.
-    sentences = _split_sentences(text)
-    scored = sorted(sentences, key=_score_sentence, reverse=True)
+    return sum(weight for pattern, weight, _ in _FEATURES if pattern.search(sentence))
+
+
+def _score_sentences(text: str, spans: List[Tuple[int, int]]) -> List[int]:
+    # Score every sentence of a document in one batch, feature by feature: each search
+    # runs over the whole text and, after a hit, resumes at the next sentence, so a
+    # feature costs one scan of the document rather than one search call per sentence.
+    # Matches never cross whitespace, so a match always lies inside a single fragment.
+    scores = [0] * len(spans)
+    if not spans:
+        return scores
+    starts = [a for a, _ in spans]
+    for pattern, weight, literal in _FEATURES:
+        if literal and literal not in text:
+            continue
+        search = pattern.search
+        pos = starts[0]
+        while True:
+            match = search(text, pos)
+            if match is None:
+                break
+            index = bisect_right(starts, match.start()) - 1
+            if match.start() < spans[index][1]:
+                scores[index] += weight
+            # Either way, nothing more in this sentence (or the short fragment after it) counts.
+            if index + 1 == len(spans):
+                break
+            pos = starts[index + 1]
+    return scores
+
+
+def source_bullets(text: str, max_bullets: int = 8, query: str | None = None) -> List[str]:
+    # Select the best sentences to represent a source; with a query, the ones most relevant
+    # to it (BM25) come first and the heuristic score breaks ties.
+    text, spans = _sentence_spans(text)
+    scores = _score_sentences(text, spans)
+    if query:
+        relevance = SentenceIndex([text[a:b] for a, b in spans]).rank(query)
+    else:
+        relevance = [0.0] * len(spans)
+    # Best first, document order among ties; only popped sentences are cleaned.
+    ranked = [(-relevance[index], -score, index) for index, score in enumerate(scores)]
+    heapq.heapify(ranked)
     bullets = []
     seen = set()
-    for s in scored:
+    while ranked:
+        index = heapq.heappop(ranked)[-1]
         # Clean and de-duplicate sentences.
-        s = _clean_text(s)
+        s = _clean_text(text[slice(*spans[index])])
         if s in seen:
             continue
         seen.add(s)
@@ -55,14 +120,11 @@ def source_bullets(text: str, max_bullets: int = 8) -> List[str]:
 
 def _detect_conflicts(source_summaries: List[Dict[str, object]]) -> List[str]:
     # Very conservative conflict detection based on keyword + number pairs.
-    pattern = re.compile(
-        r"\\b([A-Za-z][A-Za-z\\-]{3,})[^\\d]{0,10}(\\d{4}|\\d+(?:,\\d{3})+|\\d+%|\\d+\\.\\d+)\\b"
-    )
     keyword_to_numbers: Dict[str, set] = {}
     for s in source_summaries:
         bullets = s.get("bullets", [])
         for b in bullets:
-            for match in pattern.findall(b):
+            for match in _CONFLICT_RE.findall(b):
                 keyword = match[0].lower()
                 number = match[1]
                 keyword_to_numbers.setdefault(keyword, set()).add(number)
@@ -89,14 +151,19 @@ def synthesize_paragraph(
         sources_used.append(s["url"])
         all_sentences.extend(bullets)
 
-    # De-duplicate sentences while preserving order
+    # De-duplicate sentences while preserving order, near-duplicates included
     seen = set()
+    fingerprints: List[int] = []
     unique_sentences = []
     for s in all_sentences:
         s = _clean_text(s)
         if s in seen:
             continue
         seen.add(s)
+        fingerprint = sentence_fingerprint(s)
+        if near_duplicate(fingerprint, fingerprints, SENTENCE_MAX_DISTANCE):
+            continue
+        fingerprints.append(fingerprint)
         unique_sentences.append(s)
 
     # If we have too few sources or sentences, return a fallback paragraph.
@@ -108,6 +175,15 @@ def synthesize_paragraph(
         )
         return paragraph, sources_used
 
+    # With a query, the sentences most relevant to it across all sources lead.
+    if query:
+        relevance = SentenceIndex(unique_sentences).rank(query)
+        if any(relevance):
+            order = heapq.nsmallest(
+                max_sentences, range(len(unique_sentences)), key=lambda i: (-relevance[i], i)
+            )
+            unique_sentences = [unique_sentences[i] for i in order]
+
     # Use more strong sentences to form a longer single paragraph.
     prefix = f"About {query}, " if query else ""
     paragraph = prefix + " ".join(unique_sentences[:max_sentences])
@@ -0,0 +1,157 @@
+# Regexes for cheap markup scans, threading for shared counters.
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict
+
+# Actions.
+EXTRACT = "extract"
+LIGHT = "light"
+SKIP = "skip"
+
+# Reasons.
+OK = "ok"
+NOT_HTML = "not_html"
+PLAIN_TEXT = "plain_text"
+TOO_LITTLE_TEXT = "too_little_text"
+SPA_SHELL = "spa_shell"
+LOGIN_WALL = "login_wall"
+CONSENT_WALL = "consent_wall"
+LOW_DENSITY = "low_density"
+
+# Extractions shorter than this are discarded by the engine, so triage can skip them up front.
+MIN_TEXT_CHARS = 200
+# Pages showing a wall (login, consent, JS mount point) with less text than this are the wall.
+WALL_TEXT_CHARS = 1000
+# Pages this large with this little text get the cheap extraction instead of readability.
+LIGHT_MIN_BYTES = 500_000
+LIGHT_MAX_DENSITY = 0.01
+
+_NON_VISIBLE_RE = re.compile(
+    r"<(script|style|noscript|template|svg)\b.*?</\1\s*>|<!--.*?-->", re.I | re.S
+)
+_SCRIPT_RE = re.compile(r"<script\b.*?</script\s*>", re.S)
+_TAG_RE = re.compile(r"<[^>]*>")
+_HTML_START_RE = re.compile(r"<\s*(!doctype\s+html|html|head|body|div|p|article|main)\b", re.I)
+# Non-HTML bodies that open like a document format or data rather than prose.
+_DATA_START_RE = re.compile(r"\s*(%PDF-|[{\[]|<\?xml|<svg\b|<rss\b|<feed\b)", re.I)
+# The scans below run on the lower-cased page, so plain substrings beat re.I alternations.
+_PASSWORD_RE = re.compile(r"<input\b[^>]*type\s*=\s*[\"']?password")
+_CONSENT_MARKERS = (
+    "cookie-consent",
+    "cookie_consent",
+    "cookieconsent",
+    "consent-banner",
+    "consent-manager",
+    "consent-wall",
+    "gdpr-consent",
+    "onetrust",
+    "cookiebot",
+    "didomi",
+    "quantcast",
+    "trustarc",
+)
+_SPA_MOUNT_RE = re.compile(
+    r"<div[^>]+id\s*=\s*[\"']?(root|app|__next|__nuxt|svelte)\b[^>]*>\s*</div>"
+)
+_SPA_MARKERS = ("enable javascript", "turn on javascript", "requires javascript")
+# Only the head of a non-HTML body needs looking at.
+_SNIFF_BYTES = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class TriageDecision:
+    action: str
+    reason: str
+    # Estimated visible characters (an upper bound on what extraction can return).
+    text_chars: int = 0
+
+
+def visible_text_chars(html: str) -> int:
+    # Tags become single spaces, so this never undercounts what tree_text() returns.
+    words = _TAG_RE.sub(" ", _NON_VISIBLE_RE.sub(" ", html)).split()
+    return sum(map(len, words)) + max(0, len(words) - 1)
+
+
+def _looks_like_prose(head: str) -> bool:
+    # text/plain bodies are fetched on purpose; binary junk decodes with NULs or U+FFFD.
+    if _DATA_START_RE.match(head) or "\x00" in head:
+        return False
+    return head.count("\ufffd") * 100 <= len(head)
+
+
+def triage_page(html: str) -> TriageDecision:
+    """Decide, with a few regex scans, whether a fetched page is worth extracting.
+
+    Pages whose visible text is too short for the engine to use, and login,
+    consent and script-only shells with little text around them, are skipped.
+    Very large pages with almost no text get the cheap extraction instead of
+    readability, and so do plain-text bodies, which have no markup for it to
+    work with. Everything else is extracted as usual.
+    """
+    head = html[:_SNIFF_BYTES]
+    if not html:
+        return TriageDecision(SKIP, NOT_HTML)
+    if not _HTML_START_RE.search(head):
+        if not _looks_like_prose(head):
+            return TriageDecision(SKIP, NOT_HTML)
+        text_chars = visible_text_chars(html)
+        if text_chars < MIN_TEXT_CHARS:
+            return TriageDecision(SKIP, TOO_LITTLE_TEXT, text_chars)
+        return TriageDecision(LIGHT, PLAIN_TEXT, text_chars)
+
+    text_chars = visible_text_chars(html)
+    if text_chars < WALL_TEXT_CHARS:
+        lowered = html.lower()
+        if _PASSWORD_RE.search(lowered):
+            return TriageDecision(SKIP, LOGIN_WALL, text_chars)
+        if any(marker in lowered for marker in _CONSENT_MARKERS):
+            return TriageDecision(SKIP, CONSENT_WALL, text_chars)
+        if _SPA_MOUNT_RE.search(lowered) or any(marker in lowered for marker in _SPA_MARKERS):
+            script_chars = sum(len(match) for match in _SCRIPT_RE.findall(lowered))
+            if script_chars > text_chars:
+                return TriageDecision(SKIP, SPA_SHELL, text_chars)
+    if text_chars < MIN_TEXT_CHARS:
+        return TriageDecision(SKIP, TOO_LITTLE_TEXT, text_chars)
+    if len(html) >= LIGHT_MIN_BYTES and text_chars / len(html) < LIGHT_MAX_DENSITY:
+        return TriageDecision(LIGHT, LOW_DENSITY, text_chars)
+    return TriageDecision(EXTRACT, OK, text_chars)
+
+
+class TriageStats:
+    """Counts of triage decisions by reason, shared by every engine in the process."""
+
+    def __init__(self) -> None:
+        self._reasons: Counter = Counter()
+        self._actions: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, decision: TriageDecision) -> None:
+        with self._lock:
+            self._reasons[decision.reason] += 1
+            self._actions[decision.action] += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            pages = sum(self._actions.values())
+            return {
+                "pages": pages,
+                "actions": {
+                    action: {"count": count, "rate": round(count / pages, 3)}
+                    for action, count in sorted(self._actions.items())
+                },
+                "reasons": {
+                    reason: {"count": count, "rate": round(count / pages, 3)}
+                    for reason, count in sorted(self._reasons.items())
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reasons.clear()
+            self._actions.clear()
+
+
+# Process-wide counters so hit rates cover every query.
+TRIAGE_STATS = TriageStats()
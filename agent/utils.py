@@ -1,6 +1,9 @@
 # Hashing for cache keys, regex helpers, date for filenames, path and URL utilities.
+import contextlib
 import hashlib
+import os
 import re
+import tempfile
 from datetime import date
 from pathlib import Path
 from urllib.parse import urlparse, urlunparse
@@ -55,6 +58,20 @@ def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+def atomic_write_text(path: Path, text: str) -> None:
+    # Write then rename so concurrent readers never see a partial file. Every writer,
+    # thread or process, gets its own temp file next to the target.
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", errors="ignore") as handle:
+            handle.write(text)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
 def canonicalize_url(url: str) -> str:
     # Normalize URLs to reduce duplicate variations.
     parsed = urlparse(url)
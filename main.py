@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import argparse
+import multiprocessing
 import sys
+from contextlib import ExitStack
 
 
 def _parse_args(argv: list[str]) -> argparse.Namespace:
@@ -11,6 +13,28 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
         action="store_true",
         help="Run in terminal mode instead of launching the desktop app window.",
     )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run every query in FILE (one per line, '-' for stdin) and write JSON lines.",
+    )
+    parser.add_argument(
+        "--out",
+        metavar="FILE",
+        help="Where --batch writes its JSON lines (default: stdout).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="How many --batch queries run at the same time (default: 4).",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Extract --batch page text in this many worker processes (default: 0, in-thread).",
+    )
     parser.add_argument("query", nargs="*", help="Optional CLI query text.")
     return parser.parse_args(argv)
 
@@ -54,6 +78,48 @@ def _run_cli(query_parts: list[str]) -> int:
     return 0
 
 
+def _run_batch(path: str, out_path: str | None, workers: int, processes: int) -> int:
+    import json
+
+    from ui_agent import configure_engine, default_cache_dir, run_batch
+
+    if processes > 0:
+        from agent.extract import ExtractionPool
+
+        configure_engine(default_cache_dir(), extraction_pool=ExtractionPool(processes))
+
+    count = 0
+    # Only files opened here are closed; stdin and stdout belong to the caller.
+    with ExitStack() as stack:
+        try:
+            source = (
+                sys.stdin if path == "-" else stack.enter_context(open(path, encoding="utf-8"))
+            )
+            out = (
+                sys.stdout
+                if out_path is None
+                else stack.enter_context(open(out_path, "w", encoding="utf-8"))
+            )
+        except OSError as error:
+            print(f"Error: {error}", file=sys.stderr)
+            return 2
+
+        try:
+            # Each answer is written as soon as it completes, so nothing accumulates in memory.
+            for response in run_batch(source, max_queries=workers):
+                out.write(json.dumps(response.to_dict(), ensure_ascii=False) + "\n")
+                out.flush()
+                count += 1
+        except KeyboardInterrupt:
+            print(f"\nCancelled after {count} queries.", file=sys.stderr)
+            return 130
+        except Exception as error:
+            print(f"Error: {error}", file=sys.stderr)
+            return 1
+    print(f"Wrote {count} results.", file=sys.stderr)
+    return 0
+
+
 def _run_gui() -> int:
     if not _check_tkinter():
         return 1
@@ -65,10 +131,14 @@ def _run_gui() -> int:
 
 def main(argv: list[str] | None = None) -> int:
     args = _parse_args(sys.argv[1:] if argv is None else argv)
+    if args.batch:
+        return _run_batch(args.batch, args.out, args.workers, args.processes)
     if args.cli:
         return _run_cli(args.query)
     return _run_gui()
 
 
 if __name__ == "__main__":
+    # Extraction worker processes re-enter here in frozen (PyInstaller) builds.
+    multiprocessing.freeze_support()
     raise SystemExit(main())
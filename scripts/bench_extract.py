@@ -0,0 +1,137 @@
+"""Benchmark page text extraction on the cached HTML corpus.
+
+Compares the previous readability -> HTML string -> BeautifulSoup path
+("reparse") with the single-parse lxml tree path ("tree") for throughput
+and peak memory, and checks that both produce the same text.
+
+    python scripts/bench_extract.py [--corpus cache/html] [--repeat 3]
+
+Each engine is timed in its own subprocess so peak RSS is not shared.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agent.extract import extract_main_text  # noqa: E402
+
+
+def reparse_extract(html: str) -> str:
+    # The extraction path before the tree engine, kept here as the baseline.
+    from bs4 import BeautifulSoup
+    from readability import Document
+
+    if not html:
+        return ""
+    try:
+        content_html = Document(html).summary(html_partial=True)
+        soup = BeautifulSoup(content_html, "lxml")
+    except Exception:
+        soup = BeautifulSoup(html, "lxml")
+    for tag in soup(["script", "style", "noscript", "header", "footer", "nav", "aside"]):
+        tag.decompose()
+    return soup.get_text(separator=" ", strip=True)
+
+
+ENGINES = {"reparse": reparse_extract, "tree": extract_main_text}
+
+
+def load_corpus(corpus: Path) -> list[str]:
+    paths = sorted(corpus.glob("*.html"))
+    return [path.read_text(encoding="utf-8", errors="replace") for path in paths]
+
+
+def measure(engine: str, corpus: Path, repeat: int) -> dict:
+    extract = ENGINES[engine]
+    pages = load_corpus(corpus)
+    # One untimed pass so imports and first-call setup are not measured.
+    for html in pages:
+        extract(html)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            extract(html)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for html in pages:
+        extract(html)
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mib = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    return {
+        "engine": engine,
+        "pages": len(pages) * repeat,
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(len(pages) * repeat / elapsed, 1) if elapsed else None,
+        "python_peak_mib": round(python_peak / (1024 * 1024), 2),
+        "max_rss_mib": round(rss_mib, 1),
+    }
+
+
+def compare(corpus: Path) -> list[str]:
+    mismatched = []
+    for path in sorted(corpus.glob("*.html")):
+        html = path.read_text(encoding="utf-8", errors="replace")
+        if reparse_extract(html) != extract_main_text(html):
+            mismatched.append(path.name)
+    return mismatched
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=ROOT / "cache" / "html")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engine", choices=sorted(ENGINES), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.engine:
+        print(json.dumps(measure(args.engine, args.corpus, args.repeat)))
+        return 0
+
+    if not any(args.corpus.glob("*.html")):
+        print(f"No .html files in {args.corpus}", file=sys.stderr)
+        return 2
+
+    mismatched = compare(args.corpus)
+    total = len(list(args.corpus.glob("*.html")))
+    print(f"equivalent text: {total - len(mismatched)}/{total} pages")
+    for name in mismatched:
+        print(f"  differs: {name}")
+
+    for engine in sorted(ENGINES):
+        command = [
+            sys.executable,
+            __file__,
+            "--engine",
+            engine,
+            "--corpus",
+            str(args.corpus),
+            "--repeat",
+            str(args.repeat),
+        ]
+        completed = subprocess.run(command, check=True, capture_output=True, text=True)
+        stats = json.loads(completed.stdout)
+        print(
+            f"{stats['engine']:>8}: {stats['pages_per_second']} pages/s "
+            f"({stats['pages']} pages in {stats['seconds']}s), "
+            f"python peak {stats['python_peak_mib']} MiB, max RSS {stats['max_rss_mib']} MiB"
+        )
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
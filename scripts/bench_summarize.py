@@ -0,0 +1,115 @@
+"""Benchmark sentence selection (summarize.source_bullets) on long documents.
+
+Compares the previous per-sentence regex scoring with full sort ("legacy")
+against the batched, precompiled scoring with heap top-k ("batched"), and
+checks that both pick the same bullets.
+
+    python scripts/bench_summarize.py [--corpus cache/text] [--scale 20] [--repeat 5]
+
+Each corpus document is also repeated ``--scale`` times to build long inputs.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agent.summarize import source_bullets  # noqa: E402
+
+
+def _legacy_split_sentences(text: str) -> List[str]:
+    text = re.sub(r"\s+", " ", text).strip()
+    if not text:
+        return []
+    sentences = re.split(r"(?<=[.!?])\s+", text)
+    return [s.strip() for s in sentences if len(s.strip()) > 20]
+
+
+def _legacy_clean_text(text: str) -> str:
+    text = re.sub(r"\[[^\]]+\]", "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _legacy_score_sentence(sentence: str) -> int:
+    score = 0
+    if re.search(r"\b\d{4}\b", sentence):
+        score += 3
+    if re.search(r"\b\d+(?:\.\d+)?%\b", sentence):
+        score += 2
+    if re.search(r"\b\d+(?:,\d{3})+\b", sentence):
+        score += 2
+    if re.search(r"\b[A-Z][a-z]+\b", sentence):
+        score += 1
+    return score
+
+
+def legacy_source_bullets(text: str, max_bullets: int = 8) -> List[str]:
+    # summarize.source_bullets before the batched engine, kept here as the baseline.
+    scored = sorted(_legacy_split_sentences(text), key=_legacy_score_sentence, reverse=True)
+    bullets: List[str] = []
+    seen = set()
+    for s in scored:
+        s = _legacy_clean_text(s)
+        if s in seen:
+            continue
+        seen.add(s)
+        bullets.append(s)
+        if len(bullets) >= max_bullets:
+            break
+    return bullets
+
+
+def load_documents(corpus: Path, scale: int) -> List[str]:
+    paths = sorted(path for path in corpus.iterdir() if path.is_file())
+    texts = [path.read_text(encoding="utf-8") for path in paths]
+    # Shift numbers between copies so repeated documents are not all duplicates.
+    return [
+        " ".join(re.sub(r"\d", str(copy % 10), text) for copy in range(scale)) for text in texts
+    ]
+
+
+def timed(select: Callable[[str], List[str]], documents: List[str], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in documents:
+            select(text)
+    return time.perf_counter() - started
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=ROOT / "cache" / "text")
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    documents = load_documents(args.corpus, max(1, args.scale))
+    if not documents:
+        print(f"No documents in {args.corpus}", file=sys.stderr)
+        return 2
+
+    mismatched = sum(
+        1 for text in documents if legacy_source_bullets(text) != source_bullets(text)
+    )
+    total_chars = sum(len(text) for text in documents)
+    average = total_chars / len(documents) / 1000
+    print(f"{len(documents)} documents, {average:.0f}k chars on average")
+    print(f"identical bullets: {len(documents) - mismatched}/{len(documents)} documents")
+
+    legacy = timed(legacy_source_bullets, documents, args.repeat)
+    batched = timed(source_bullets, documents, args.repeat)
+    million_chars = total_chars * args.repeat / 1_000_000
+    print(f"  legacy: {legacy:.3f}s ({million_chars / legacy:.1f} M chars/s)")
+    print(f" batched: {batched:.3f}s ({million_chars / batched:.1f} M chars/s)")
+    print(f" speedup: {legacy / batched:.2f}x")
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,42 @@
+import io
+import json
+import sqlite3
+import tempfile
+import threading
 import unittest
+from pathlib import Path
 from unittest.mock import patch
 
-from agent.models import SearchResponse, SearchResult
-from ui_agent import run_agent, run_agent_response
+import main
+import ui_agent
+from agent.models import (
+    ResultsRanked,
+    SearchResponse,
+    SearchResult,
+    SourceExtracted,
+    SourceFetched,
+    SummaryReady,
+)
+from ui_agent import (
+    configure_engine,
+    get_engine,
+    run_agent,
+    run_agent_response,
+    run_agent_stream,
+    run_batch,
+    shutdown_engine,
+)
 
 
 class RunAgentTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        configure_engine(cache_dir=self.tmp.name)
+
+    def tearDown(self):
+        shutdown_engine()
+        self.tmp.cleanup()
+
     @patch("ui_agent.SearchEngine.run")
     def test_returns_answer_for_single_result(self, mock_run):
         mock_run.return_value = SearchResponse(
@@ -52,6 +83,151 @@ class RunAgentTests(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             run_agent("none")
 
+    @patch("ui_agent.SearchEngine.run_iter")
+    def test_stream_forwards_progress_and_returns_final_answer(self, mock_run_iter):
+        results = [
+            SearchResult(title="A", snippet="", url="https://a.example"),
+            SearchResult(title="B", snippet="", url="https://b.example"),
+        ]
+        mock_run_iter.return_value = iter(
+            [
+                ResultsRanked(query="ai", results=results, sources_to_read=2),
+                SummaryReady(SearchResponse(query="ai", results=results, summary="summary")),
+            ]
+        )
+        events = []
+
+        output = run_agent_stream("ai", on_event=events.append)
+
+        self.assertEqual(len(events), 1)
+        self.assertIsInstance(events[0], ResultsRanked)
+        self.assertEqual(
+            [item.url for item in output.results], ["https://a.example", "https://b.example"]
+        )
+
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.search_web")
+    def test_result_list_costs_only_the_provider_round_trip(self, mock_search, mock_fetch):
+        mock_search.return_value = [
+            {"url": "https://a.example", "title": "A"},
+            {"url": "https://b.example", "title": "B"},
+        ]
+
+        output = run_agent_response("python")
+
+        self.assertEqual(len(output.results), 2)
+        mock_fetch.assert_not_called()
+
+    @patch("agent.engine.cached_extract")
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_stream_reports_reading_of_a_lazy_summary(
+        self, mock_search, _mock_robots, mock_fetch, mock_extract
+    ):
+        mock_search.return_value = [{"url": "https://a.example/page", "title": "A"}]
+        text = "Python 3.13 was released in October 2024 by the core team. " * 5
+        mock_fetch.return_value = (f"<html><body><p>{text}</p></body></html>", "fetched")
+        mock_extract.return_value = text
+        events = []
+
+        output = run_agent_stream("python", on_event=events.append)
+
+        self.assertIn("Python 3.13", output.answer)
+        # Results first, then the reading the summary needed, announced with its source count.
+        self.assertEqual(
+            [type(event) for event in events],
+            [ResultsRanked, ResultsRanked, SourceFetched, SourceExtracted],
+        )
+        self.assertEqual([event.sources_to_read for event in events[:2]], [0, 1])
+
+    @patch("ui_agent.SearchEngine.run_many")
+    def test_batch_skips_blank_lines(self, mock_run_many):
+        mock_run_many.side_effect = lambda queries, **kwargs: (
+            SearchResponse(query=query) for query in queries
+        )
+
+        responses = list(run_batch(["python\n", "   \n", " rust \n"]))
+
+        self.assertEqual([response.query for response in responses], ["python", "rust"])
+
+    @patch("ui_agent.SearchEngine.run_many")
+    def test_batch_command_writes_one_json_line_per_query(self, mock_run_many):
+        mock_run_many.side_effect = lambda queries, **kwargs: (
+            SearchResponse(query=query, summary=f"About {query}.") for query in queries
+        )
+        queries_path = Path(self.tmp.name) / "queries.txt"
+        out_path = Path(self.tmp.name) / "results.jsonl"
+        queries_path.write_text("python\nrust\n", encoding="utf-8")
+
+        code = main.main(["--batch", str(queries_path), "--out", str(out_path)])
+
+        self.assertEqual(code, 0)
+        lines = [json.loads(line) for line in out_path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([line["query"] for line in lines], ["python", "rust"])
+        self.assertEqual(lines[1]["summary"], "About rust.")
+
+    @patch("ui_agent.SearchEngine.run_many")
+    def test_batch_command_leaves_stdout_open(self, mock_run_many):
+        mock_run_many.side_effect = lambda queries, **kwargs: (
+            SearchResponse(query=query) for query in queries
+        )
+        stdout = io.StringIO()
+
+        with patch("sys.stdout", stdout), patch("sys.stdin", io.StringIO("python\n")):
+            code = main.main(["--batch", "-"])
+
+        self.assertEqual(code, 0)
+        self.assertFalse(stdout.closed)
+        self.assertEqual(json.loads(stdout.getvalue())["query"], "python")
+
+
+class SharedEngineTests(unittest.TestCase):
+    def tearDown(self):
+        shutdown_engine()
+
+    def test_worker_threads_share_one_engine(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch.dict("os.environ", {ui_agent.CACHE_DIR_ENV: tmp}):
+                engines = []
+                threads = [
+                    threading.Thread(target=lambda: engines.append(get_engine())) for _ in range(8)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+                self.assertEqual(len({id(engine) for engine in engines}), 1)
+                self.assertEqual(engines[0].cache_dir, Path(tmp))
+                shutdown_engine()
+
+    def test_empty_cache_dir_setting_disables_disk_cache(self):
+        with patch.dict("os.environ", {ui_agent.CACHE_DIR_ENV: ""}):
+            self.assertIsNone(get_engine().cache)
+
+    def test_unusable_cache_dir_falls_back_to_no_disk_cache(self):
+        with tempfile.NamedTemporaryFile() as not_a_dir:
+            with patch.dict("os.environ", {ui_agent.CACHE_DIR_ENV: not_a_dir.name}):
+                with self.assertLogs("ui_agent", level="WARNING"):
+                    engine = get_engine()
+
+        self.assertIsNone(engine.cache)
+        self.assertIsNone(engine.local_index)
+
+    def test_missing_fts5_falls_back_to_no_disk_cache(self):
+        def open_local_index(cache_dir):
+            if cache_dir is not None:
+                raise sqlite3.OperationalError("no such module: fts5")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch.dict("os.environ", {ui_agent.CACHE_DIR_ENV: tmp}):
+                with patch("agent.engine.open_local_index", side_effect=open_local_index):
+                    with self.assertLogs("ui_agent", level="WARNING"):
+                        engine = get_engine()
+
+        self.assertIsNone(engine.cache)
+
 
 if __name__ == "__main__":
     unittest.main()
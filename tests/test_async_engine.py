@@ -0,0 +1,249 @@
+import asyncio
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, patch
+
+from agent.async_engine import AsyncSearchEngine
+from agent.deadline import Deadline
+from agent.models import ResultsRanked, SearchSettings, SourceExtracted, SummaryReady
+from agent.politeness import PolitenessScheduler
+from agent.provider_health import ProviderHealth
+from agent.robots import ROBOTS_CACHE
+from agent.search import HedgePolicy
+
+ARTICLE = (
+    "<html><body><article>"
+    + "<p>The Example Survey was first published in 2019 and covered 1,500 households. "
+    "Researchers at Example University reported a 12% increase in participation since 2020. "
+    "The Example Council approved a second survey round in 2023 after public review.</p>" * 3
+    + "</article></body></html>"
+)
+
+OTHER_ARTICLE = (
+    "<html><body><article>"
+    + "<p>Coastal wetlands store carbon in deep layers of waterlogged soil. "
+    "Tidal marshes along the Atlantic coast have lost 8% of their area since 1990. "
+    "Restoration projects reopened blocked channels to bring back daily flooding.</p>" * 3
+    + "</article></body></html>"
+)
+
+ROBOTS = "User-agent: *\nDisallow: /private\n"
+
+
+def _unthrottled():
+    return PolitenessScheduler(min_interval=0, max_per_domain=8)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    robots_hits = 0
+
+    def do_GET(self):
+        if self.path == "/robots.txt":
+            type(self).robots_hits += 1
+            time.sleep(0.1)
+            self._send(200, ROBOTS, "text/plain")
+        elif self.path.startswith("/article") or self.path.startswith("/private"):
+            self._send(200, ARTICLE, "text/html; charset=utf-8")
+        elif self.path.startswith("/other"):
+            self._send(200, OTHER_ARTICLE, "text/html; charset=utf-8")
+        elif self.path.startswith("/slow"):
+            time.sleep(1)
+            self._send(200, OTHER_ARTICLE, "text/html; charset=utf-8")
+        else:
+            self._send(404, "missing", "text/plain")
+
+    def _send(self, status, body, content_type):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AsyncSearchEngineTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def _results(self, *paths):
+        return [
+            {
+                "url": f"{self.base_url}{path}",
+                "title": path,
+                "snippet": "",
+                "domain": "127.0.0.1",
+                "score": 0,
+            }
+            for path in paths
+        ]
+
+    def test_run_fetches_and_summarizes_allowed_sources(self):
+        raw = self._results("/article/1", "/private/2", "/missing")
+
+        async def scenario():
+            async with AsyncSearchEngine(scheduler=_unthrottled()) as engine:
+                with patch.object(engine, "_search_web", AsyncMock(return_value=raw)):
+                    return await engine.run("example survey", SearchSettings(max_results=3))
+
+        response = asyncio.run(scenario())
+
+        self.assertIsNone(response.error)
+        self.assertEqual(response.sources, [f"{self.base_url}/article/1"])
+        self.assertIn("Example", response.summary)
+
+    def test_many_queries_share_one_event_loop(self):
+        raw = self._results("/article/a", "/other/b")
+
+        async def scenario():
+            async with AsyncSearchEngine(scheduler=_unthrottled()) as engine:
+                with patch.object(engine, "_search_web", AsyncMock(return_value=raw)):
+                    return await asyncio.gather(
+                        *(engine.run(f"query {index}") for index in range(20))
+                    )
+
+        responses = asyncio.run(scenario())
+
+        self.assertEqual(len(responses), 20)
+        for response in responses:
+            self.assertEqual(len(response.sources), 2)
+
+    def test_copies_of_one_page_fill_a_single_source_slot(self):
+        raw = self._results("/article/a", "/article/b", "/other/c")
+
+        async def scenario():
+            async with AsyncSearchEngine(scheduler=_unthrottled()) as engine:
+                with patch.object(engine, "_search_web", AsyncMock(return_value=raw)):
+                    return await engine.run("example survey")
+
+        response = asyncio.run(scenario())
+
+        self.assertEqual(
+            response.sources, [f"{self.base_url}/article/a", f"{self.base_url}/other/c"]
+        )
+
+    def test_reading_stops_once_the_evidence_suffices(self):
+        raw = self._results("/article/a", "/slow/b")
+        settings = SearchSettings(evidence_sentences=1, evidence_domains=1)
+
+        async def scenario():
+            async with AsyncSearchEngine(scheduler=_unthrottled()) as engine:
+                with patch.object(engine, "_search_web", AsyncMock(return_value=raw)):
+                    return await engine.run("example survey", settings)
+
+        started = time.monotonic()
+        response = asyncio.run(scenario())
+
+        self.assertLess(time.monotonic() - started, 0.9)
+        self.assertFalse(response.partial)
+        self.assertEqual(response.sources, [f"{self.base_url}/article/a"])
+
+    def test_run_iter_streams_events(self):
+        raw = self._results("/article/1", "/private/2")
+
+        async def scenario():
+            async with AsyncSearchEngine(scheduler=_unthrottled()) as engine:
+                with patch.object(engine, "_search_web", AsyncMock(return_value=raw)):
+                    return [event async for event in engine.run_iter("example survey")]
+
+        events = asyncio.run(scenario())
+
+        self.assertIsInstance(events[0], ResultsRanked)
+        self.assertIsInstance(events[-1], SummaryReady)
+        extracted = [event.url for event in events if isinstance(event, SourceExtracted)]
+        self.assertEqual(extracted, [f"{self.base_url}/article/1"])
+
+    def test_deadline_returns_partial_response(self):
+        raw = self._results("/article/fast")
+
+        async def slow_fetch(url, deadline=None):
+            if url.endswith("/slow"):
+                await asyncio.sleep(5)
+            return ARTICLE, "fetched"
+
+        async def scenario():
+            async with AsyncSearchEngine(scheduler=_unthrottled()) as engine:
+                raw_with_slow = raw + self._results("/article/slow")
+                with patch.object(engine, "_search_web", AsyncMock(return_value=raw_with_slow)):
+                    with patch.object(engine, "_fetch_url", side_effect=slow_fetch):
+                        settings = SearchSettings(max_results=2, deadline=0.5)
+                        return await engine.run("example survey", settings)
+
+        response = asyncio.run(scenario())
+
+        self.assertTrue(response.partial)
+        self.assertEqual(response.sources, [f"{self.base_url}/article/fast"])
+
+    def test_sources_on_one_origin_share_a_robots_download(self):
+        urls = [f"{self.base_url}/article/{index}" for index in range(5)]
+        ROBOTS_CACHE.clear()
+        _StandInHandler.robots_hits = 0
+
+        async def scenario():
+            async with AsyncSearchEngine(scheduler=_unthrottled()) as engine:
+                allowed = await asyncio.gather(*(engine._allowed_by_robots(url) for url in urls))
+                return allowed, engine._robots_fetches
+
+        allowed, in_flight = asyncio.run(scenario())
+
+        self.assertEqual(allowed, [True] * 5)
+        self.assertEqual(_StandInHandler.robots_hits, 1)
+        self.assertEqual(in_flight, {})
+
+    def test_page_fetch_timeout_is_clamped_to_the_deadline(self):
+        async def scenario():
+            async with AsyncSearchEngine(scheduler=_unthrottled()) as engine:
+                return await engine._fetch_url(f"{self.base_url}/slow/a", Deadline(0.2))
+
+        started = time.monotonic()
+        html, status = asyncio.run(scenario())
+
+        self.assertLess(time.monotonic() - started, 0.9)
+        self.assertIsNone(html)
+        self.assertTrue(status.startswith("request_error"))
+
+    def test_hedged_search_cancels_slower_providers(self):
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append("slow")
+                raise
+            return []
+
+        async def fast():
+            return self._results("/article/fast")
+
+        async def scenario():
+            engine = AsyncSearchEngine(provider_health=ProviderHealth())
+            stages = [("slow", slow), ("fast", fast)]
+            return await engine._hedged_search(stages, HedgePolicy(delay=0.05))
+
+        results = asyncio.run(scenario())
+
+        self.assertEqual(results[0]["url"], f"{self.base_url}/article/fast")
+        self.assertEqual(cancelled, ["slow"])
+
+    def test_empty_query_returns_error_without_network(self):
+        response = asyncio.run(AsyncSearchEngine().run("   "))
+
+        self.assertEqual(response.error, "Query cannot be empty.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from agent.cache import FileCache, SQLiteCache, open_cache
+
+
+class SQLiteCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "cache.sqlite3"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_with_metadata(self):
+        cache = SQLiteCache(self.path)
+        cache.put("html", "https://example.com/", "<html>hello</html>", {"etag": '"v1"'})
+
+        entry = cache.get("html", "https://example.com/")
+
+        self.assertEqual(entry.value, "<html>hello</html>")
+        self.assertEqual(entry.meta, {"etag": '"v1"'})
+        self.assertIsNone(cache.get("text", "https://example.com/"))
+        cache.close()
+
+    def test_update_meta_keeps_value(self):
+        cache = SQLiteCache(self.path)
+        cache.put("html", "k", "body", {"status": 200})
+
+        cache.update_meta("html", "k", {"status": 304})
+
+        entry = cache.get("html", "k")
+        self.assertEqual(entry.value, "body")
+        self.assertEqual(entry.meta["status"], 304)
+        cache.close()
+
+    def test_values_are_compressed(self):
+        cache = SQLiteCache(self.path)
+        text = "repetitive page content " * 2000
+
+        cache.put("text", "k", text)
+
+        self.assertLess(cache.total_bytes(), len(text) // 10)
+        cache.close()
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = SQLiteCache(self.path, max_bytes=4000, compression_level=0, touch_interval=0)
+        for index in range(3):
+            cache.put("text", f"k{index}", "x" * 1000)
+        # Touch k0 so k1 becomes the oldest entry.
+        cache.get("text", "k0")
+
+        cache.put("text", "k3", "x" * 1500)
+
+        self.assertLessEqual(cache.total_bytes(), 4000)
+        self.assertIsNone(cache.get("text", "k1"))
+        self.assertIsNotNone(cache.get("text", "k0"))
+        self.assertIsNotNone(cache.get("text", "k3"))
+        cache.close()
+
+    def test_eviction_can_span_several_batches(self):
+        cache = SQLiteCache(self.path, max_bytes=20000, compression_level=0)
+        for index in range(150):
+            cache.put("text", f"k{index:03d}", "x" * 100)
+
+        cache.put("text", "big", "y" * 12000)
+
+        self.assertLessEqual(cache.total_bytes(), 18000)
+        self.assertIsNone(cache.get("text", "k080"))
+        self.assertIsNotNone(cache.get("text", "k120"))
+        self.assertIsNotNone(cache.get("text", "big"))
+        cache.close()
+
+    def test_hits_refresh_recency_at_most_once_per_interval(self):
+        cache = SQLiteCache(self.path, touch_interval=60)
+        cache.put("text", "k", "body")
+        conn = cache._connection()
+        conn.execute("UPDATE entries SET accessed_at = accessed_at - 30")
+        touched_at = conn.execute("SELECT accessed_at FROM entries").fetchone()[0]
+
+        cache.get("text", "k")
+        self.assertEqual(conn.execute("SELECT accessed_at FROM entries").fetchone()[0], touched_at)
+
+        conn.execute("UPDATE entries SET accessed_at = accessed_at - 60")
+        cache.get("text", "k")
+        refreshed_at = conn.execute("SELECT accessed_at FROM entries").fetchone()[0]
+        self.assertGreater(refreshed_at, touched_at)
+        cache.close()
+
+    def test_concurrent_writers_share_one_file(self):
+        cache = SQLiteCache(self.path)
+        other = SQLiteCache(self.path)
+
+        def writer(store, prefix):
+            for index in range(50):
+                store.put("text", f"{prefix}{index}", f"value {index}")
+
+        threads = [
+            threading.Thread(target=writer, args=(store, prefix))
+            for store, prefix in ((cache, "a"), (cache, "b"), (other, "c"))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for prefix in "abc":
+            self.assertEqual(cache.get("text", f"{prefix}49").value, "value 49")
+        cache.close()
+        other.close()
+
+    def test_connections_of_finished_threads_are_closed(self):
+        cache = SQLiteCache(self.path)
+        for index in range(5):
+            thread = threading.Thread(target=cache.put, args=("text", f"k{index}", "value"))
+            thread.start()
+            thread.join()
+
+        cache.get("text", "k0")
+
+        self.assertLessEqual(len(cache._connections), 2)
+        cache.close()
+
+
+class OpenCacheTests(unittest.TestCase):
+    def test_backend_selection(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sqlite_cache = open_cache(tmp)
+            self.assertIsInstance(sqlite_cache, SQLiteCache)
+            self.assertTrue((Path(tmp) / "cache.sqlite3").exists())
+            sqlite_cache.close()
+
+            self.assertIsInstance(open_cache(tmp, backend="files"), FileCache)
+            self.assertIsNone(open_cache(None))
+            with self.assertRaises(ValueError):
+                open_cache(tmp, backend="redis")
+
+    def test_file_cache_survives_concurrent_writes_to_one_key(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = FileCache(tmp)
+            errors = []
+
+            def write(worker):
+                try:
+                    for index in range(50):
+                        cache.put("html", "https://example.com/", f"{worker}-{index}")
+                except OSError as error:
+                    errors.append(error)
+
+            threads = [threading.Thread(target=write, args=(worker,)) for worker in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(errors, [])
+            self.assertIsNotNone(cache.get("html", "https://example.com/"))
+            self.assertEqual(list(Path(tmp).rglob("*.tmp")), [])
+
+    def test_file_cache_keeps_original_layout(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = FileCache(tmp)
+            cache.put("text", "https://example.com/", "extracted")
+
+            files = list((Path(tmp) / "text").glob("*.txt"))
+            self.assertEqual(len(files), 1)
+            self.assertEqual(cache.get("text", "https://example.com/").value, "extracted")
+
+
+if __name__ == "__main__":
+    unittest.main()
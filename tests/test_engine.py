@@ -0,0 +1,465 @@
+import random
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from agent.deadline import Deadline
+from agent.engine import SearchEngine, SourceMemo
+from agent.local_index import LocalIndex
+from agent.models import (
+    ResultsRanked,
+    SearchResult,
+    SearchSettings,
+    SourceExtracted,
+    SourceFetched,
+    SummaryReady,
+)
+
+LONG_TEXT = (
+    "The first Example Report was published in 2021 with 1,200 pages of findings. "
+    "Researchers at Example University found a 12% increase in activity since 2019. "
+    "The committee met again in 2023 to review the original Example Report results. "
+) * 3
+
+
+def _page(url=""):
+    # Enough visible text to pass triage; extraction itself is mocked.
+    return f"<html><body><p>{url} {LONG_TEXT}</p></body></html>"
+
+
+def _text(url):
+    # Each source gets its own wording, so sources are not collapsed as near-duplicates.
+    words = LONG_TEXT.split()
+    random.Random(url).shuffle(words)
+    return f"{url} " + " ".join(words)
+
+
+def _raw_result(index):
+    return {
+        "url": f"https://site{index}.example/page",
+        "title": f"Result {index}",
+        "snippet": "",
+        "domain": f"site{index}.example",
+        "score": 10 - index,
+    }
+
+
+class SearchEngineConcurrencyTests(unittest.TestCase):
+    @patch("agent.engine.cached_extract")
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_sources_keep_ranking_order_when_fetched_concurrently(
+        self, mock_search, _mock_robots, mock_fetch, mock_extract
+    ):
+        mock_search.return_value = [_raw_result(index) for index in range(4)]
+
+        def slow_first_fetch(url, cache_dir=None, **kwargs):
+            # The top-ranked source finishes last.
+            if "site0" in url:
+                time.sleep(0.2)
+            return _page(url), "fetched"
+
+        mock_fetch.side_effect = slow_first_fetch
+        mock_extract.side_effect = lambda url, html, cache_dir=None, **kwargs: _text(url)
+
+        response = SearchEngine().run("example", SearchSettings(max_results=4, max_workers=4))
+
+        self.assertEqual(
+            response.sources,
+            [f"https://site{index}.example/page" for index in range(4)],
+        )
+
+    @patch("agent.engine.cached_extract", return_value=LONG_TEXT)
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_concurrency_is_bounded_by_max_workers(
+        self, mock_search, _mock_robots, mock_fetch, _mock_extract
+    ):
+        raw_results = [_raw_result(index) for index in range(6)]
+
+        def search(query, on_results=None, **kwargs):
+            # Prefetches of the lowest-ranked results must count against the same bound.
+            on_results(raw_results[4:])
+            time.sleep(0.02)
+            return raw_results
+
+        mock_search.side_effect = search
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def tracking_fetch(url, cache_dir=None, **kwargs):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+            return _page(), "fetched"
+
+        mock_fetch.side_effect = tracking_fetch
+
+        SearchEngine().run("example", SearchSettings(max_results=6, max_workers=2))
+
+        self.assertEqual(mock_fetch.call_count, 6)
+        self.assertLessEqual(state["peak"], 2)
+
+    @patch("agent.engine.cached_extract", return_value=LONG_TEXT)
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_failing_source_does_not_abort_run(
+        self, mock_search, _mock_robots, mock_fetch, _mock_extract
+    ):
+        mock_search.return_value = [_raw_result(index) for index in range(2)]
+
+        def flaky_fetch(url, cache_dir=None, **kwargs):
+            if "site0" in url:
+                raise RuntimeError("boom")
+            return _page(), "fetched"
+
+        mock_fetch.side_effect = flaky_fetch
+
+        response = SearchEngine().run("example", SearchSettings(max_results=2))
+
+        self.assertEqual(response.sources, ["https://site1.example/page"])
+
+
+class SearchEngineEventTests(unittest.TestCase):
+    @patch("agent.engine.cached_extract")
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", side_effect=lambda url, **kwargs: "site2" not in url)
+    @patch("agent.engine.search_web")
+    def test_run_iter_reports_progress_before_the_summary(
+        self, mock_search, _mock_robots, mock_fetch, mock_extract
+    ):
+        mock_search.return_value = [_raw_result(index) for index in range(3)]
+        mock_fetch.side_effect = lambda url, *args, **kwargs: (_page(url), "fetched")
+        mock_extract.side_effect = lambda url, html, cache_dir=None, **kwargs: _text(url)
+
+        events = list(SearchEngine().run_iter("example", SearchSettings(max_results=3)))
+
+        self.assertIsInstance(events[0], ResultsRanked)
+        self.assertEqual(events[0].sources_to_read, 3)
+        self.assertIsInstance(events[-1], SummaryReady)
+        fetched = [event for event in events if isinstance(event, SourceFetched)]
+        extracted = [event for event in events if isinstance(event, SourceExtracted)]
+        self.assertEqual(len(fetched), 3)
+        self.assertEqual(
+            sorted(event.url for event in extracted),
+            ["https://site0.example/page", "https://site1.example/page"],
+        )
+        self.assertEqual(
+            events[-1].response.sources,
+            ["https://site0.example/page", "https://site1.example/page"],
+        )
+
+    @patch("agent.engine.search_web", return_value=[])
+    def test_run_iter_ends_with_summary_when_nothing_is_found(self, _mock_search):
+        events = list(SearchEngine().run_iter("example"))
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].response.error, "No results were returned.")
+
+
+class SearchEngineDeadlineTests(unittest.TestCase):
+    @patch("agent.engine.cached_extract")
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_slow_sources_are_dropped_when_the_budget_runs_out(
+        self, mock_search, _mock_robots, mock_fetch, mock_extract
+    ):
+        mock_search.return_value = [_raw_result(index) for index in range(3)]
+
+        def fetch(url, cache_dir=None, **kwargs):
+            if "site2" in url:
+                time.sleep(2)
+            return _page(url), "fetched"
+
+        mock_fetch.side_effect = fetch
+        mock_extract.side_effect = lambda url, html, cache_dir=None, **kwargs: _text(url)
+
+        started = time.monotonic()
+        response = SearchEngine().run(
+            "example", SearchSettings(max_results=3, max_workers=3, deadline=0.5)
+        )
+
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertTrue(response.partial)
+        self.assertEqual(
+            response.sources,
+            ["https://site0.example/page", "https://site1.example/page"],
+        )
+        self.assertLessEqual(mock_fetch.call_args.kwargs["timeout"], 0.5)
+
+    @patch("agent.engine.search_web")
+    def test_provider_phase_is_bounded_by_the_deadline(self, mock_search):
+        mock_search.side_effect = lambda *args, **kwargs: time.sleep(2) or []
+
+        started = time.monotonic()
+        response = SearchEngine().run("example", SearchSettings(deadline=0.3))
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertTrue(response.partial)
+        self.assertEqual(response.error, "Search timed out before results were returned.")
+
+    @patch("agent.engine.cached_extract", return_value=LONG_TEXT)
+    @patch("agent.engine.fetch_url", return_value=(_page(), "fetched"))
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_complete_run_is_not_partial(self, mock_search, *_mocks):
+        mock_search.return_value = [_raw_result(0)]
+
+        response = SearchEngine().run("example", SearchSettings(max_results=1, deadline=5))
+
+        self.assertFalse(response.partial)
+        self.assertEqual(response.sources, ["https://site0.example/page"])
+
+
+class SearchEngineEarlyStopTests(unittest.TestCase):
+    @patch("agent.engine.cached_extract")
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_reading_stops_once_the_evidence_suffices(
+        self, mock_search, _mock_robots, mock_fetch, mock_extract
+    ):
+        mock_search.return_value = [_raw_result(index) for index in range(6)]
+        release = threading.Event()
+        self.addCleanup(release.set)
+        fetched = []
+
+        def fetch(url, cache_dir=None, **kwargs):
+            fetched.append(url)
+            if "site0" not in url and "site1" not in url:
+                release.wait(2)
+            return _page(url), "fetched"
+
+        mock_fetch.side_effect = fetch
+        mock_extract.side_effect = lambda url, html, cache_dir=None, **kwargs: _text(url)
+        settings = SearchSettings(
+            max_results=6, max_workers=2, evidence_sentences=2, evidence_domains=2
+        )
+
+        started = time.monotonic()
+        response = SearchEngine().run("example report", settings)
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertFalse(response.partial)
+        self.assertEqual(
+            response.sources, ["https://site0.example/page", "https://site1.example/page"]
+        )
+        # Sources still queued when the evidence sufficed were never fetched.
+        self.assertLessEqual(len(fetched), 4)
+
+    @patch("agent.engine.cached_extract", return_value=LONG_TEXT)
+    @patch("agent.engine.fetch_url", return_value=(_page(), "fetched"))
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_every_candidate_is_read_by_default(self, mock_search, mock_robots, *_mocks):
+        mock_search.return_value = [_raw_result(index) for index in range(5)]
+
+        SearchEngine().run("example report", SearchSettings(max_results=5))
+
+        self.assertEqual(mock_robots.call_count, 5)
+
+
+class SearchEnginePrefetchTests(unittest.TestCase):
+    @patch("agent.engine.cached_extract")
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_fetches_start_while_providers_are_still_running(
+        self, mock_search, _mock_robots, mock_fetch, mock_extract
+    ):
+        fetching = threading.Event()
+
+        def search(query, on_results=None, **kwargs):
+            on_results([_raw_result(2)])
+            # Still paginating; the engine is already fetching the early result.
+            if not fetching.wait(2):
+                return []
+            return [_raw_result(index) for index in range(3)]
+
+        def fetch(url, *args, **kwargs):
+            fetching.set()
+            return _page(url), "fetched"
+
+        mock_search.side_effect = search
+        mock_fetch.side_effect = fetch
+        mock_extract.side_effect = lambda url, html, cache_dir=None, **kwargs: _text(url)
+
+        events = list(SearchEngine().run_iter("example", SearchSettings(max_results=3)))
+
+        fetched = [call.args[0] for call in mock_fetch.call_args_list]
+        self.assertEqual(fetched[0], "https://site2.example/page")
+        self.assertEqual(sorted(fetched), [_raw_result(index)["url"] for index in range(3)])
+        self.assertEqual(sum(isinstance(event, SourceFetched) for event in events), 3)
+        # The final ranking still decides the order of the answer.
+        self.assertEqual(
+            events[-1].response.sources, [_raw_result(index)["url"] for index in range(3)]
+        )
+
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.search_web")
+    def test_lazy_summaries_do_not_prefetch(self, mock_search, mock_fetch):
+        mock_search.return_value = [_raw_result(0)]
+
+        SearchEngine().run("example", SearchSettings(summary_mode="lazy"))
+
+        self.assertIsNone(mock_search.call_args.kwargs["on_results"])
+        mock_fetch.assert_not_called()
+
+
+class SearchEngineBatchTests(unittest.TestCase):
+    @patch("agent.engine.cached_extract")
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_shared_urls_are_read_once_per_batch(
+        self, mock_search, _mock_robots, mock_fetch, mock_extract
+    ):
+        # Every query shares site0 and site1; each also has one URL of its own.
+        mock_search.side_effect = lambda query, **kwargs: [
+            _raw_result(0),
+            _raw_result(1),
+            _raw_result(10 + int(query.split()[-1])),
+        ]
+        mock_fetch.side_effect = lambda url, *args, **kwargs: (_page(url), "fetched")
+        mock_extract.side_effect = lambda url, html, cache_dir=None, **kwargs: _text(url)
+        queries = [f"topic {index}" for index in range(5)]
+
+        responses = list(
+            SearchEngine().run_many(queries, SearchSettings(max_results=3), max_queries=3)
+        )
+
+        self.assertEqual(sorted(response.query for response in responses), queries)
+        fetched = [call.args[0] for call in mock_fetch.call_args_list]
+        self.assertEqual(len(fetched), len(set(fetched)))
+        self.assertEqual(len(fetched), 2 + len(queries))
+        for response in responses:
+            self.assertIn("https://site0.example/page", response.sources)
+
+    @patch("agent.engine.cached_extract")
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    def test_unfinished_reads_are_not_shared(self, _mock_robots, mock_fetch, mock_extract):
+        result = SearchResult.from_mapping(_raw_result(0))
+        mock_fetch.side_effect = [RuntimeError("boom"), (_page(result.url), "fetched")]
+        mock_extract.side_effect = lambda url, html, cache_dir=None, **kwargs: _text(url)
+        engine = SearchEngine()
+        memo = SourceMemo()
+        ignore = lambda event: None
+
+        # Neither an expired deadline nor an exception says anything about the page.
+        self.assertIsNone(engine._source_text(result, Deadline(0), ignore, memo))
+        self.assertIsNone(engine._source_text(result, None, ignore, memo))
+        text = engine._source_text(result, None, ignore, memo)
+
+        self.assertEqual(text, _text(result.url))
+        self.assertEqual(mock_fetch.call_count, 2)
+        self.assertEqual(engine._source_text(result, None, ignore, memo), text)
+        self.assertEqual(mock_fetch.call_count, 2)
+
+    @patch("agent.engine.search_web", return_value=[])
+    def test_queries_are_consumed_lazily(self, _mock_search):
+        consumed = []
+
+        def queries():
+            for index in range(100):
+                consumed.append(index)
+                yield f"topic {index}"
+
+        batch = SearchEngine().run_many(queries(), max_queries=2)
+        next(batch)
+        batch.close()
+
+        self.assertLessEqual(len(consumed), 4)
+
+
+class SearchEngineSummaryModeTests(unittest.TestCase):
+    @patch("agent.engine.cached_extract")
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_lazy_summary_fetches_only_when_read(
+        self, mock_search, _mock_robots, mock_fetch, mock_extract
+    ):
+        mock_search.return_value = [_raw_result(index) for index in range(2)]
+        mock_fetch.side_effect = lambda url, *args, **kwargs: (_page(url), "fetched")
+        mock_extract.side_effect = lambda url, html, cache_dir=None, **kwargs: _text(url)
+
+        response = SearchEngine().run("example", SearchSettings(summary_mode="lazy"))
+
+        self.assertEqual(len(response.results), 2)
+        mock_fetch.assert_not_called()
+        self.assertTrue(response.summary.startswith("About example, "))
+        self.assertEqual(
+            response.sources, ["https://site0.example/page", "https://site1.example/page"]
+        )
+        self.assertEqual(mock_fetch.call_count, 2)
+
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.search_web")
+    def test_results_only_mode_never_fetches(self, mock_search, mock_fetch):
+        mock_search.return_value = [_raw_result(index) for index in range(3)]
+
+        events = list(SearchEngine().run_iter("example", SearchSettings(summary_mode="off")))
+
+        self.assertEqual(events[0].sources_to_read, 0)
+        response = events[-1].response
+        self.assertEqual(len(response.results), 3)
+        self.assertEqual(response.to_dict()["summary"], "")
+        mock_fetch.assert_not_called()
+
+
+class SearchEngineLocalSearchTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = LocalIndex(f"{self.tmp.name}/index.sqlite3")
+        for index in range(3):
+            self.index.add(f"https://site{index}.example/page", f"{index} {LONG_TEXT}")
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    @patch("agent.engine.search_web")
+    def test_cache_first_answers_locally_when_enough_pages_match(self, mock_search):
+        engine = SearchEngine(local_index=self.index)
+
+        response = engine.run("example report", SearchSettings(local_search="cache_first"))
+
+        mock_search.assert_not_called()
+        self.assertEqual(len(response.results), 3)
+        self.assertEqual(len(response.sources), 3)
+        self.assertIn("Example Report", response.summary)
+
+    @patch("agent.engine.search_web")
+    def test_cache_first_falls_back_to_providers(self, mock_search):
+        mock_search.return_value = []
+        engine = SearchEngine(local_index=self.index)
+
+        strict = SearchSettings(local_search="cache_first", local_min_sources=4)
+        engine.run("example report", strict)
+        engine.run("unrelated topic", SearchSettings(local_search="cache_first"))
+
+        self.assertEqual(mock_search.call_count, 2)
+
+    @patch("agent.engine.search_web")
+    def test_offline_never_asks_providers(self, mock_search):
+        engine = SearchEngine(local_index=self.index)
+
+        response = engine.run("unrelated topic", SearchSettings(local_search="offline"))
+
+        mock_search.assert_not_called()
+        self.assertEqual(response.results, [])
+        self.assertEqual(response.error, "No local results were found.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from agent.evidence import Evidence
+
+
+class EvidenceTests(unittest.TestCase):
+    def test_needs_enough_sentences_from_enough_domains(self):
+        evidence = Evidence("solar panels", min_sentences=2, min_domains=2)
+
+        self.assertFalse(
+            evidence.add(
+                "https://a.example/1",
+                [
+                    "Solar panels convert sunlight into electricity.",
+                    "Rooftop panels supply a growing share of household power.",
+                ],
+            )
+        )
+        self.assertEqual(evidence.sentences, 2)
+        self.assertEqual(evidence.domains, 1)
+        self.assertTrue(
+            evidence.add("https://b.example/2", ["Solar prices fell by half from 2010 to 2020."])
+        )
+
+    def test_irrelevant_and_repeated_sentences_do_not_count(self):
+        evidence = Evidence("university researchers", min_sentences=2, min_domains=1)
+        sentence = "Researchers at Example University found a 12% rise in activity since 2019."
+
+        evidence.add("https://a.example/", [sentence, "The museum opened a new wing in 2019."])
+        evidence.add("https://b.example/", ["(Reuters) " + sentence])
+
+        self.assertEqual(evidence.sentences, 1)
+        self.assertEqual(evidence.domains, 1)
+        self.assertFalse(evidence.sufficient)
+
+    def test_without_a_query_sentences_with_facts_count(self):
+        evidence = Evidence(None, min_sentences=1, min_domains=1)
+
+        self.assertFalse(evidence.add("https://a.example/", ["it was fine and quiet overall."]))
+        self.assertTrue(evidence.add("https://a.example/", ["Attendance rose 12% in 2021."]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from bs4 import BeautifulSoup
+from readability import Document
+
+from agent.cache import SQLiteCache
+from agent.extract import ExtractionPool, cached_extract, extract_main_text
+
+ARTICLE = (
+    "<html><head><title>Example</title><script>var x = 1;</script></head><body>"
+    "<nav>Home | About</nav><article>"
+    + "<p>The Example Report covers findings from 2021 through 2023 in detail.</p>" * 20
+    + "</article><footer>Copyright</footer></body></html>"
+)
+
+NOISY_PAGE = (
+    "<html><head><title>Noisy</title><style>p { color: red }</style></head><body>"
+    "<header>Site header</header><div id='content'>"
+    + "<p>Researchers measured a 12% rise in <b>activity</b> &amp; output<!-- note --> "
+    "during 2022, according to the <a href='/r'>report</a>.</p>" * 12
+    + "<aside>Related links</aside><noscript>Enable JS</noscript></div>"
+    "<footer>Footer text</footer><script>track();</script></body></html>"
+)
+
+
+def _reparse_extract(html):
+    # The previous readability -> HTML string -> BeautifulSoup path.
+    try:
+        soup = BeautifulSoup(Document(html).summary(html_partial=True), "lxml")
+    except Exception:
+        soup = BeautifulSoup(html, "lxml")
+    for tag in soup(["script", "style", "noscript", "header", "footer", "nav", "aside"]):
+        tag.decompose()
+    return soup.get_text(separator=" ", strip=True)
+
+
+class ExtractMainTextTests(unittest.TestCase):
+    def test_text_matches_the_reparse_path(self):
+        for html in (ARTICLE, NOISY_PAGE, "<p>Short page.</p>"):
+            self.assertEqual(extract_main_text(html), _reparse_extract(html))
+
+    def test_full_document_is_used_when_readability_fails(self):
+        with patch("agent.extract._TreeDocument.summary", side_effect=ValueError("unparseable")):
+            text = extract_main_text(NOISY_PAGE)
+
+        with patch("tests.test_extract.Document.summary", side_effect=ValueError("unparseable")):
+            expected = _reparse_extract(NOISY_PAGE)
+        self.assertEqual(text, expected)
+        self.assertNotIn("Site header", text)
+        self.assertNotIn("track()", text)
+
+
+class ExtractionPoolTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ExtractionPool(max_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_worker_output_matches_in_process_extraction(self):
+        self.assertEqual(self.pool.extract(ARTICLE), extract_main_text(ARTICLE))
+        self.assertEqual(self.pool.extract(""), "")
+
+    def test_text_cache_is_written_by_the_caller(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SQLiteCache(f"{tmp}/cache.sqlite3")
+            url = "https://example.com/report"
+
+            text = cached_extract(url, ARTICLE, cache, extractor=self.pool.extract)
+
+            self.assertIn("Example Report", text)
+            self.assertEqual(cache.get("text", url).value, text)
+            # A cached entry is served without asking the pool again.
+            self.assertEqual(cached_extract(url, "", cache, extractor=self.pool.extract), text)
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
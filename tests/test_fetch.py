@@ -0,0 +1,220 @@
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from agent.cache import FileCache
+from agent.extract import cached_extract
+from agent.fetch import fetch_url
+from agent.http_client import HttpClient
+from agent.politeness import PolitenessScheduler
+
+PAGE = "<html><body><p>Example page body.</p></body></html>"
+
+
+class _ValidatingHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+    fail = False
+
+    def do_GET(self):
+        type(self).requests_seen.append(dict(self.headers))
+        if self.fail:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            return
+        payload = PAGE.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Last-Modified", "Mon, 01 Jan 2024 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FetchRevalidationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _ValidatingHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _ValidatingHandler.requests_seen = []
+        _ValidatingHandler.fail = False
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmp.name)
+        self.kwargs = {
+            "client": HttpClient(retries=0),
+            "scheduler": PolitenessScheduler(min_interval=0),
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sidecar_records_validators(self):
+        url = f"{self.base_url}/page"
+
+        html, status = fetch_url(url, self.cache_dir, **self.kwargs)
+
+        self.assertEqual(status, "fetched")
+        self.assertEqual(html, PAGE)
+        meta = FileCache(self.cache_dir).get("html", url).meta
+        self.assertEqual(meta["etag"], '"v1"')
+        self.assertEqual(meta["last_modified"], "Mon, 01 Jan 2024 00:00:00 GMT")
+        self.assertEqual(meta["status"], 200)
+        self.assertEqual(meta["final_url"], url)
+
+    def test_fresh_entry_is_served_without_network(self):
+        url = f"{self.base_url}/page"
+        fetch_url(url, self.cache_dir, max_age=3600, **self.kwargs)
+
+        html, status = fetch_url(url, self.cache_dir, max_age=3600, **self.kwargs)
+
+        self.assertEqual(status, "cached")
+        self.assertEqual(html, PAGE)
+        self.assertEqual(len(_ValidatingHandler.requests_seen), 1)
+
+    def test_stale_entry_is_revalidated_with_conditional_get(self):
+        url = f"{self.base_url}/page"
+        fetch_url(url, self.cache_dir, **self.kwargs)
+
+        html, status = fetch_url(url, self.cache_dir, max_age=0, **self.kwargs)
+
+        self.assertEqual(status, "revalidated")
+        self.assertEqual(html, PAGE)
+        self.assertEqual(_ValidatingHandler.requests_seen[-1].get("If-None-Match"), '"v1"')
+
+    def test_stale_entry_is_served_when_origin_fails(self):
+        url = f"{self.base_url}/page"
+        fetch_url(url, self.cache_dir, **self.kwargs)
+        _ValidatingHandler.fail = True
+
+        html, status = fetch_url(url, self.cache_dir, max_age=0, **self.kwargs)
+
+        self.assertEqual(status, "stale")
+        self.assertEqual(html, PAGE)
+
+    def test_legacy_entry_without_sidecar_is_refetched_when_stale(self):
+        url = f"{self.base_url}/legacy"
+        FileCache(self.cache_dir).put("html", url, "<html>old</html>")
+
+        html, status = fetch_url(url, self.cache_dir, max_age=0, **self.kwargs)
+
+        self.assertEqual(status, "fetched")
+        self.assertEqual(html, PAGE)
+        self.assertNotIn("If-None-Match", _ValidatingHandler.requests_seen[-1])
+
+    def test_changed_body_drops_text_extracted_from_the_old_one(self):
+        url = f"{self.base_url}/changed"
+        cache = FileCache(self.cache_dir)
+        cache.put("html", url, "<html><p>alpha</p></html>")
+        cache.put("text", url, "alpha")
+        cache.put("simhash", url, "0123456789abcdef", {"chars": 5})
+
+        fetch_url(url, cache, max_age=0, **self.kwargs)
+
+        self.assertEqual(cache.get("html", url).value, PAGE)
+        self.assertIsNone(cache.get("text", url))
+        self.assertIsNone(cache.get("simhash", url))
+        self.assertEqual(
+            cached_extract(url, PAGE, cache, extractor=lambda html: "omega"), "omega"
+        )
+
+    def test_unchanged_body_keeps_extracted_text(self):
+        url = f"{self.base_url}/unchanged"
+        cache = FileCache(self.cache_dir)
+        cache.put("html", url, PAGE)
+        cache.put("text", url, "Example page body.")
+
+        _, status = fetch_url(url, cache, max_age=0, **self.kwargs)
+
+        self.assertEqual(status, "fetched")
+        self.assertEqual(cache.get("text", url).value, "Example page body.")
+
+
+class _StreamingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/report.pdf":
+            self._send(b"%PDF-1.7" + b"0" * 500_000, "application/pdf")
+        elif self.path == "/big":
+            self._send(b"<html><body>" + b"<p>filler text</p>" * 50_000, "text/html")
+        elif self.path == "/cyrillic":
+            body = '<html><head><meta charset="windows-1251"></head><body>Привет</body></html>'
+            self._send(body.encode("cp1251"), "text/html")
+        else:
+            self._send(PAGE.encode("utf-8"), "text/html; charset=utf-8")
+
+    def _send(self, payload, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading on purpose.
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StreamingFetchTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamingHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.kwargs = {
+            "client": HttpClient(retries=0),
+            "scheduler": PolitenessScheduler(min_interval=0),
+        }
+
+    def test_non_html_content_type_is_skipped(self):
+        html, status = fetch_url(f"{self.base_url}/report.pdf", **self.kwargs)
+
+        self.assertIsNone(html)
+        self.assertEqual(status, "unsupported_content_type: application/pdf")
+
+    def test_body_is_capped_at_byte_budget(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"{self.base_url}/big"
+            html, status = fetch_url(url, Path(tmp), max_bytes=10_000, **self.kwargs)
+
+            self.assertEqual(status, "fetched")
+            self.assertEqual(len(html), 10_000)
+            meta = FileCache(tmp).get("html", url).meta
+            self.assertTrue(meta["truncated"])
+
+    def test_meta_charset_is_used_for_decoding(self):
+        html, status = fetch_url(f"{self.base_url}/cyrillic", **self.kwargs)
+
+        self.assertEqual(status, "fetched")
+        self.assertIn("Привет", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
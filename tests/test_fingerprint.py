@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+
+from agent.cache import SQLiteCache
+from agent.fingerprint import (
+    SOURCE_MAX_DISTANCE,
+    cached_fingerprint,
+    collapse_duplicate_sources,
+    hamming_distance,
+    simhash,
+    text_fingerprint,
+)
+
+STORY = " ".join(
+    f"Paragraph {index} of the wire story says the council approved budget item {index * 7} "
+    f"after a vote of {index + 3} to {index % 4} on Tuesday."
+    for index in range(40)
+)
+OTHER_STORY = " ".join(
+    f"Section {index} of the field guide describes bird species number {index * 11} "
+    f"nesting in wetland area {index + 5} during early spring."
+    for index in range(40)
+)
+
+
+class SimHashTests(unittest.TestCase):
+    def test_fingerprints_are_stable_across_runs(self):
+        # Fingerprints are persisted, so they must not depend on the process hash seed.
+        self.assertEqual(simhash(["solar", "panel", "power"]), 0x18D4B5CA607C1326)
+        self.assertEqual(simhash(["a", "b", "c"]), simhash(["c", "b", "a"]))
+
+    def test_syndicated_copy_is_near_and_other_text_is_far(self):
+        copy = "By Example Wire Staff. " + STORY + " Copyright Example Wire. All rights reserved."
+
+        distance = hamming_distance(text_fingerprint(STORY), text_fingerprint(copy))
+        self.assertLessEqual(distance, SOURCE_MAX_DISTANCE)
+        self.assertGreater(
+            hamming_distance(text_fingerprint(STORY), text_fingerprint(OTHER_STORY)), 10
+        )
+
+    def test_fingerprint_is_kept_next_to_the_text(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SQLiteCache(f"{tmp}/cache.sqlite3")
+            url = "https://wire.example/story"
+
+            fingerprint = cached_fingerprint(url, STORY, cache)
+
+            self.assertEqual(cache.get("simhash", url).value, f"{fingerprint:016x}")
+            # A stored fingerprint for a different text is recomputed, not trusted.
+            self.assertEqual(
+                cached_fingerprint(url, OTHER_STORY, cache), text_fingerprint(OTHER_STORY)
+            )
+            cache.close()
+
+
+class CollapseDuplicateSourcesTests(unittest.TestCase):
+    def test_best_ranked_copy_is_kept(self):
+        story = text_fingerprint(STORY)
+        other = text_fingerprint(OTHER_STORY)
+        summaries = [
+            {"url": "https://a.example", "bullets": ["a"], "fingerprint": story},
+            {"url": "https://b.example", "bullets": ["b"], "fingerprint": other},
+            {"url": "https://c.example", "bullets": ["c"], "fingerprint": story ^ 0b101},
+            {"url": "https://d.example", "bullets": ["d"]},
+        ]
+
+        kept = collapse_duplicate_sources(summaries)
+
+        self.assertEqual(
+            [summary["url"] for summary in kept],
+            ["https://a.example", "https://b.example", "https://d.example"],
+        )
+        self.assertEqual(kept[0]["duplicates"], ["https://c.example"])
+        self.assertNotIn("duplicates", summaries[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agent.fetch import fetch_url
+from agent.http_client import HttpClient
+from agent.politeness import PolitenessScheduler
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports = set()
+    hits = 0
+
+    def do_GET(self):
+        type(self).client_ports.add(self.client_address[1])
+        type(self).hits += 1
+        if self.path == "/limited":
+            self.send_response(429)
+            self.send_header("Retry-After", "2")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        payload = b"<html><body>ok</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpClientTests(unittest.TestCase):
+    def setUp(self):
+        _KeepAliveHandler.client_ports = set()
+        _KeepAliveHandler.hits = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_fetches_reuse_one_connection(self):
+        client = HttpClient()
+        scheduler = PolitenessScheduler(min_interval=0)
+
+        for index in range(3):
+            html, status = fetch_url(
+                f"{self.base_url}/page/{index}", client=client, scheduler=scheduler
+            )
+            self.assertEqual(status, "fetched")
+            self.assertIn("ok", html)
+        client.close()
+
+        self.assertEqual(len(_KeepAliveHandler.client_ports), 1)
+
+    def test_rate_limits_are_not_retried_after_the_servers_delay(self):
+        client = HttpClient()
+        started = time.monotonic()
+
+        html, status = fetch_url(
+            f"{self.base_url}/limited",
+            client=client,
+            scheduler=PolitenessScheduler(min_interval=0),
+            timeout=1,
+        )
+
+        self.assertIsNone(html)
+        self.assertEqual(status, "blocked_status: 429")
+        self.assertEqual(_KeepAliveHandler.hits, 1)
+        self.assertLess(time.monotonic() - started, 1)
+        client.close()
+
+    def test_each_thread_reuses_its_own_ddgs(self):
+        client = HttpClient()
+        first = client.ddgs()
+        other = []
+        thread = threading.Thread(target=lambda: other.append(client.ddgs()))
+        thread.start()
+        thread.join()
+
+        self.assertIs(client.ddgs(), first)
+        self.assertIsNot(other[0], first)
+
+        client.discard_ddgs(first)
+        self.assertIsNot(client.ddgs(), first)
+        client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+
+from agent.cache import SQLiteCache
+from agent.extract import cached_extract
+from agent.local_index import LocalIndex, html_title
+
+SOLAR = (
+    "Solar panels convert sunlight into electricity using photovoltaic cells. "
+    "Rooftop panels now supply a growing share of household electricity. "
+    "Installation costs fell by half between 2010 and 2020."
+)
+MUSEUM = (
+    "The city museum opened a new wing in 2019 after a long renovation. "
+    "Visitors can see the restored collection of medieval maps."
+)
+
+
+class LocalIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = LocalIndex(f"{self.tmp.name}/index.sqlite3")
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def test_search_groups_matching_sentences_by_page(self):
+        self.index.add("https://solar.example/", SOLAR, "Solar power")
+        self.index.add("https://museum.example/", MUSEUM, "Museum")
+
+        hits = self.index.search("how do solar panels make electricity")
+
+        self.assertEqual([hit.url for hit in hits], ["https://solar.example/"])
+        self.assertEqual(hits[0].title, "Solar power")
+        self.assertEqual(len(hits[0].sentences), 2)
+        # "make" appears nowhere, so three of the four query terms are covered.
+        self.assertAlmostEqual(hits[0].coverage, 0.75)
+
+    def test_adding_a_page_again_replaces_its_sentences(self):
+        self.index.add("https://solar.example/", SOLAR)
+        self.index.add("https://solar.example/", MUSEUM)
+
+        self.assertEqual(self.index.search("photovoltaic"), [])
+        self.assertEqual(len(self.index.search("museum")), 1)
+        self.assertEqual(self.index.document_count(), 1)
+
+    def test_query_syntax_is_treated_as_plain_words(self):
+        self.index.add("https://solar.example/", SOLAR)
+
+        self.assertEqual(
+            self.index.search('solar" OR NEAR(x'), self.index.search("solar or near x")
+        )
+        self.assertEqual(self.index.search("???"), [])
+
+    def test_oldest_pages_are_dropped_beyond_the_limit(self):
+        self.index.max_documents = 1
+        self.index.add("https://solar.example/", SOLAR)
+        self.index.add("https://museum.example/", MUSEUM)
+
+        self.assertFalse(self.index.has("https://solar.example/"))
+        self.assertTrue(self.index.has("https://museum.example/"))
+        self.assertEqual(self.index.search("solar"), [])
+
+
+class CachedExtractIndexTests(unittest.TestCase):
+    def test_fresh_and_previously_cached_text_is_indexed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SQLiteCache(f"{tmp}/cache.sqlite3")
+            index = LocalIndex(f"{tmp}/index.sqlite3")
+            html = "<html><head><title>Solar &amp; power</title></head></html>"
+            cache.put("text", "https://old.example/", MUSEUM)
+
+            cached_extract(
+                "https://new.example/", html, cache, extractor=lambda _: SOLAR, index=index
+            )
+            cached_extract("https://old.example/", "", cache, index=index)
+
+            self.assertEqual(index.search("photovoltaic")[0].title, "Solar & power")
+            self.assertTrue(index.has("https://old.example/"))
+            index.close()
+            cache.close()
+
+    def test_html_title(self):
+        self.assertEqual(html_title("<TITLE>\n  A   page </title>"), "A page")
+        self.assertEqual(html_title("<p>no title</p>"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
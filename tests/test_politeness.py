@@ -0,0 +1,86 @@
+import threading
+import time
+import unittest
+
+from agent.politeness import PolitenessScheduler
+from agent.robots import RobotsCache
+
+
+class PolitenessSchedulerTests(unittest.TestCase):
+    def _start_times(self, scheduler, urls):
+        starts = {}
+
+        def worker(url):
+            with scheduler.slot(url):
+                starts[url] = time.monotonic()
+
+        threads = [threading.Thread(target=worker, args=(url,)) for url in urls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return starts
+
+    def test_same_domain_requests_are_spaced(self):
+        scheduler = PolitenessScheduler(min_interval=0.1, max_per_domain=4)
+        urls = [f"https://one.example/{index}" for index in range(3)]
+
+        starts = sorted(self._start_times(scheduler, urls).values())
+
+        self.assertGreaterEqual(starts[1] - starts[0], 0.09)
+        self.assertGreaterEqual(starts[2] - starts[1], 0.09)
+
+    def test_different_domains_start_immediately(self):
+        scheduler = PolitenessScheduler(min_interval=1.0)
+        urls = [f"https://site{index}.example/page" for index in range(4)]
+
+        began = time.monotonic()
+        starts = self._start_times(scheduler, urls)
+
+        self.assertLess(max(starts.values()) - began, 0.5)
+
+    def test_idle_domains_are_forgotten(self):
+        scheduler = PolitenessScheduler(min_interval=0.05)
+        with scheduler.slot("https://old.example/page"):
+            pass
+        with scheduler.slot("https://busy.example/page"):
+            time.sleep(0.06)
+            # busy.example is still held, so only the idle old.example is dropped.
+            with scheduler.slot("https://new.example/page"):
+                pass
+
+        self.assertEqual(sorted(scheduler._domains), ["busy.example", "new.example"])
+
+    def test_concurrency_is_limited_per_domain(self):
+        scheduler = PolitenessScheduler(min_interval=0, max_per_domain=1)
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def worker():
+            with scheduler.slot("https://one.example/page"):
+                with lock:
+                    state["active"] += 1
+                    state["peak"] = max(state["peak"], state["active"])
+                time.sleep(0.02)
+                with lock:
+                    state["active"] -= 1
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(state["peak"], 1)
+
+    def test_crawl_delay_raises_interval(self):
+        robots = RobotsCache()
+        robots.store("https://slow.example/", 200, "User-agent: *\nCrawl-delay: 3\n")
+        scheduler = PolitenessScheduler(min_interval=0.5, max_crawl_delay=2.0, robots=robots)
+
+        self.assertEqual(scheduler.interval_for("https://slow.example/page"), 2.0)
+        self.assertEqual(scheduler.interval_for("https://fast.example/page"), 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
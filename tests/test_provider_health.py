@@ -0,0 +1,127 @@
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from agent.provider_health import CLOSED, OPEN, ProviderHealth
+from agent.search import search_web
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+def _stages(*names):
+    return [(name, None) for name in names]
+
+
+class ProviderHealthTests(unittest.TestCase):
+    def test_repeated_failures_open_the_circuit(self):
+        health = ProviderHealth(failure_threshold=3, cooldown=60)
+        for _ in range(3):
+            self.assertTrue(health.available("ddg_html"))
+            health.record_error("ddg_html", 0.1, RuntimeError("down"))
+
+        self.assertFalse(health.available("ddg_html"))
+        self.assertEqual(health.snapshot()["ddg_html"]["state"], OPEN)
+        self.assertEqual(
+            [name for name, _ in health.order(_stages("ddg_html", "wikipedia"))], ["wikipedia"]
+        )
+
+    def test_rate_limit_opens_the_circuit_immediately(self):
+        health = ProviderHealth(rate_limit_cooldown=300)
+
+        health.record_error("ddgs:api", 0.2, _http_error(429))
+
+        stats = health.snapshot()["ddgs:api"]
+        self.assertEqual(stats["state"], OPEN)
+        self.assertEqual(stats["rate_limited"], 1)
+        self.assertGreater(stats["retry_in"], 200)
+
+    def test_half_open_circuit_allows_one_trial_call(self):
+        health = ProviderHealth(failure_threshold=1, cooldown=60)
+        health.record_error("wikipedia", 0.1, RuntimeError("down"))
+
+        with patch("agent.provider_health.time.monotonic", return_value=10**9):
+            self.assertTrue(health.available("wikipedia"))
+            self.assertFalse(health.available("wikipedia"))
+            health.record_result("wikipedia", 0.1, ["hit"])
+
+        self.assertEqual(health.snapshot()["wikipedia"]["state"], CLOSED)
+        self.assertTrue(health.available("wikipedia"))
+
+    def test_probe_is_offered_when_every_circuit_is_open(self):
+        health = ProviderHealth(failure_threshold=1, cooldown=60, rate_limit_cooldown=300)
+        health.record_error("ddgs:api", 0.1, _http_error(429))
+        health.record_error("wikipedia", 0.1, RuntimeError("down"))
+
+        ordered = health.order(_stages("ddgs:api", "wikipedia"))
+
+        self.assertEqual([name for name, _ in ordered], ["wikipedia"])
+        self.assertTrue(health.available("wikipedia"))
+        self.assertFalse(health.available("wikipedia"))
+        self.assertFalse(health.available("ddgs:api"))
+
+    def test_slow_or_flaky_providers_are_ordered_last(self):
+        health = ProviderHealth(failure_threshold=10, slow_latency=5.0)
+        for _ in range(4):
+            health.record_result("ddgs:api", 9.0, ["hit"])
+            health.record_error("ddg_html", 0.5, RuntimeError("flaky"))
+            health.record_result("ddg_lite", 0.4, ["hit"])
+
+        ordered = health.order(_stages("ddgs:api", "ddg_html", "ddg_lite", "wikipedia"))
+
+        self.assertEqual(
+            [name for name, _ in ordered], ["ddg_lite", "wikipedia", "ddgs:api", "ddg_html"]
+        )
+
+    def test_snapshot_reports_latency_percentiles(self):
+        health = ProviderHealth()
+        for latency in (0.1, 0.2, 0.3, 0.4, 2.0):
+            health.record_result("wikipedia", latency, ["hit"])
+        health.record_result("wikipedia", 0.1, [])
+
+        stats = health.snapshot()["wikipedia"]
+
+        self.assertEqual(stats["calls"], 6)
+        self.assertEqual(stats["p50_ms"], 200)
+        self.assertEqual(stats["p95_ms"], 2000)
+        self.assertAlmostEqual(stats["empty_rate"], 0.167)
+        self.assertEqual(stats["success_rate"], 1.0)
+
+
+class SearchWebHealthTests(unittest.TestCase):
+    @patch("agent.search._wiki_search")
+    @patch("agent.search._ddg_lite_search")
+    @patch("agent.search._ddg_html_search")
+    @patch("agent.search._collect_results")
+    def test_open_circuits_are_skipped_on_later_queries(
+        self, mock_collect, mock_html, mock_lite, mock_wiki
+    ):
+        mock_collect.side_effect = _http_error(429)
+        mock_html.side_effect = RuntimeError("blocked")
+        mock_lite.return_value = []
+        mock_wiki.return_value = [
+            {
+                "url": "https://en.wikipedia.org/wiki/Python",
+                "title": "Python",
+                "snippet": "",
+                "domain": "en.wikipedia.org",
+                "score": 4,
+            }
+        ]
+        health = ProviderHealth(failure_threshold=1)
+
+        search_web("python", health=health)
+        results = search_web("python again", health=health)
+
+        self.assertEqual(results[0]["domain"], "en.wikipedia.org")
+        self.assertEqual(mock_collect.call_count, 3)
+        self.assertEqual(mock_html.call_count, 1)
+        self.assertEqual(mock_lite.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
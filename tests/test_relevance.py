@@ -0,0 +1,44 @@
+import unittest
+
+from agent.relevance import SentenceIndex, query_terms
+
+SENTENCES = [
+    "The museum opened a new wing in 2019 after a long renovation.",
+    "Solar panels convert sunlight into electricity using photovoltaic cells.",
+    "Panels on rooftops supply a growing share of household electricity.",
+    "The weather was mild for most of the spring season.",
+]
+
+
+class QueryTermsTests(unittest.TestCase):
+    def test_stopwords_and_duplicates_are_dropped(self):
+        self.assertEqual(
+            query_terms("What is the Solar panel in solar farms?"), ["solar", "panel", "farms"]
+        )
+
+    def test_all_stopword_query_keeps_its_words(self):
+        self.assertEqual(query_terms("Who are you"), ["who", "are", "you"])
+
+
+class SentenceIndexTests(unittest.TestCase):
+    def test_sentences_with_rare_query_terms_rank_first(self):
+        scores = SentenceIndex(SENTENCES).rank("how do solar panels make electricity")
+
+        ranked = sorted(range(len(SENTENCES)), key=lambda i: -scores[i])
+        self.assertEqual(ranked[:2], [1, 2])
+        self.assertEqual(scores[0], 0.0)
+        self.assertEqual(scores[3], 0.0)
+
+    def test_shorter_sentence_wins_on_equal_term_frequency(self):
+        index = SentenceIndex(["solar power", "solar power is one of many topics covered here"])
+
+        first, second = index.rank("solar")
+
+        self.assertGreater(first, second)
+
+    def test_empty_index(self):
+        self.assertEqual(SentenceIndex([]).rank("anything"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
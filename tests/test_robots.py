@@ -0,0 +1,123 @@
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+from agent.cache import SQLiteCache
+from agent.http_client import HttpClient
+from agent.robots import RobotsCache
+
+
+class _RobotsHandler(BaseHTTPRequestHandler):
+    hits = 0
+    status = 200
+    body = "User-agent: *\nDisallow: /private\nCrawl-delay: 2\n"
+    delay = 0.0
+
+    def do_GET(self):
+        type(self).hits += 1
+        if self.delay:
+            time.sleep(self.delay)
+        payload = self.body.encode("utf-8")
+        self.send_response(self.status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except BrokenPipeError:
+            # The client already gave up (timeout test).
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RobotsCacheTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _RobotsHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _RobotsHandler.hits = 0
+        _RobotsHandler.status = 200
+        _RobotsHandler.delay = 0.0
+
+    def test_one_download_per_host(self):
+        cache = RobotsCache()
+
+        self.assertTrue(cache.allowed(f"{self.base_url}/article"))
+        self.assertFalse(cache.allowed(f"{self.base_url}/private/page"))
+        self.assertTrue(cache.allowed(f"{self.base_url}/other"))
+
+        self.assertEqual(_RobotsHandler.hits, 1)
+        self.assertEqual(cache.crawl_delay(f"{self.base_url}/article"), 2.0)
+
+    def test_entries_expire_after_ttl(self):
+        cache = RobotsCache(ttl=0.05)
+
+        cache.allowed(f"{self.base_url}/a")
+        time.sleep(0.1)
+        cache.allowed(f"{self.base_url}/b")
+
+        self.assertEqual(_RobotsHandler.hits, 2)
+
+    def test_fetch_locks_are_dropped_with_their_entries(self):
+        cache = RobotsCache(max_entries=2)
+
+        with patch.object(RobotsCache, "_download", return_value=(404, "")):
+            for index in range(5):
+                cache.allowed(f"https://site{index}.example/page")
+
+        self.assertEqual(len(cache._fetch_locks), 2)
+
+    def test_server_errors_are_cached_with_negative_ttl(self):
+        _RobotsHandler.status = 503
+        cache = RobotsCache(ttl=3600, negative_ttl=0.05)
+        client = HttpClient(retries=0)
+
+        self.assertFalse(cache.allowed(f"{self.base_url}/a", client=client))
+        self.assertFalse(cache.allowed(f"{self.base_url}/b", client=client))
+        self.assertEqual(_RobotsHandler.hits, 1)
+
+        time.sleep(0.1)
+        _RobotsHandler.status = 200
+        self.assertTrue(cache.allowed(f"{self.base_url}/c", client=client))
+        self.assertEqual(_RobotsHandler.hits, 2)
+
+    def test_timeout_allows_and_is_cached(self):
+        _RobotsHandler.delay = 0.5
+        cache = RobotsCache(timeout=0.1)
+
+        started = time.monotonic()
+        self.assertTrue(cache.allowed(f"{self.base_url}/private/page"))
+        self.assertTrue(cache.allowed(f"{self.base_url}/private/other"))
+
+        self.assertLess(time.monotonic() - started, 0.45)
+        self.assertEqual(_RobotsHandler.hits, 1)
+
+    def test_persistent_layer_is_shared_between_caches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteCache(Path(tmp) / "cache.sqlite3")
+            RobotsCache().allowed(f"{self.base_url}/a", cache=store)
+
+            fresh = RobotsCache()
+            self.assertFalse(fresh.allowed(f"{self.base_url}/private/x", cache=store))
+
+            self.assertEqual(_RobotsHandler.hits, 1)
+            self.assertIsNotNone(store.get("robots", self.base_url))
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,20 @@
+import tempfile
+import time
 import unittest
-from unittest.mock import patch
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
-from agent.search import search_web
+from agent.cache import SQLiteCache
+from agent.query_cache import QueryCache, query_cache_key
+from agent.search import HedgePolicy, _hedged_search, _wiki_search, search_web
+
+WIKI_HIT = {
+    "url": "https://en.wikipedia.org/wiki/Python_(programming_language)",
+    "title": "Python",
+    "snippet": "",
+    "domain": "en.wikipedia.org",
+    "score": 4,
+}
 
 
 class SearchWebTests(unittest.TestCase):
@@ -86,6 +99,172 @@ class SearchWebTests(unittest.TestCase):
         self.assertTrue(mock_collect.called)
         mock_wiki.assert_called_once()
 
+    @patch("agent.search._google_cse_credentials", return_value=("key", "cx"))
+    @patch("agent.search._google_cse_search")
+    def test_pages_are_reported_before_the_final_ranking(self, mock_google, _credentials):
+        low = dict(WIKI_HIT, url="https://example.com/low", score=0)
+        high = dict(WIKI_HIT, url="https://agency.gov/high", score=8)
+        mock_google.return_value = iter([[low], [high]])
+        pages = []
+
+        results = search_web("policy", provider="google_cse", on_results=pages.append)
+
+        self.assertEqual(pages, [[low], [high]])
+        self.assertEqual([result["url"] for result in results], [high["url"], low["url"]])
+
+    def test_providers_use_injected_http_client(self):
+        client = MagicMock()
+        client.get.return_value.json.return_value = {
+            "query": {"search": [{"title": "Python (programming language)", "snippet": "lang"}]}
+        }
+
+        results = _wiki_search("python", max_results=1, client=client)
+
+        client.get.assert_called_once()
+        self.assertEqual(
+            results[0]["url"], "https://en.wikipedia.org/wiki/Python_(programming_language)"
+        )
+
+
+def _hit(url):
+    return {"url": url, "title": url, "snippet": "", "domain": "example.com", "score": 0}
+
+
+def _stage(name, delay, results, calls):
+    def run():
+        calls.append(name)
+        time.sleep(delay)
+        if isinstance(results, Exception):
+            raise results
+        return results
+
+    return name, run
+
+
+class HedgedSearchTests(unittest.TestCase):
+    def test_slow_provider_is_hedged_by_the_next_one(self):
+        calls = []
+        stages = [
+            _stage("slow", 2.0, [_hit("https://slow.example/")], calls),
+            _stage("fast", 0.0, [_hit("https://fast.example/")], calls),
+            _stage("unused", 0.0, [_hit("https://unused.example/")], calls),
+        ]
+
+        started = time.monotonic()
+        results = _hedged_search(stages, HedgePolicy(delay=0.1))
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual([result["url"] for result in results], ["https://fast.example/"])
+        self.assertNotIn("unused", calls)
+
+    def test_failed_provider_starts_the_next_without_waiting(self):
+        calls = []
+        stages = [
+            _stage("broken", 0.0, RuntimeError("rate limited"), calls),
+            _stage("empty", 0.0, [], calls),
+            _stage("good", 0.0, [_hit("https://good.example/")], calls),
+        ]
+
+        started = time.monotonic()
+        results = _hedged_search(stages, HedgePolicy(delay=5.0))
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(results[0]["url"], "https://good.example/")
+
+    def test_parallel_results_within_merge_window_are_merged(self):
+        calls = []
+        stages = [
+            _stage("a", 0.0, [_hit("https://a.example/"), _hit("https://shared.example/")], calls),
+            _stage("b", 0.05, [_hit("https://shared.example/"), _hit("https://b.example/")], calls),
+            _stage("c", 1.0, [_hit("https://c.example/")], calls),
+        ]
+
+        results = _hedged_search(stages, HedgePolicy(delay=5.0, parallel=3, merge_window=0.3))
+
+        self.assertEqual(
+            [result["url"] for result in results],
+            ["https://a.example/", "https://shared.example/", "https://b.example/"],
+        )
+
+    def test_each_answering_provider_is_reported(self):
+        calls = []
+        stages = [
+            _stage("a", 0.0, [_hit("https://a.example/")], calls),
+            _stage("b", 0.05, [_hit("https://b.example/")], calls),
+        ]
+        reported = []
+
+        _hedged_search(
+            stages,
+            HedgePolicy(delay=5.0, parallel=2, merge_window=0.3),
+            on_results=reported.append,
+        )
+
+        self.assertEqual(
+            sorted(page[0]["url"] for page in reported),
+            ["https://a.example/", "https://b.example/"],
+        )
+
+    @patch("agent.search._hedged_search", return_value=[])
+    @patch("agent.search._wiki_search", return_value=[])
+    def test_search_web_uses_hedging_only_in_auto_mode(self, mock_wiki, mock_hedged):
+        search_web("python", provider="wikipedia", hedge=HedgePolicy())
+        search_web("python", provider="auto", hedge=HedgePolicy())
+
+        mock_wiki.assert_called_once()
+        mock_hedged.assert_called_once()
+
+
+class QueryCacheTests(unittest.TestCase):
+    @patch("agent.search._wiki_search")
+    def test_repeated_query_is_served_from_cache(self, mock_wiki):
+        mock_wiki.return_value = [dict(WIKI_HIT)]
+        query_cache = QueryCache(ttl=60)
+
+        first = search_web("Python", provider="wikipedia", query_cache=query_cache)
+        second = search_web("  python ", provider="wikipedia", query_cache=query_cache)
+
+        self.assertEqual(first, second)
+        mock_wiki.assert_called_once()
+
+    @patch("agent.search._wiki_search")
+    def test_options_are_part_of_the_key(self, mock_wiki):
+        mock_wiki.return_value = [dict(WIKI_HIT)]
+        query_cache = QueryCache(ttl=60)
+
+        search_web("python", max_results=5, provider="wikipedia", query_cache=query_cache)
+        search_web("python", max_results=10, provider="wikipedia", query_cache=query_cache)
+
+        self.assertEqual(mock_wiki.call_count, 2)
+
+    @patch("agent.search._wiki_search", return_value=[])
+    def test_empty_results_are_not_cached(self, mock_wiki):
+        query_cache = QueryCache(ttl=60)
+
+        search_web("python", provider="wikipedia", query_cache=query_cache)
+        search_web("python", provider="wikipedia", query_cache=query_cache)
+
+        self.assertEqual(mock_wiki.call_count, 2)
+
+    def test_expired_entries_are_dropped(self):
+        query_cache = QueryCache(ttl=0.01)
+        key = query_cache_key("python", "auto", True, 10)
+        query_cache.put(key, [WIKI_HIT])
+
+        with patch("agent.query_cache.time.monotonic", return_value=float("inf")):
+            self.assertIsNone(query_cache.get(key))
+
+    def test_persistent_tier_survives_a_new_process(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteCache(Path(tmp) / "cache.sqlite3")
+            key = query_cache_key("python", "auto", True, 10)
+            QueryCache(ttl=60).put(key, [WIKI_HIT], store)
+
+            restored = QueryCache(ttl=60).get(key, store)
+
+            self.assertEqual(restored, [WIKI_HIT])
+            store.close()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+from agent.summarize import (
+    _score_sentence,
+    _score_sentences,
+    _sentence_spans,
+    _split_sentences,
+    source_bullets,
+    synthesize_paragraph,
+)
+
+DOCUMENT = (
+    "this opening line has no features at all here. "
+    "The Example Report was published in 2021 with 1,200 pages. "
+    "short one. "
+    "growth reached 12%a in the second half of that year! "
+    "Researchers in Paris repeated the study[3] later on. "
+    "Researchers in Paris repeated the study later on. "
+    "another plain sentence without anything notable"
+)
+
+
+class SourceBulletsTests(unittest.TestCase):
+    def test_batch_scores_match_per_sentence_scores(self):
+        text, spans = _sentence_spans(DOCUMENT)
+
+        self.assertEqual(
+            _score_sentences(text, spans),
+            [_score_sentence(sentence) for sentence in _split_sentences(DOCUMENT)],
+        )
+
+    def test_best_sentences_first_in_document_order_among_ties(self):
+        bullets = source_bullets(DOCUMENT, max_bullets=3)
+
+        self.assertEqual(
+            bullets,
+            [
+                "The Example Report was published in 2021 with 1,200 pages.",
+                "growth reached 12%a in the second half of that year!",
+                "Researchers in Paris repeated the study later on.",
+            ],
+        )
+
+    def test_cleaned_duplicates_are_dropped(self):
+        bullets = source_bullets(DOCUMENT, max_bullets=10)
+
+        self.assertEqual(bullets.count("Researchers in Paris repeated the study later on."), 1)
+        self.assertNotIn("short one.", bullets)
+        self.assertEqual(len(bullets), 5)
+
+    def test_empty_text_has_no_bullets(self):
+        self.assertEqual(source_bullets("   \n "), [])
+
+    def test_query_relevant_sentences_are_preferred(self):
+        bullets = source_bullets(DOCUMENT, max_bullets=2, query="who repeated the study")
+
+        self.assertEqual(bullets[0], "Researchers in Paris repeated the study later on.")
+
+
+class SynthesizeParagraphTests(unittest.TestCase):
+    def test_sentences_relevant_to_the_query_lead_the_paragraph(self):
+        summaries = [
+            {"url": "https://a.example", "bullets": ["Museums opened new wings in 2019."]},
+            {"url": "https://b.example", "bullets": ["Solar panels turn sunlight into power."]},
+        ]
+
+        paragraph, sources = synthesize_paragraph(
+            summaries, min_sources=1, query="solar panels", max_sentences=1
+        )
+
+        self.assertEqual(paragraph, "About solar panels, Solar panels turn sunlight into power.")
+        self.assertEqual(sources, ["https://a.example", "https://b.example"])
+
+    def test_source_order_is_kept_when_nothing_matches_the_query(self):
+        summaries = [
+            {"url": "https://a.example", "bullets": ["First source sentence here."]},
+            {"url": "https://b.example", "bullets": ["Second source sentence here."]},
+        ]
+
+        paragraph, _ = synthesize_paragraph(summaries, min_sources=1, query="volcanoes")
+
+        self.assertEqual(
+            paragraph,
+            "About volcanoes, First source sentence here. Second source sentence here.",
+        )
+
+    def test_near_duplicate_sentences_are_used_once(self):
+        sentence = "Researchers at Example University found a 12% rise in activity since 2019."
+        summaries = [
+            {"url": "https://a.example", "bullets": [sentence]},
+            {"url": "https://b.example", "bullets": ["(Reuters) " + sentence]},
+        ]
+
+        paragraph, sources = synthesize_paragraph(summaries, min_sources=1)
+
+        self.assertEqual(paragraph, sentence)
+        self.assertEqual(sources, ["https://a.example", "https://b.example"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from agent.cache import SQLiteCache
+from agent.engine import SearchEngine, extract_source_text
+from agent.models import SearchSettings
+from agent.triage import (
+    CONSENT_WALL,
+    EXTRACT,
+    LIGHT,
+    LOGIN_WALL,
+    NOT_HTML,
+    PLAIN_TEXT,
+    SKIP,
+    SPA_SHELL,
+    TOO_LITTLE_TEXT,
+    TriageStats,
+    triage_page,
+    visible_text_chars,
+)
+
+ARTICLE_TEXT = "The Example Report was published in 2021 with 1,200 pages of findings. " * 20
+ARTICLE = f"<html><head><title>Report</title></head><body><p>{ARTICLE_TEXT}</p></body></html>"
+
+
+class TriagePageTests(unittest.TestCase):
+    def test_article_is_extracted(self):
+        decision = triage_page(ARTICLE)
+
+        self.assertEqual(decision.action, EXTRACT)
+        self.assertGreaterEqual(decision.text_chars, len(ARTICLE_TEXT.strip()))
+
+    def test_non_html_bodies_are_skipped(self):
+        for body in ("%PDF-1.7 binary", '{"items": []}', ""):
+            self.assertEqual(triage_page(body).reason, NOT_HTML)
+
+    def test_plain_text_bodies_get_the_light_extraction(self):
+        body = "Release notes for version 2.0 of the example tool.\n\n" * 40
+
+        decision = triage_page(body)
+
+        self.assertEqual((decision.action, decision.reason), (LIGHT, PLAIN_TEXT))
+        self.assertEqual(triage_page("Just a caption.").reason, TOO_LITTLE_TEXT)
+        self.assertEqual(triage_page("\x00\x01binary" * 100).reason, NOT_HTML)
+
+    def test_script_only_shell_is_skipped(self):
+        shell = (
+            "<!doctype html><html><head><title>App</title></head><body>"
+            "<noscript>You need to enable JavaScript to run this app.</noscript>"
+            '<div id="root"></div>'
+            f"<script>{'window.bundle = 1;' * 500}</script></body></html>"
+        )
+
+        decision = triage_page(shell)
+
+        self.assertEqual((decision.action, decision.reason), (SKIP, SPA_SHELL))
+
+    def test_login_and_consent_walls_are_skipped(self):
+        login = (
+            "<html><body><h1>Sign in to continue reading</h1><form>"
+            '<input type="email" name="user"><input type="password" name="pw">'
+            "</form></body></html>"
+        )
+        consent = (
+            '<html><body><div id="onetrust-banner-sdk">We value your privacy. '
+            "Accept all cookies to continue.</div></body></html>"
+        )
+
+        self.assertEqual(triage_page(login).reason, LOGIN_WALL)
+        self.assertEqual(triage_page(consent).reason, CONSENT_WALL)
+
+    def test_article_with_consent_banner_is_still_extracted(self):
+        page = ARTICLE.replace("<body>", '<body><div class="cookie-consent">Cookies?</div>')
+
+        self.assertEqual(triage_page(page).action, EXTRACT)
+
+    def test_short_pages_are_skipped(self):
+        decision = triage_page("<html><body><p>Just a caption.</p></body></html>")
+
+        self.assertEqual((decision.action, decision.reason), (SKIP, TOO_LITTLE_TEXT))
+
+    def test_huge_markup_with_little_text_is_downgraded(self):
+        markup = '<div class="x"><span></span></div>' * 20_000
+        page = f"<html><body>{markup}<p>{ARTICLE_TEXT}</p></body></html>"
+
+        self.assertEqual(triage_page(page).action, LIGHT)
+
+    def test_estimate_ignores_scripts_styles_and_comments(self):
+        page = (
+            "<html><head><style>p { color: red }</style></head><body>"
+            "<!-- hidden --><p>Visible <b>words</b></p><script>var hidden = 1;</script>"
+            "</body></html>"
+        )
+
+        self.assertEqual(visible_text_chars(page), len("Visible words"))
+
+
+class TriageStatsTests(unittest.TestCase):
+    def test_snapshot_reports_hit_rates(self):
+        stats = TriageStats()
+        for page in (ARTICLE, ARTICLE, "%PDF-1.7 binary", "<html><body>tiny</body></html>"):
+            stats.record(triage_page(page))
+
+        snapshot = stats.snapshot()
+
+        self.assertEqual(snapshot["pages"], 4)
+        self.assertEqual(snapshot["actions"][SKIP], {"count": 2, "rate": 0.5})
+        self.assertEqual(snapshot["reasons"][NOT_HTML]["count"], 1)
+
+    @patch("agent.engine.cached_extract")
+    @patch("agent.engine.fetch_url")
+    @patch("agent.engine.allowed_by_robots", return_value=True)
+    @patch("agent.engine.search_web")
+    def test_engine_skips_extraction_for_triaged_pages(
+        self, mock_search, _mock_robots, mock_fetch, mock_extract
+    ):
+        mock_search.return_value = [
+            {"url": "https://a.example/", "title": "A"},
+            {"url": "https://b.example/", "title": "B"},
+        ]
+        pages = {"https://a.example/": ARTICLE, "https://b.example/": "<html><body></body></html>"}
+        mock_fetch.side_effect = lambda url, *args, **kwargs: (pages[url], "fetched")
+        mock_extract.return_value = ARTICLE_TEXT
+        stats = TriageStats()
+
+        response = SearchEngine(triage_stats=stats).run("report", SearchSettings(max_results=2))
+
+        self.assertEqual(response.sources, ["https://a.example/"])
+        extracted = [call.args[0] for call in mock_extract.call_args_list]
+        self.assertEqual(extracted, ["https://a.example/"])
+        self.assertEqual(stats.snapshot()["reasons"][TOO_LITTLE_TEXT]["count"], 1)
+
+    def test_cached_text_skips_triage(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SQLiteCache(f"{tmp}/cache.sqlite3")
+            cache.put("text", "https://a.example/", ARTICLE_TEXT)
+            stats = TriageStats()
+
+            # Triage would skip this body, but the text cached from an earlier read is reused.
+            text = extract_source_text(
+                "https://a.example/", "<html><body></body></html>", cache, triage_stats=stats
+            )
+
+            self.assertEqual(text, ARTICLE_TEXT)
+            self.assertEqual(stats.snapshot()["pages"], 0)
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,24 +1,126 @@
 from __future__ import annotations
 
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List
+
 from agent.engine import SearchEngine
-from agent.models import SearchSettings
+from agent.models import (
+    LazySearchResponse,
+    SearchEvent,
+    SearchResponse,
+    SearchResult,
+    SearchSettings,
+    SummaryReady,
+)
 
 from models import AgentResponse, ResultItem
 
 
-DEFAULT_SETTINGS = SearchSettings(max_results=10, safe_search=True, provider="auto")
+# The chat UI answers within 30 seconds, with whatever sources finished by then. It shows a
+# result list whenever there are several results, so pages are only fetched and summarized
+# when the summary is actually shown.
+DEFAULT_SETTINGS = SearchSettings(
+    max_results=10,
+    safe_search=True,
+    provider="auto",
+    deadline=30.0,
+    summary_mode="lazy",
+    # The summary uses at most 10 sentences, so stop reading once that many are in hand.
+    evidence_sentences=10,
+)
+# Batch output always carries the summary, so compute it inside the worker pool.
+BATCH_SETTINGS = replace(DEFAULT_SETTINGS, summary_mode="full")
+# Override with AI_SEARCH_AGENT_CACHE_DIR; an empty value disables the disk cache.
+CACHE_DIR_ENV = "AI_SEARCH_AGENT_CACHE_DIR"
+
+_engine: SearchEngine | None = None
+_engine_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_dir() -> Path | None:
+    configured = os.environ.get(CACHE_DIR_ENV)
+    if configured is not None:
+        return Path(configured).expanduser() if configured.strip() else None
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "ai-search-agent"
+
+
+def configure_engine(cache_dir: Path | str | None = None, **engine_kwargs: Any) -> SearchEngine:
+    """Replace the shared engine, e.g. to point it at another cache directory."""
+    global _engine
+    engine = _open_engine(cache_dir, **engine_kwargs)
+    with _engine_lock:
+        previous, _engine = _engine, engine
+    if previous is not None:
+        previous.close()
+    return engine
+
+
+def get_engine() -> SearchEngine:
+    """Process-lifetime engine shared by the GUI worker threads and the CLI.
+
+    Keeps the page/robots/query caches and pooled connections warm between
+    queries, so repeated questions about the same sources skip the network.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = _open_engine(default_cache_dir())
+        return _engine
+
+
+def _open_engine(cache_dir: Path | str | None, **engine_kwargs: Any) -> SearchEngine:
+    # An unwritable cache directory or an SQLite without FTS5 must not break every query.
+    if cache_dir is not None:
+        try:
+            return SearchEngine(cache_dir=cache_dir, **engine_kwargs)
+        except (OSError, sqlite3.Error):
+            logger.warning(
+                "Could not open the cache in %s; running without a disk cache",
+                cache_dir,
+                exc_info=True,
+            )
+    return SearchEngine(cache_dir=None, **engine_kwargs)
 
 
+def shutdown_engine() -> None:
+    global _engine
+    with _engine_lock:
+        engine, _engine = _engine, None
+    if engine is not None:
+        engine.close()
 
-def run_agent_response(query: str) -> AgentResponse:
-    """Return a structured response for the desktop UI without writing files."""
-    normalized_query = query.strip()
-    if not normalized_query:
-        raise ValueError("Please enter a query before sending.")
 
-    engine = SearchEngine(cache_dir=None)
-    response = engine.run(normalized_query, settings=DEFAULT_SETTINGS)
+atexit.register(shutdown_engine)
+
+
+def result_items(results: List[SearchResult], limit: int = 8) -> List[ResultItem]:
+    return [
+        ResultItem(
+            title=(item.title or "Untitled result").strip(),
+            url=item.url,
+            snippet=(item.snippet or "No snippet available.").strip(),
+        )
+        for item in results[:limit]
+        if item.url
+    ]
+
+
+def shows_summary(response: SearchResponse) -> bool:
+    # Several results are shown as a list; the summary is only needed otherwise.
+    return len(response.results) <= 1
+
 
+def agent_response_from(response: SearchResponse) -> AgentResponse:
+    """Turn an engine response into what the desktop UI shows."""
     if response.error and not response.results:
         raise RuntimeError(
             "I couldn't find enough accessible sources right now. "
@@ -26,16 +128,8 @@ def run_agent_response(query: str) -> AgentResponse:
         )
 
     # Show a result list when multiple search results are available.
-    if len(response.results) > 1:
-        items = [
-            ResultItem(
-                title=(item.title or "Untitled result").strip(),
-                url=item.url,
-                snippet=(item.snippet or "No snippet available.").strip(),
-            )
-            for item in response.results[:8]
-            if item.url
-        ]
+    if not shows_summary(response):
+        items = result_items(response.results)
         if items:
             return AgentResponse(results=items)
 
@@ -50,10 +144,48 @@ def run_agent_response(query: str) -> AgentResponse:
     return AgentResponse(answer=answer)
 
 
+def _normalized_query(query: str) -> str:
+    normalized_query = query.strip()
+    if not normalized_query:
+        raise ValueError("Please enter a query before sending.")
+    return normalized_query
 
-def run_agent(query: str) -> str:
-    """Returns the final answer text for the UI."""
-    response = run_agent_response(query)
+
+def run_agent_response(query: str) -> AgentResponse:
+    """Return a structured response for the desktop UI without writing files."""
+    response = get_engine().run(_normalized_query(query), settings=DEFAULT_SETTINGS)
+    return agent_response_from(response)
+
+
+def run_agent_stream(query: str, on_event: Callable[[SearchEvent], None]) -> AgentResponse:
+    """Like run_agent_response, but reports progress events while the search runs.
+
+    ``on_event`` is called from the calling thread for every event except the
+    final ``SummaryReady``, whose response is returned instead.
+    """
+    response: SearchResponse | None = None
+    for event in get_engine().run_iter(_normalized_query(query), settings=DEFAULT_SETTINGS):
+        if isinstance(event, SummaryReady):
+            response = event.response
+        else:
+            on_event(event)
+    if response is None:
+        raise RuntimeError("The search ended without an answer. Please try again.")
+    if isinstance(response, LazySearchResponse) and shows_summary(response):
+        # Sources are only read now, so report that reading as well.
+        response.load(on_event)
+    return agent_response_from(response)
+
+
+def run_batch(queries: Iterable[str], max_queries: int = 4) -> Iterator[SearchResponse]:
+    """Run many queries on the shared engine, yielding responses as they complete."""
+    stripped = (query.strip() for query in queries)
+    return get_engine().run_many(
+        (query for query in stripped if query), settings=BATCH_SETTINGS, max_queries=max_queries
+    )
+
+
+def format_agent_response(response: AgentResponse) -> str:
     if response.answer:
         return response.answer
 
@@ -61,3 +193,8 @@ def run_agent(query: str) -> str:
     for index, item in enumerate(response.results, start=1):
         lines.append(f"{index}. {item.title}\n{item.snippet}\n{item.url}")
     return "\n\n".join(lines)
+
+
+def run_agent(query: str) -> str:
+    """Returns the final answer text for the UI."""
+    return format_agent_response(run_agent_response(query))
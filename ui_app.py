@@ -5,9 +5,12 @@ import queue
 import sys
 import threading
 import tkinter as tk
+from dataclasses import dataclass, field
 from tkinter import ttk
 
-from ui_agent import run_agent
+from agent.models import ResultsRanked, SearchEvent, SourceExtracted, SourceFetched
+from models import ResultItem
+from ui_agent import format_agent_response, result_items, run_agent_stream
 
 
 def _resource_path(relative_path: str) -> str:
@@ -16,6 +19,14 @@ def _resource_path(relative_path: str) -> str:
     return os.path.join(base_dir, relative_path)
 
 
+@dataclass
+class _Progress:
+    results: list[ResultItem] = field(default_factory=list)
+    read: int = 0
+    total: int = 0
+    bullets: list[str] = field(default_factory=list)
+
+
 class AISearchAgentApp:
     def __init__(self, root: tk.Tk) -> None:
         self.root = root
@@ -29,8 +40,10 @@ class AISearchAgentApp:
         except tk.TclError:
             self.window_icon = None
 
-        self.result_queue: queue.Queue[tuple[str, int, str]] = queue.Queue()
+        self.result_queue: queue.Queue[tuple[str, int, object]] = queue.Queue()
         self.pending_bubbles: dict[int, tk.Frame] = {}
+        # Partial results shown in a pending bubble until the final answer arrives.
+        self.progress: dict[int, _Progress] = {}
         self.next_request_id = 1
         self.is_busy = False
 
@@ -218,7 +231,32 @@ class AISearchAgentApp:
         self.pending_bubbles[request_id] = content
         self._scroll_to_bottom()
 
+    def _render_progress(self, request_id: int, event: SearchEvent) -> None:
+        container = self.pending_bubbles.get(request_id)
+        if container is None:
+            return
+        progress = self.progress.setdefault(request_id, _Progress())
+        if isinstance(event, ResultsRanked):
+            progress.results = result_items(event.results, limit=5)
+            progress.total = event.sources_to_read
+        elif isinstance(event, SourceFetched):
+            progress.read += 1
+        elif isinstance(event, SourceExtracted):
+            progress.bullets.extend(event.bullets[:2])
+
+        lines = ["Top results:"]
+        for index, item in enumerate(progress.results, start=1):
+            lines.append(f"{index}. {item.title}\n   {item.url}")
+        if progress.total:
+            lines.append(f"\nReading sources ({progress.read}/{progress.total})...")
+        if progress.bullets:
+            lines.append("Found so far:")
+            lines.extend(f"• {bullet}" for bullet in progress.bullets[:6])
+        self._render_plain_text(container, "\n".join(lines))
+        self._scroll_to_bottom()
+
     def _replace_thinking_with_success(self, request_id: int, answer: str) -> None:
+        self.progress.pop(request_id, None)
         container = self.pending_bubbles.pop(request_id, None)
         if container is None:
             return
@@ -226,6 +264,7 @@ class AISearchAgentApp:
         self._scroll_to_bottom()
 
     def _replace_thinking_with_error(self, request_id: int, message: str) -> None:
+        self.progress.pop(request_id, None)
         container = self.pending_bubbles.pop(request_id, None)
         if container is None:
             return
@@ -244,11 +283,14 @@ class AISearchAgentApp:
         for child in self.messages_frame.winfo_children():
             child.destroy()
         self.pending_bubbles.clear()
+        self.progress.clear()
 
     def _worker_search(self, request_id: int, query: str) -> None:
         try:
-            answer = run_agent(query)
-            self.result_queue.put(("ok", request_id, answer))
+            response = run_agent_stream(
+                query, on_event=lambda event: self.result_queue.put(("event", request_id, event))
+            )
+            self.result_queue.put(("ok", request_id, format_agent_response(response)))
         except Exception as error:  # pragma: no cover - GUI path
             self.result_queue.put(("error", request_id, str(error)))
 
@@ -275,12 +317,16 @@ class AISearchAgentApp:
         try:
             while True:
                 status, request_id, payload = self.result_queue.get_nowait()
+                if status == "event":
+                    self._render_progress(request_id, payload)  # type: ignore[arg-type]
+                    continue
                 if status == "ok":
-                    self._replace_thinking_with_success(request_id, payload)
+                    self._replace_thinking_with_success(request_id, str(payload))
                 else:
+                    message = str(payload or "")
                     self._replace_thinking_with_error(
                         request_id,
-                        payload or "Sorry, something went wrong while searching. Please try again.",
+                        message or "Sorry, something went wrong while searching. Please try again.",
                     )
                 self._set_busy(False)
         except queue.Empty: